@@ -0,0 +1,270 @@
+"""
+Geometric anisotropy estimation. The Anisotropy class fits directional
+variogram ranges for many azimuths and describes them by an ellipse.
+The resulting coordinate transform can be applied to a Variogram and
+OrdinaryKriging to remove the anisotropy before distances are calculated.
+"""
+import warnings
+
+import numpy as np
+from scipy.optimize import curve_fit, least_squares
+
+from .DirectionalVariogram import DirectionalVariogram
+
+
+def fit_ellipse(azimuths, ranges):
+    r"""Fit a range ellipse
+
+    .. versionadded:: 0.5.0
+
+    Fits an ellipse centered at the origin to the given directional
+    ranges. The azimuths follow the convention of
+    :class:`DirectionalVariogram <skgstat.DirectionalVariogram>`.
+
+    Parameters
+    ----------
+    azimuths : numpy.ndarray
+        Azimuth angles in degree.
+    ranges : numpy.ndarray
+        Effective range for each azimuth. NaN values are ignored.
+
+    Returns
+    -------
+    angle : float
+        Azimuth of the major axis in degree, in the interval [-90, 90[.
+    major_range : float
+        Range along the major axis.
+    minor_range : float
+        Range along the minor axis.
+
+    Notes
+    -----
+    With the unit vector :math:`u` of the direction of an azimuth, the
+    ellipse is written as quadratic form:
+
+    .. math::
+        \frac{1}{r^2} = u^T Q u = A\cos^2\theta + B\sin^2\theta +
+        C\sin\theta\cos\theta
+
+    :math:`A, B, C` are found by a linear least squares fit. The
+    eigenvalues of :math:`Q` are the inverse squared ranges of the major
+    and minor axis, the eigenvectors their directions. As the linear fit
+    is sensitive to small ranges, it is only used as starting point for
+    a bounded non-linear least squares fit of the ranges themselves.
+
+    """
+    azimuths = np.asarray(azimuths, dtype=float)
+    ranges = np.asarray(ranges, dtype=float)
+
+    valid = ~np.isnan(ranges) & (ranges > 0)
+    if np.count_nonzero(valid) < 3:
+        raise ValueError('At least three valid directional ranges are '
+                         'needed to fit an ellipse.')
+
+    # the azimuth is counted clockwise from east
+    theta = -np.radians(azimuths[valid])
+    r = ranges[valid]
+
+    # start values from the linear fit of the quadratic form
+    design = np.column_stack((
+        np.cos(theta)**2,
+        np.sin(theta)**2,
+        np.sin(theta) * np.cos(theta)
+    ))
+    (a, b, c), _, _, _ = np.linalg.lstsq(design, 1. / r**2, rcond=None)
+    lam, vec = np.linalg.eigh(np.array([[a, c / 2], [c / 2, b]]))
+    if lam[0] > 0:
+        x0 = [np.arctan2(vec[1, 0], vec[0, 0]), 1. / lam[0], 1. / lam[1]]
+    else:
+        # not positive definite; start at the longest directional range
+        x0 = [theta[np.argmax(r)], np.max(r)**2, np.min(r)**2]
+
+    # refine in range space; fitting squared ranges keeps them positive
+    def residuals(p):
+        phi, a2, b2 = p
+        return 1. / np.sqrt(
+            np.cos(theta - phi)**2 / a2 + np.sin(theta - phi)**2 / b2
+        ) - r
+
+    upper = (10 * np.max(r))**2
+    x0 = np.clip(x0, [-np.inf, 1e-12, 1e-12], [np.inf, upper, upper])
+    phi, a2, b2 = least_squares(
+        residuals, x0,
+        bounds=([-np.inf, 0, 0], [np.inf, upper, upper])
+    ).x
+
+    # make sure the first axis is the major axis
+    if b2 > a2:
+        a2, b2 = b2, a2
+        phi += np.pi / 2
+    major_range, minor_range = np.sqrt(a2), np.sqrt(b2)
+
+    # convert the major direction back into an azimuth in [-90, 90[
+    angle = -np.degrees(phi)
+    angle = (angle + 90.) % 180. - 90.
+
+    return angle, major_range, minor_range
+
+
+class Anisotropy:
+    def __init__(self, variogram, azimuths=None):
+        """Geometric Anisotropy
+
+        .. versionadded:: 0.5.0
+
+        Estimates the geometric anisotropy from a
+        :class:`DirectionalVariogram <skgstat.DirectionalVariogram>`. The
+        empirical variograms of all azimuths are calculated in one pass by
+        :func:`get_directional_empirical <skgstat.DirectionalVariogram.get_directional_empirical>`.
+        The theoretical model of the variogram is fitted to each of them to
+        derive a directional range. Finally, an ellipse is fitted to the
+        directional ranges.
+
+        An instance can be used as coordinate transform. It rotates the
+        major axis onto the x-axis and stretches the minor axis to the
+        major range. Then, the field is isotropic and a
+        :class:`Variogram <skgstat.Variogram>` and
+        :class:`OrdinaryKriging <skgstat.OrdinaryKriging>` can use it by
+        setting :func:`Variogram.coordinate_transform <skgstat.Variogram.coordinate_transform>`.
+
+        Parameters
+        ----------
+        variogram : DirectionalVariogram
+            The tolerance, bandwidth, directional model, binning, estimator
+            and theoretical model of this instance are used for all azimuths.
+        azimuths : list, numpy.ndarray
+            Azimuths in degree to fit a range for. Defaults to 18 azimuths
+            in steps of 10° from -90° to 80°.
+
+        Attributes
+        ----------
+        angle : float
+            Azimuth of the major axis in degree.
+        major_range : float
+            Effective range along the major axis.
+        minor_range : float
+            Effective range along the minor axis.
+        ranges : numpy.ndarray
+            Fitted effective range for each azimuth.
+
+        """
+        if not isinstance(variogram, DirectionalVariogram):
+            raise TypeError(
+                'variogram has to be of type skgstat.DirectionalVariogram.'
+            )
+
+        if azimuths is None:
+            azimuths = np.arange(-90., 90., 10.)
+
+        self.V = variogram
+        self.azimuths = np.asarray(azimuths, dtype=float)
+
+        # one shared pass for all azimuths
+        self.bins, self.experimental = self.V.get_directional_empirical(
+            self.azimuths
+        )
+        self.ranges = np.fromiter(
+            (self._fit_range(x, y) for x, y in zip(self.bins, self.experimental)),
+            dtype=float
+        )
+
+        # fit the ellipse
+        self.angle, self.major_range, self.minor_range = fit_ellipse(
+            self.azimuths, self.ranges
+        )
+
+    @property
+    def ratio(self):
+        """Anisotropy ratio
+
+        Ratio of the minor to the major range.
+
+        """
+        return self.minor_range / self.major_range
+
+    def _fit_range(self, x, y):
+        """
+        Fit the theoretical model of the variogram to one directional
+        empirical variogram and return the effective range. Returns NaN, if
+        the model cannot be fitted.
+        """
+        model = self.V._model
+        if self.V._harmonize:
+            raise ValueError('The harmonized model cannot be used to fit '
+                             'directional ranges.')
+
+        # remove empty lag classes
+        valid = ~np.isnan(x) & ~np.isnan(y)
+        x, y = x[valid], y[valid]
+        if len(x) < 3:
+            return np.nan
+
+        # same bounds as used by Variogram.fit
+        if model.__name__ == 'matern':
+            bounds = [np.max(x), np.max(y), 20.]
+        elif model.__name__ == 'stable':
+            bounds = [np.max(x), np.max(y), 2.]
+        else:
+            bounds = [np.max(x), np.max(y)]
+
+        if self.V.use_nugget:
+            bounds.append(0.99 * np.max(y))
+
+            def wrapped(*args):
+                return model(*args)
+        else:
+            def wrapped(*args):
+                return model(*args, 0)
+
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                cof, _ = curve_fit(
+                    wrapped, x, y, method='trf',
+                    p0=np.asarray(bounds), bounds=(0, bounds)
+                )
+        except (RuntimeError, ValueError):
+            return np.nan
+
+        return cof[0]
+
+    def transform(self, coordinates):
+        """Coordinate transform
+
+        Rotate the major axis onto the x-axis and scale the minor axis
+        by the inverse anisotropy ratio. Distances in the transformed
+        coordinates are isotropic with the range of the major axis.
+
+        Parameters
+        ----------
+        coordinates : numpy.ndarray
+            Array of shape (m, 2).
+
+        Returns
+        -------
+        coordinates : numpy.ndarray
+            Transformed array of shape (m, 2).
+
+        """
+        coordinates = np.asarray(coordinates, dtype=float)
+        if coordinates.ndim != 2 or coordinates.shape[1] != 2:
+            raise ValueError('The anisotropy transform needs 2D coordinates.')
+
+        # the azimuth is counted clockwise from east
+        theta = -np.radians(self.angle)
+        rot = np.array([
+            [np.cos(theta), -np.sin(theta)],
+            [np.sin(theta), np.cos(theta)]
+        ])
+
+        # rotate into the ellipse axes and stretch the minor axis
+        t = coordinates.dot(rot)
+        t[:, 1] /= self.ratio
+        return t
+
+    def __call__(self, coordinates):
+        return self.transform(coordinates)
+
+    def __repr__(self):  # pragma: no cover
+        return '< Anisotropy: angle %.1f° ranges %.2f / %.2f >' % \
+            (self.angle, self.major_range, self.minor_range)
@@ -3,11 +3,50 @@ Directional Variogram
 """
 import numpy as np
 from scipy.spatial.distance import pdist
+from numba import njit
 
 from .Variogram import Variogram
 from skgstat import plotting
 
 
+@njit(cache=True)
+def _search_area(angles, dists, azimuths, tolerance, bandwidth, shape):
+    """
+    Fused kernel for the predefined search areas. The absolute angular
+    difference between each point pair and the azimuth axis is folded into
+    [0, pi/2] once and the mask of the requested shape is derived from it.
+    shape is 0 for compass, 1 for triangle and 2 for circle. Returns one
+    mask row per azimuth (in radians). NaN angles are never included.
+    """
+    n_az = azimuths.size
+    n = angles.size
+    mask = np.empty((n_az, n), dtype=np.bool_)
+    half_pi = np.pi / 2
+    half_band = bandwidth / 2
+
+    for i in range(n_az):
+        for j in range(n):
+            # point pairs are not directed, fold the difference to the axis
+            delta = np.abs(angles[j] + azimuths[i])
+            if delta > np.pi:
+                delta -= np.pi
+            if delta > half_pi:
+                delta = np.pi - delta
+
+            if shape == 0:
+                mask[i, j] = delta <= tolerance
+            elif shape == 1:
+                mask[i, j] = delta <= tolerance and \
+                    dists[j] * np.sin(delta) <= half_band
+            else:
+                cos_delta = np.cos(delta)
+                mask[i, j] = dists[j] * np.sin(delta) <= half_band and \
+                    (dists[j] * cos_delta >= half_band or
+                     dists[j] <= bandwidth * cos_delta)
+
+    return mask
+
+
 class DirectionalVariogram(Variogram):
     """DirectionalVariogram Class
 
@@ -217,74 +256,50 @@ class DirectionalVariogram(Variogram):
             `'entropy'` this argument sets the percentile to be used.
 
         """
-        # Before we do anything else, make kwargs available
-        self._kwargs = self._validate_kwargs(**kwargs)
+        # Before we do anything else, set all attributes to an empty state
+        self._init_attributes(**kwargs)
 
         # FIXME: Call __init__ of baseclass?
         # No, because the sequence at which the arguments get initialized
         # does matter. There is way too much transitive dependence, thus
         # it was easiest to copy the init over.
 
-        self._direction_mask_cache = None
-
         # Set coordinates
         self._X = np.asarray(coordinates)
 
-        # pairwise difference
-        self._diff = None
-
         # set verbosity
         self.verbose = verbose
 
         # set values
-        self._values = None
         # calc_diff = False here, because it will be calculated by fit() later
         self.set_values(values=values, calc_diff=False)
-        
-        # distance matrix
-        self._dist = None
 
         # set distance calculation function
-        self._dist_func_name = None
         self.set_dist_function(func=dist_func)
 
-        # Angles and euclidean distances used for direction mask calculation
-        self._angles = None
-        self._euclidean_dist = None
-
         # lags and max lag
         self.n_lags = n_lags
-        self._maxlag = None
         self.maxlag = maxlag
 
         # estimator can be function or a string
-        self._estimator = None
         self.set_estimator(estimator_name=estimator)
 
         # model can be function or a string
-        self._model = None
         self.set_model(model_name=model)
 
         # azimuth direction
-        self._azimuth = None
         self.azimuth = azimuth
 
         # azimuth tolerance
-        self._tolerance = None
         self.tolerance = tolerance
 
         # tolerance bandwidth
-        self._bandwidth = None
         self.bandwidth = bandwidth
 
         # set the directional model
-        self._directional_model = None
         self.set_directional_model(model_name=directional_model)
 
         # the binning settings
-        self._bin_func = None
-        self._groups = None
-        self._bins = None
         self.set_bin_func(bin_func=bin_func)
 
         # specify if the lag should be given absolute or relative to the maxlag
@@ -292,28 +307,56 @@ class DirectionalVariogram(Variogram):
 
         # set the fitting method and sigma array
         self.fit_method = fit_method
-        self._fit_sigma = None
         self.fit_sigma = fit_sigma
 
         # set if nugget effect shall be used
         self.use_nugget = use_nugget
 
-        # set attributes to be filled during calculation
-        self.cov = None
-        self.cof = None
-
-        # settings, not reachable by init (not yet)
-        self._cache_experimental = False
-
         # do the preprocessing and fitting upon initialization
         # Note that fit() calls preprocessing
         self.fit(force=True)
 
+    def _init_attributes(self, **kwargs):
+        super(DirectionalVariogram, self)._init_attributes(**kwargs)
+
+        # Angles and euclidean distances used for direction mask calculation
+        self._direction_mask_cache = None
+        self._angles = None
+        self._euclidean_dist = None
+
+        # azimuth, tolerance, bandwidth and directional model
+        self._azimuth = None
+        self._tolerance = None
+        self._bandwidth = None
+        self._directional_model = None
+
+    def _serial_kwargs(self):
+        for name in ('compass', 'triangle', 'circle'):
+            if self._directional_model == getattr(self, '_%s' % name):
+                break
+        else:
+            raise ValueError('A custom directional_model cannot be serialized.')
+
+        return dict(
+            azimuth=float(self.azimuth),
+            tolerance=float(self.tolerance),
+            bandwidth=float(self.bandwidth),
+            directional_model=name
+        )
+
+    def _set_serial_kwargs(self, azimuth, tolerance, bandwidth, directional_model):
+        self.azimuth = azimuth
+        self.tolerance = tolerance
+        # the bandwidth setter checks against the distances
+        self._bandwidth = bandwidth
+        self.set_directional_model(model_name=directional_model)
+
     def preprocessing(self, force=False):
         self._calc_distances(force=force)
         self._calc_direction_mask_data(force)
         self._calc_diff(force=force)
         self._calc_groups(force=force)
+        self._update_store()
 
     def _calc_direction_mask_data(self, force=False):
         r"""
@@ -541,21 +584,14 @@ class DirectionalVariogram(Variogram):
         # reset the groups as the directional model changed
         self._groups = None
 
-    @property
-    def bins(self):
-        if self._bins is None:
-            # get the distances
-            d = self.distance.copy()
-            d[np.where(~self._direction_mask())] = np.nan
-
-            self._bins, n = self.bin_func(d, self._n_lags, self.maxlag)
+    def _binning_distances(self):
+        # bin the point pairs in direction only
+        d = self.distance.copy()
+        d[np.where(~self._direction_mask())] = np.nan
+        return d
 
-            # if the binning function returned an N, the n_lags need
-            # to be adjusted directly (not through the setter)
-            if n is not None:
-                self._n_lags = n
-
-        return self._bins.copy()
+    def _pair_mask(self):
+        return self._direction_mask()
 
     def _calc_groups(self, force=False):
         super(DirectionalVariogram, self)._calc_groups(force=force)
@@ -585,6 +621,100 @@ class DirectionalVariogram(Variogram):
             self._direction_mask_cache = self._directional_model(self._angles, self._euclidean_dist)
         return self._direction_mask_cache
 
+    def get_directional_empirical(self, azimuths, bin_center=False):
+        """Empirical variograms for many azimuths
+
+        .. versionadded:: 0.5.0
+
+        Returns the empirical variograms for all given azimuths at once.
+        All other settings, like the tolerance, bandwidth, directional
+        model, binning function and estimator of this instance are used.
+        The result is the same as creating a
+        :class:`DirectionalVariogram <skgstat.DirectionalVariogram>` for
+        each azimuth, but the distances, angles and pairwise differences
+        are only calculated once. The direction masks for all azimuths
+        are calculated in one vectorized sweep.
+
+        Parameters
+        ----------
+        azimuths : list, numpy.ndarray
+            Azimuth angles in **degree**. Each has to meet
+            -180 <= angle <= 180.
+        bin_center : bool
+            If set to `True`, the center for each distance lag bin is
+            used over the upper limit (default).
+
+        Returns
+        -------
+        bins : numpy.ndarray
+            2D array of shape (len(azimuths), n_lags) of distance lag bins.
+        experimental : numpy.ndarray
+            2D array of shape (len(azimuths), n_lags) of experimental
+            semi-variance values.
+
+        Note
+        ----
+        If the binning function derives the number of lag classes from the
+        data, the directions might end up with a different number of lag
+        classes. In this case, the shorter rows are padded with NaN.
+
+        See Also
+        --------
+        Variogram.get_empirical
+
+        """
+        azimuths = np.atleast_1d(np.asarray(azimuths, dtype=float))
+        if np.any((azimuths < -180) | (azimuths > 180)):
+            raise ValueError('The azimuth is an angle in degree and has to '
+                             'meet -180 <= angle <= 180')
+
+        if self._directional_model not in (self._triangle, self._compass, self._circle):
+            raise ValueError('The directional model has to be one of the '
+                             'predefined models to vary the azimuth.')
+
+        # make sure distances, angles and differences are calculated
+        self.preprocessing()
+        d = self.distance
+
+        # limit the memory used by the mask sweep to ~10 million elements
+        chunk = max(1, int(1e7 // max(d.size, 1)))
+
+        bins, experimental = [], []
+        for i in range(0, len(azimuths), chunk):
+            masks = self._directional_model(
+                self._angles, self._euclidean_dist,
+                azimuth=azimuths[i:i + chunk]
+            )
+
+            for mask in masks:
+                _bins, _ = self.bin_func(
+                    np.where(mask, d, np.nan), self._n_lags, self.maxlag
+                )
+                _bins = np.asarray(_bins, dtype=float)
+
+                # group the pairs: bins[i - 1] <= d < bins[i]
+                groups = np.searchsorted(_bins, d, side='right')
+                groups[(groups >= len(_bins)) | ~mask] = -1
+
+                bins.append(_bins)
+                experimental.append(
+                    self._experimental_from_groups(groups, len(_bins))
+                )
+
+        # align bin centers
+        if bin_center:
+            bins = [b - np.diff(np.concatenate(([0], b))) / 2 for b in bins]
+
+        # stack and pad with NaN
+        n = max(len(b) for b in bins)
+        out_bins = np.ones((len(bins), n)) * np.nan
+        out_exp = np.ones((len(bins), n)) * np.nan
+        for i, (b, e) in enumerate(zip(bins, experimental)):
+            out_bins[i, :len(b)] = b
+            out_exp[i, :len(e)] = e
+
+        return out_bins, out_exp
+
     def pair_field(self, ax=None, cmap="gist_rainbow", points='all', add_points=True, alpha=0.3, **kwargs):  # pragma: no cover
         """
         Plot a pair field.
@@ -608,7 +738,12 @@ class DirectionalVariogram(Variogram):
         alpha : float
             Alpha value for the colors to make overlapping vertices
             visualize better. Defaults to ``0.3``.
-            
+        max_lines : int
+            .. versionadded:: 0.5.0
+
+            If there are more point pairs, a random sample of this size
+            is plotted. Defaults to 10000, None plots all pairs.
+
         """
         # get the backend
         used_backend = plotting.backend()
@@ -618,7 +753,27 @@ class DirectionalVariogram(Variogram):
         elif used_backend == 'plotly':
             return plotting.plotly_pair_field(self, fig=ax, points=points, add_points=add_points, alpha=alpha, **kwargs)       
 
-    def _triangle(self, angles, dists):
+    def _search_area_mask(self, angles, dists, azimuth, shape):
+        """
+        Evaluate the fused search area kernel for the predefined shapes.
+        If an array of azimuths is given, one mask row per azimuth is
+        returned, otherwise the mask for the given or current azimuth.
+        """
+        az = np.radians(self.azimuth if azimuth is None else azimuth)
+        mask = _search_area(
+            np.asarray(angles, dtype=float).ravel(),
+            np.asarray(dists, dtype=float).ravel(),
+            np.atleast_1d(np.asarray(az, dtype=float)).ravel(),
+            np.radians(self.tolerance / 2),
+            float(self.bandwidth),
+            shape
+        )
+
+        if np.ndim(az) > 0:
+            return mask
+        return mask[0]
+
+    def _triangle(self, angles, dists, azimuth=None):
         r"""Triangular Search Area
 
         Construct a triangular bounded search area for building directional
@@ -631,6 +786,12 @@ class DirectionalVariogram(Variogram):
         angles, dists : numpy.array
             Vectors between point pairs in polar form (angle relative
             to east in radians, length in coordinate space units)
+        azimuth : float, numpy.array
+            .. versionadded:: 0.5.0
+
+            If given, this azimuth in degree is used instead of
+            DirectionalVariogram.azimuth. If an array is passed, one mask
+            row per azimuth is returned.
 
         Returns
         -------
@@ -666,16 +827,9 @@ class DirectionalVariogram(Variogram):
 
         """
 
-        absdiff = np.abs(angles + np.radians(self.azimuth))
-        absdiff = np.where(absdiff > np.pi, absdiff - np.pi, absdiff)
-        absdiff = np.where(absdiff > np.pi / 2, np.pi - absdiff, absdiff)
+        return self._search_area_mask(angles, dists, azimuth, 1)
 
-        in_tol = absdiff <= np.radians(self.tolerance / 2)
-        in_band = self.bandwidth / 2 >= np.abs(dists * np.sin(np.abs(angles + np.radians(self.azimuth))))
-
-        return in_tol & in_band
-
-    def _circle(self, angles, dists):
+    def _circle(self, angles, dists, azimuth=None):
         r"""Circular Search Area
 
         Construct a half-circled bounded search area for building directional
@@ -683,12 +837,20 @@ class DirectionalVariogram(Variogram):
         current point of interest and the local x-axis is rotated onto the
         azimuth angle.
         The radius of the half-circle is set to half the bandwidth.
+        The tolerance is not used.
+
+        .. versionchanged:: 0.5.0
+            implemented the circular search area.
 
         Parameters
         ----------
         angles, dists : numpy.array
             Vectors between point pairs in polar form (angle relative
             to east in radians, length in coordinate space units)
+        azimuth : float, numpy.array
+            If given, this azimuth in degree is used instead of
+            DirectionalVariogram.azimuth. If an array is passed, one mask
+            row per azimuth is returned.
 
         Returns
         -------
@@ -700,15 +862,31 @@ class DirectionalVariogram(Variogram):
         ------
         ValueError : In case the DirectionalVariogram.bandwidth is None or 0.
 
+        Notes
+        -----
+        In the local coordinate system, a point pair vector of length d is
+        split into the component along the azimuth :math:`d\cos\delta` and
+        perpendicular to it :math:`d\sin\delta`, where :math:`\delta` is
+        the angular difference to the azimuth. With the bandwidth b, the
+        point pair is inside the rectangle if
+        :math:`d\sin\delta \leq \frac{b}{2}` and
+        :math:`d\cos\delta \geq \frac{b}{2}`. The half-circle is
+        centered at :math:`\frac{b}{2}` on the azimuth axis, thus a point
+        pair is inside if :math:`d \leq b\cos\delta`.
+
         See Also
         --------
         DirectionalVariogram._triangle
         DirectionalVariogram._compass
 
         """
-        raise NotImplementedError
+        if self.bandwidth is None or self.bandwidth == 0:
+            raise ValueError('The circular search area needs a bandwidth '
+                             'larger than 0.')
+
+        return self._search_area_mask(angles, dists, azimuth, 2)
 
-    def _compass(self, angles, dists):
+    def _compass(self, angles, dists, azimuth=None):
         r"""Compass direction direction mask
 
         Construct a search area for building directional dependent point
@@ -723,6 +901,12 @@ class DirectionalVariogram(Variogram):
         angles, dists : numpy.array
             Vectors between point pairs in polar form (angle relative
             to east in radians, length in coordinate space units)
+        azimuth : float, numpy.array
+            .. versionadded:: 0.5.0
+
+            If given, this azimuth in degree is used instead of
+            DirectionalVariogram.azimuth. If an array is passed, one mask
+            row per azimuth is returned.
 
         Returns
         -------
@@ -737,8 +921,4 @@ class DirectionalVariogram(Variogram):
 
         """
 
-        absdiff = np.abs(angles + np.radians(self.azimuth))
-        absdiff = np.where(absdiff > np.pi, absdiff - np.pi, absdiff)
-        absdiff = np.where(absdiff > np.pi / 2, np.pi - absdiff, absdiff)
-
-        return absdiff <= np.radians(self.tolerance / 2)
+        return self._search_area_mask(angles, dists, azimuth, 0)
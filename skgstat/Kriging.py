@@ -1,18 +1,20 @@
 """
-The kriging module offers only an Ordinary Kriging routine (OK) that can be
-used together with the skgstat.Variogram class. The usage of the class is
-inspired by the scipy.interpolate classes.
+The kriging module offers an Ordinary Kriging routine (OK) that can be
+used together with the skgstat.Variogram class and a space-time Ordinary
+Kriging routine for the skgstat.SpaceTimeVariogram class. The usage of the
+classes is inspired by the scipy.interpolate classes.
 """
 import time
 
 import numpy as np
-from scipy.spatial.distance import squareform
+from scipy.spatial.distance import squareform, pdist
 from scipy.linalg import solve as scipy_solve
 from numpy.linalg import solve as numpy_solve, LinAlgError, inv
-from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
 import scipy.spatial.distance
 
 from .Variogram import Variogram
+from .SpaceTimeVariogram import SpaceTimeVariogram
 
 
 class LessPointsError(RuntimeError):
@@ -31,6 +33,60 @@ def inv_solve(a, b):
     return inv(a).dot(b)
 
 
+def _chunks(n, chunk_size=None):
+    """Chunk index generator
+
+    Splits the indices ``0...n-1`` into consecutive index arrays of at most
+    ``chunk_size`` elements. If ``chunk_size`` is None, all indices are
+    yielded as one chunk.
+
+    """
+    if chunk_size is None or chunk_size >= n:
+        chunk_size = max(n, 1)
+
+    for start in range(0, n, chunk_size):
+        yield np.arange(start, min(start + chunk_size, n))
+
+
+def _map_chunks(func, n, chunk_size=None, n_jobs=1):
+    """Map a function over chunks of target locations
+
+    Shared batching and parallelization infrastructure of the kriging
+    classes. ``func`` is called with an index array for each chunk and has
+    to return a tuple of ``(z, sigma, errors)``, where errors is an array of
+    error counts. The results are concatenated in chunk order.
+    If ``n_jobs`` is larger than one, the chunks are processed by a pool of
+    threads. The heavy lifting is done by numpy and scipy, which release the
+    GIL, and the kriging instance does not need to be copied into the
+    workers.
+
+    Returns
+    -------
+    z : numpy.ndarray
+        concatenated estimations
+    sigma : numpy.ndarray
+        concatenated kriging variances
+    errors : numpy.ndarray
+        summed error counts
+
+    """
+    # without targets, func gets one empty chunk and returns empty
+    # arrays and zero error counts
+    chunks = list(_chunks(n, chunk_size=chunk_size)) or [np.arange(0)]
+
+    if n_jobs is None or n_jobs == 1:
+        results = list(map(func, chunks))
+    else:
+        with ThreadPool(n_jobs) as p:
+            results = p.map(func, chunks)
+
+    z = np.concatenate([r[0] for r in results])
+    sigma = np.concatenate([r[1] for r in results])
+    errors = np.sum([r[2] for r in results], axis=0)
+
+    return z, sigma, errors
+
+
 class OrdinaryKriging:
     def __init__(
             self,
@@ -41,7 +97,8 @@ class OrdinaryKriging:
             precision=100,
             solver='inv',
             n_jobs=1,
-            perf=False
+            perf=False,
+            chunk_size=None
     ):
         """Ordinary Kriging routine
 
@@ -83,11 +140,19 @@ class OrdinaryKriging:
         solver : str
             Do not change this argument
         n_jobs : int
-            Number of processes to be started in multiprocessing.
+            Number of threads used to process the chunks of unobserved
+            locations in parallel.
         perf : bool
             If True, the different parts of the algorithm will record their
             processing time. This is meant to be used for optimization and
             will be removed in a future version. Do not rely on this argument.
+        chunk_size : int
+            .. versionadded:: 0.5.0
+
+            Number of unobserved locations processed at once. The distances
+            between these locations and the observations are only held in
+            memory for one chunk. If None (default), all locations are
+            processed as one chunk.
 
         """
         # store arguments to the instance
@@ -103,6 +168,7 @@ class OrdinaryKriging:
 
         # general settings
         self.n_jobs = n_jobs
+        self.chunk_size = chunk_size
         self.perf = perf
 
         params = self.V.describe()
@@ -112,6 +178,7 @@ class OrdinaryKriging:
 
         # coordinates and semivariance function
         self.coords, self.values = self._get_coordinates_and_values()
+        self.coords = self._transform_coordinates(self.coords)
         self.gamma_model = self.V.fitted_model
         self.z = None
 
@@ -146,6 +213,15 @@ class OrdinaryKriging:
     @property
     def dist_metric(self):
         return self.V._dist_func_name
+
+    def _transform_coordinates(self, coords):
+        """
+        Apply the coordinate transform of the Variogram, if any, to
+        the given coordinates before the distances are calculated.
+        """
+        if self.V.coordinate_transform is None:
+            return coords
+        return np.asarray(self.V.coordinate_transform(coords))
                
     def _get_coordinates_and_values(self):
         """Extract the coordinates and values
@@ -279,20 +355,19 @@ class OrdinaryKriging:
         if self.perf:
             self.perf_dist, self.perf_mat, self.perf_solv = [], [], []
 
-        self.transform_coordinates = np.column_stack(x)
-        self.transform_dists = scipy.spatial.distance.cdist(self.transform_coordinates, self.coords, metric=self.dist_metric)
-        
-        # DEV: this is dirty, not sure how to do it better at the moment
-        self.sigma = np.empty(len(x[0]))
-        self.__sigma_index = 0
-        # if multi-core, than here
-        if self.n_jobs is None or self.n_jobs == 1:
-            z = np.fromiter(map(self._estimator, range(len(self.transform_coordinates))), dtype=float)
-        else:
-            def f(idxs):
-                return self._estimator(idxs)
-            with Pool(self.n_jobs) as p:
-                z = p.starmap(f, range(len(self.transform_coordinates)))
+        self.transform_coordinates = self._transform_coordinates(
+            np.column_stack(x)
+        )
+
+        # process the locations in chunks, optionally in parallel
+        z, self.sigma, errors = _map_chunks(
+            self._estimate_chunk,
+            len(self.transform_coordinates),
+            chunk_size=self.chunk_size,
+            n_jobs=self.n_jobs
+        )
+        self.singular_error, self.no_points_error, self.ill_matrix = \
+            [int(e) for e in errors]
 
         # print warnings
         if self.singular_error > 0:
@@ -309,34 +384,53 @@ class OrdinaryKriging:
 
         return np.array(z)
 
-    def _estimator(self, idx):
+    def _estimate_chunk(self, idx):
         """Estimation wrapper
 
-        Wrapper around OrdinaryKriging._krige function to build the point of
-        interest for arbitrary number of dimensions. SingularMatrixError and
-        LessPointsError are handled and the error counters are increased. In
-        both cases numpy.NaN will be used as estimate.
+        Wrapper around OrdinaryKriging._krige function to estimate a chunk
+        of unobserved locations. The distances to the observations are
+        calculated for the whole chunk at once. SingularMatrixError,
+        LessPointsError and IllMatrixError are handled and counted. In
+        these cases numpy.NaN will be used as estimate.
 
-        """
-        try:
-            z, sigma = self._krige(idx)
-        except SingularMatrixError:
-            self.singular_error += 1
-            return np.nan
-        except LessPointsError:
-            self.no_points_error += 1
-            return np.nan
-        except IllMatrixError:
-            self.ill_matrix += 1
-            return np.nan
-
-        # TODO: This is a side-effect and I need to re-design this part:
-        self.sigma[self.__sigma_index] = sigma
-        self.__sigma_index += 1
+        Parameters
+        ----------
+        idx : numpy.ndarray
+            Index array into self.transform_coordinates
 
-        return z
+        Returns
+        -------
+        z : numpy.ndarray
+            estimations for the chunk
+        sigma : numpy.ndarray
+            kriging variances for the chunk
+        errors : numpy.ndarray
+            counts of singular, not enough points and ill-conditioned
+            errors in this order
 
-    def _krige(self, idx):
+        """
+        points = self.transform_coordinates[idx]
+        dists = scipy.spatial.distance.cdist(
+            points, self.coords, metric=self.dist_metric
+        )
+
+        z = np.ones(len(idx)) * np.nan
+        sigma = np.ones(len(idx)) * np.nan
+        errors = np.zeros(3, dtype=int)
+
+        for i in range(len(idx)):
+            try:
+                z[i], sigma[i] = self._krige(points[i], dists[i])
+            except SingularMatrixError:
+                errors[0] += 1
+            except LessPointsError:
+                errors[1] += 1
+            except IllMatrixError:
+                errors[2] += 1
+
+        return z, sigma, errors
+
+    def _krige(self, p, dists):
         """Algorithm
 
         Kriging algorithm for one point. This is the place, where the
@@ -344,8 +438,10 @@ class OrdinaryKriging:
 
         Parameters
         ----------
-        idx : int
-            Index into self.transform_* arrays for an unobserved location
+        p : numpy.ndarray
+            Coordinates of the unobserved location
+        dists : numpy.ndarray
+            Distances from p to all observation locations
 
         Raises
         ------
@@ -389,9 +485,6 @@ class OrdinaryKriging:
         if self.perf:
             t0 = time.time()
 
-        p = self.transform_coordinates[idx,:]
-        dists = self.transform_dists[idx,:]
-        
         # find all points within the search distance
         idx = np.where(dists <= self.range)[0]
 
@@ -511,3 +604,340 @@ class OrdinaryKriging:
         g[in_] = self._prec_g[dist_n[in_]]
 
         return g
+
+
+class SpaceTimeOrdinaryKriging:
+    def __init__(
+            self,
+            variogram,
+            min_points=5,
+            max_points=15,
+            xradius=None,
+            tradius=None,
+            n_jobs=1,
+            chunk_size=1000
+    ):
+        """Space-time Ordinary Kriging routine
+
+        Ordinary kriging estimator derived from the fitted model of the given
+        :class:`SpaceTimeVariogram <skgstat.SpaceTimeVariogram>`. To
+        calculate estimations for unobserved locations in space and time, an
+        instance of this class can either be called, or the
+        `SpaceTimeOrdinaryKriging.transform` method can be used.
+
+        .. versionadded:: 0.5.0
+
+        Parameters
+        ----------
+        variogram : SpaceTimeVariogram
+            Space-time variogram used to build the kriging matrix. Its
+            :func:`fitted_model <skgstat.SpaceTimeVariogram.fitted_model>`
+            is used to calculate all semi-variances.
+        min_points : int
+            Minimum amount of observations, that have to lie within the
+            spatial and temporal search radius. In case not enough
+            observations are available, the estimation will be rejected and
+            a null value will be estimated.
+        max_points : int
+            Maximum amount of observations, that will be considered for the
+            estimation of one unobserved location. In case more observations
+            are available within the search radius, the `max_points` with
+            the lowest modeled semi-variance are used.
+        xradius : float
+            Maximum spatial search radius. If None (default), the effective
+            range of the space marginal variogram is used.
+        tradius : float
+            Maximum temporal search radius, given in time steps. If None
+            (default), the effective range of the time marginal variogram is
+            used.
+        n_jobs : int
+            Number of threads used to process the chunks of unobserved
+            locations in parallel.
+        chunk_size : int
+            Number of unobserved locations processed at once. All
+            semi-variances needed for one chunk are calculated by one call
+            of the vectorized space-time model. If None, all locations are
+            processed as one chunk.
+
+        """
+        if not isinstance(variogram, SpaceTimeVariogram):
+            raise TypeError(
+                'variogram has to be of type skgstat.SpaceTimeVariogram.'
+            )
+
+        # check the points
+        if not isinstance(min_points, int) or not isinstance(max_points, int):
+            raise ValueError('min_points and max_points have to be integers.')
+        if min_points < 0:
+            raise ValueError('min_points can\'t be negative.')
+        if min_points > max_points:
+            raise ValueError('min_points can\'t be larger than max_points.')
+
+        # general attributes
+        self.V = variogram
+        self.min_points = min_points
+        self.max_points = max_points
+
+        # general settings
+        self.n_jobs = n_jobs
+        self.chunk_size = chunk_size
+
+        # search radius
+        if xradius is None:
+            xradius = self.V.XMarginal.describe()['effective_range']
+        if tradius is None:
+            tradius = self.V.TMarginal.describe()['effective_range']
+        self.xradius = xradius
+        self.tradius = tradius
+
+        # observations and semivariance function
+        self.coords, self.values = self._get_coordinates_and_values()
+        self.times = np.arange(self.values.shape[1], dtype=float)
+        self.gamma_model = self.V.fitted_model
+        self.z = None
+        self.sigma = None
+
+        # the observation distances in space are needed for every matrix
+        self._xdist_mat = squareform(
+            pdist(self.coords, metric=self.dist_metric)
+        )
+
+        # initialize error counter
+        self.singular_error = 0
+        self.no_points_error = 0
+
+    @property
+    def dist_metric(self):
+        return self.V._xdist_func_name
+
+    def _get_coordinates_and_values(self):
+        """Extract the coordinates and values
+
+        The coordinates and values array is extracted from the
+        SpaceTimeVariogram instance. Duplicated coordinates are removed and
+        only the time series of the first instance is used, as duplicated
+        coordinates would make the kriging matrix singular.
+
+        Returns
+        -------
+        coords : numpy.array
+            copy of SpaceTimeVariogram coordinates without duplicates
+        values : numpy.array
+            copy of SpaceTimeVariogram.values without duplicates
+
+        """
+        c = np.asarray(self.V._X, dtype=float).copy()
+        v = np.asarray(self.V.values, dtype=float).copy()
+
+        if c.ndim == 1:
+            c = c.reshape(-1, 1)
+
+        _, idx = np.unique(c, axis=0, return_index=True)
+        idx.sort()
+
+        return c[idx], v[idx]
+
+    def __call__(self, *x):
+        return self.transform(*x)
+
+    def transform(self, *x):
+        """Kriging
+
+        Returns an estimation of the observable for the given unobserved
+        locations in space and time. Each coordinate dimension and the time
+        should be a 1D array. The time is given in time steps of the
+        SpaceTimeVariogram.values second axis and can be fractional.
+
+        Parameters
+        ----------
+        x : numpy.array
+            One 1D array for each coordinate dimension, followed by one 1D
+            array of time steps. Typically x, y, t are passed.
+
+        Returns
+        -------
+        Z : numpy.array
+            Array of estimates
+
+        """
+        if len(x) < 2:
+            raise ValueError(
+                'Pass one array per coordinate dimension and a time array.'
+            )
+
+        self.transform_coordinates = np.column_stack(x[:-1]).astype(float)
+        self.transform_times = np.asarray(x[-1], dtype=float).flatten()
+
+        if self.transform_coordinates.shape[1] != self.coords.shape[1]:
+            raise ValueError(
+                'The coordinates need %d dimensions.' % self.coords.shape[1]
+            )
+
+        z, self.sigma, errors = _map_chunks(
+            self._estimate_chunk,
+            len(self.transform_times),
+            chunk_size=self.chunk_size,
+            n_jobs=self.n_jobs
+        )
+        self.singular_error, self.no_points_error = [int(e) for e in errors]
+
+        # print warnings
+        if self.singular_error > 0:
+            print('Warning: %d kriging matrices were singular.' % self.singular_error)
+        if self.no_points_error > 0:
+            print('Warning: for %d locations, not enough neighbors were '
+                  'found within the search radius.' % self.no_points_error)
+
+        self.z = z
+        return z
+
+    def _neighbours(self, xdists, tdists):
+        """Neighbourhood search
+
+        Find all observations within the spatial and temporal search radius
+        of one unobserved location. Observations of missing values are
+        ignored.
+
+        Returns
+        -------
+        station : numpy.ndarray
+            index of the observation location
+        step : numpy.ndarray
+            index of the observation time step
+
+        """
+        xidx = np.flatnonzero(xdists <= self.xradius)
+        tidx = np.flatnonzero(tdists <= self.tradius)
+
+        station = np.repeat(xidx, len(tidx))
+        step = np.tile(tidx, len(xidx))
+
+        valid = ~np.isnan(self.values[station, step])
+        return station[valid], step[valid]
+
+    def _estimate_chunk(self, idx):
+        """Estimate a chunk of unobserved locations
+
+        All kriging systems of the chunk are assembled in batches. At first,
+        the semi-variances between all unobserved locations and their
+        candidate observations are modeled by one call of the space-time
+        model. The `max_points` observations of lowest semi-variance are
+        used. Then, the semi-variances between all selected observations of
+        all systems are modeled by a second call. Systems of same size are
+        solved at once.
+
+        Parameters
+        ----------
+        idx : numpy.ndarray
+            Index array into the transform_* arrays
+
+        Returns
+        -------
+        z : numpy.ndarray
+            estimations for the chunk
+        sigma : numpy.ndarray
+            kriging variances for the chunk
+        errors : numpy.ndarray
+            counts of singular and not enough points errors
+
+        """
+        n = len(idx)
+        z = np.ones(n) * np.nan
+        sigma = np.ones(n) * np.nan
+        errors = np.zeros(2, dtype=int)
+
+        xdists = scipy.spatial.distance.cdist(
+            self.transform_coordinates[idx], self.coords,
+            metric=self.dist_metric
+        )
+        tdists = np.abs(
+            self.transform_times[idx][:, None] - self.times[None, :]
+        )
+
+        # neighbourhood search for the whole chunk
+        candidates = [self._neighbours(xdists[i], tdists[i]) for i in range(n)]
+        counts = np.fromiter((len(s) for s, _ in candidates), dtype=int)
+        if counts.sum() == 0:
+            errors[1] = n
+            return z, sigma, errors
+
+        # model the semi-variances to all candidates at once
+        lags = np.column_stack((
+            np.concatenate([xdists[i, s] for i, (s, _) in enumerate(candidates)]),
+            np.concatenate([tdists[i, t] for i, (_, t) in enumerate(candidates)])
+        ))
+        g = np.split(self.gamma_model(lags), np.cumsum(counts)[:-1])
+
+        # select the neighbours of lowest semi-variance
+        systems = []
+        for i in range(n):
+            if counts[i] < self.min_points or counts[i] == 0:
+                errors[1] += 1
+                continue
+            station, step = candidates[i]
+            if counts[i] > self.max_points:
+                sel = np.argsort(g[i], kind='stable')[:self.max_points]
+                station, step, gi = station[sel], step[sel], g[i][sel]
+            else:
+                gi = g[i]
+            systems.append((i, station, step, gi))
+
+        if len(systems) == 0:
+            return z, sigma, errors
+
+        # model the semi-variances between the selected observations at once
+        triu = [np.triu_indices(len(s[1]), k=1) for s in systems]
+        lags = np.column_stack((
+            np.concatenate([
+                self._xdist_mat[st[r], st[c]]
+                for (_, st, _, _), (r, c) in zip(systems, triu)
+            ]),
+            np.concatenate([
+                np.abs(self.times[tt[r]] - self.times[tt[c]])
+                for (_, _, tt, _), (r, c) in zip(systems, triu)
+            ])
+        ))
+        sizes = np.fromiter((len(r) for r, _ in triu), dtype=int)
+        if lags.size > 0:
+            G = np.split(self.gamma_model(lags), np.cumsum(sizes)[:-1])
+        else:
+            G = [np.empty(0) for _ in systems]
+
+        # group the systems by size and solve each group at once
+        by_size = dict()
+        for j, (_, station, _, _) in enumerate(systems):
+            by_size.setdefault(len(station), []).append(j)
+
+        for k, members in by_size.items():
+            a = np.ones((len(members), k + 1, k + 1))
+            b = np.ones((len(members), k + 1))
+            for m, j in enumerate(members):
+                r, c = triu[j]
+                a[m, r, c] = G[j]
+                a[m, c, r] = G[j]
+                a[m, np.arange(k), np.arange(k)] = 0
+                b[m, :k] = systems[j][3]
+            a[:, -1, -1] = 0
+
+            try:
+                w = numpy_solve(a, b[..., None])[..., 0]
+                solved = np.ones(len(members), dtype=bool)
+            except LinAlgError:
+                # find the singular systems one by one
+                w = np.ones((len(members), k + 1)) * np.nan
+                solved = np.zeros(len(members), dtype=bool)
+                for m in range(len(members)):
+                    try:
+                        w[m] = numpy_solve(a[m], b[m])
+                        solved[m] = True
+                    except LinAlgError:
+                        errors[0] += 1
+
+            for m, j in enumerate(members):
+                if not solved[m]:
+                    continue
+                i, station, step, _ = systems[j]
+                z[i] = w[m, :k].dot(self.values[station, step])
+                sigma[i] = w[m, :k].dot(b[m, :k]) + w[m, -1]
+
+        return z, sigma, errors
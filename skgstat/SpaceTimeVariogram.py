@@ -4,7 +4,6 @@
 import numpy as np
 from scipy.spatial.distance import pdist
 from scipy.optimize import curve_fit
-import matplotlib.pyplot as plt
 import inspect
 
 from skgstat import binning, estimators, Variogram, stmodels, plotting
@@ -41,8 +40,11 @@ class SpaceTimeVariogram:
         # set attributes to be fulled during calculation
         self.cov = None
         self.cof = None
-        self.XMarginal = None
-        self.TMarginal = None
+        self._XMarginal = None
+        self._TMarginal = None
+
+        # sufficient statistics per lag class for incremental updates
+        self._lag_stats = None
 
         # set values
         self._values = None
@@ -54,7 +56,9 @@ class SpaceTimeVariogram:
 
         # set distance calculation functions
         self._xdist_func = None
+        self._xdist_func_name = None
         self._tdist_func = None
+        self._tdist_func_name = None
         self.set_xdist_func(func_name=xdist_func)
         self.set_tdist_func(func_name=tdist_func)
 
@@ -164,17 +168,99 @@ class SpaceTimeVariogram:
 
         # dismiss the pairwise differences, and lags
         self._diff = None
+        self._lag_stats = None
 
         # recreate the space marginal variogram
-        if self.XMarginal is not None:
+        if self._XMarginal is not None:
             self.create_XMarginal()
-        if self.TMarginal is not None:
+        if self._TMarginal is not None:
             self.create_TMarginal()
 
     @values.setter
     def values(self, new_values):
         self.set_values(values=new_values)
 
+    def append_timesteps(self, new_values, window=None):
+        """Append new time steps
+
+        .. versionadded:: 0.5.0
+
+        Append one or more new observations on the time axis for all
+        locations. Unlike :func:`set_values <skgstat.SpaceTimeVariogram.set_values>`,
+        the experimental variogram is not recalculated from scratch. For
+        the `'matheron'` and `'cressie'` estimator, the sufficient
+        statistics of each lag class are updated using only the point pairs
+        that involve the new time steps. Thus, the costs of an update do
+        not depend on the length of the time series already observed.
+
+        If a `window` is given, the oldest time steps are retired, until
+        only `window` time steps are left. Their point pairs are removed
+        from the sufficient statistics as well. Note that the time lags are
+        always counted in time steps, thus the lag classes stay valid.
+
+        The marginal variograms are not updated, but will be re-created on
+        their next usage. Other estimators will fall back to a full
+        recalculation on the next usage.
+
+        Parameters
+        ----------
+        new_values : numpy.ndarray
+            Array of shape (m, k) with m matching the size of the
+            coordinates first dimension and k new time steps. A 1D array of
+            size m is treated as one time step.
+        window : int
+            If not None, the maximum number of time steps kept. Has to be
+            at least 2.
+
+        Raises
+        ------
+        ValueError : in case the new_values do not match the coordinates,
+            or the window is smaller than 2.
+
+        """
+        new_values = np.asarray(new_values, dtype=float)
+        if new_values.ndim == 1:
+            new_values = new_values.reshape(-1, 1)
+        if new_values.ndim != 2 or new_values.shape[0] != self._X.shape[0]:
+            raise ValueError('The values shape do not match coordinates.')
+        if window is not None and window < 2:
+            raise ValueError('A SpaceTimeVariogram needs more than one '
+                             'observation on the time axis.')
+
+        # make sure the statistics of the current time steps exist
+        if self._use_lag_stats():
+            self._calc_lag_stats(force=False)
+
+        # append
+        n_old = self._values.shape[1]
+        self._values = np.concatenate((self._values, new_values), axis=1)
+        n = self._values.shape[1]
+
+        if self._lag_stats is not None:
+            for tj in range(n_old, n):
+                self._accumulate_lag_stats(np.arange(tj), tj)
+
+        # retire the oldest time steps
+        if window is not None and n > window:
+            n_retire = n - window
+            if self._lag_stats is not None:
+                for ti in range(n_retire):
+                    self._accumulate_lag_stats(
+                        ti, np.arange(ti + 1, n), sign=-1
+                    )
+            self._values = self._values[:, n_retire:]
+
+        # dismiss everything depending on the time axis
+        self._diff = None
+        self._tdist = None
+        self._tbins = None
+        self._tgroups = None
+        self.cof, self.cov = None, None
+
+        # the marginals are re-created on their next usage
+        self._XMarginal = None
+        self._TMarginal = None
+
     @property
     def xdist_func(self):
         return self._xdist_func
@@ -203,6 +289,7 @@ class SpaceTimeVariogram:
 
         """
         if isinstance(func_name, str):
+            self._xdist_func_name = func_name
             self._xdist_func = lambda x: pdist(x, metric=func_name)
         else:
             raise ValueError('For now only str arguments are supported.')
@@ -241,6 +328,7 @@ class SpaceTimeVariogram:
 
         """
         if isinstance(func_name, str):
+            self._tdist_func_name = func_name
             self._tdist_func = lambda t: pdist(t, metric=func_name)
         else:
             raise ValueError('For now only str arguments are supported.')
@@ -574,25 +662,8 @@ class SpaceTimeVariogram:
         self.cof, self.cov = None, None
 
         if isinstance(estimator_name, str):
-            if estimator_name.lower() == 'matheron':
-                self._estimator = estimators.matheron
-            elif estimator_name.lower() == 'cressie':
-                self._estimator = estimators.cressie
-            elif estimator_name.lower() == 'dowd':
-                self._estimator = estimators.dowd
-            elif estimator_name.lower() == 'genton':
-                self._estimator = estimators.genton
-            elif estimator_name.lower() == 'minmax':
-                self._estimator = estimators.minmax
-            elif estimator_name.lower() == 'percentile':
-                self._estimator = estimators.percentile
-            elif estimator_name.lower() == 'entropy':
-                self._estimator = estimators.entropy
-            else:
-                raise ValueError(
-                    ('Variogram estimator %s is not understood, please' +
-                    'provide the function.') % estimator_name
-                )
+            # look up the registered estimators
+            self._estimator = estimators.get_estimator(estimator_name)
         elif callable(estimator_name):
             self._estimator = estimator_name
         else:
@@ -644,6 +715,38 @@ class SpaceTimeVariogram:
         else:
             raise ValueError('model_name has to be a string or callable.')
 
+    @property
+    def XMarginal(self):
+        """Space marginal variogram
+
+        Instance of :class:`Variogram <skgstat.Variogram>` for the space
+        marginal variogram. It is created on first usage.
+
+        """
+        if self._XMarginal is None:
+            self.create_XMarginal()
+        return self._XMarginal
+
+    @XMarginal.setter
+    def XMarginal(self, variogram):
+        self._XMarginal = variogram
+
+    @property
+    def TMarginal(self):
+        """Time marginal variogram
+
+        Instance of :class:`Variogram <skgstat.Variogram>` for the time
+        marginal variogram. It is created on first usage.
+
+        """
+        if self._TMarginal is None:
+            self.create_TMarginal()
+        return self._TMarginal
+
+    @TMarginal.setter
+    def TMarginal(self, variogram):
+        self._TMarginal = variogram
+
     def create_XMarginal(self):
         """
         Create an instance of skgstat.Variogram for the space marginal variogram
@@ -651,7 +754,7 @@ class SpaceTimeVariogram:
         this SpaceTimeVariogram instance.
 
         """
-        self.XMarginal = Variogram(
+        self._XMarginal = Variogram(
             np.vstack([self._X] * self._values.shape[1]),
             self._values.T.flatten()
         )
@@ -668,7 +771,7 @@ class SpaceTimeVariogram:
             np.arange(self._values.shape[1]),
             [0] * self._values.shape[1]
         ), axis=1)
-        self.TMarginal = Variogram(
+        self._TMarginal = Variogram(
             np.vstack([coords] * self._values.shape[0]),
             self._values.flatten()
         )
@@ -682,7 +785,7 @@ class SpaceTimeVariogram:
 
         """
         # if not marginal variogram is set, return
-        if self.XMarginal is None:
+        if self._XMarginal is None:
             return
 
         # distance
@@ -706,7 +809,7 @@ class SpaceTimeVariogram:
 
         """
         # if no marginal variogram is set, return
-        if self.TMarginal is None:
+        if self._TMarginal is None:
             return
 
         # distance
@@ -792,11 +895,151 @@ class SpaceTimeVariogram:
             for t in range(self.t_lags):
                 yield diff_select(x, t).flatten()
 
+    def _use_lag_stats(self):
+        """
+        The matheron and cressie estimator can be calculated from sufficient
+        statistics of each lag class, as long as the time distance is the
+        absolute difference of time steps.
+        """
+        return self.estimator in (estimators.matheron, estimators.cressie) and \
+            self._tdist_func_name in ('euclidean', 'cityblock', 'chebyshev')
+
+    def _calc_lag_stats(self, force=False):
+        """Calculate sufficient lag class statistics
+
+        .. versionadded:: 0.5.0
+
+        Calculates the count, the sum of squares and the sum of square roots
+        of the pairwise differences for each combination of spatial lag
+        class and time step lag. The time lags are not binned, therefore the
+        statistics do not depend on the temporal binning. Pairwise
+        differences of missing values are ignored.
+        The statistics are cached and only recalculated if the spatial lag
+        classes changed.
+
+        Parameters
+        ----------
+        force : bool
+            If True, any cached statistics will be recalculated.
+
+        """
+        xgrp = self.lag_groups(axis='space')
+
+        if not force and self._lag_stats is not None and \
+                self._lag_stats['xgroups'] is xgrp:
+            return
+
+        n = self.values.shape[1]
+        n_x = len(self.xbins)
+        xi, xj = np.triu_indices(self._X.shape[0], k=1)
+
+        self._lag_stats = dict(
+            xgroups=xgrp,
+            xi=xi,
+            xj=xj,
+            count=np.zeros((n_x, n)),
+            sq=np.zeros((n_x, n)),
+            sqrt=np.zeros((n_x, n))
+        )
+
+        for tj in range(1, n):
+            self._accumulate_lag_stats(np.arange(tj), tj)
+
+    def _accumulate_lag_stats(self, ti, tj, sign=1):
+        """
+        Add (sign=1) or remove (sign=-1) the pairwise differences of the
+        time step pairs ti < tj to the sufficient lag class statistics.
+        Like in :func:`_calc_diff <skgstat.SpaceTimeVariogram._calc_diff>`
+        the pairs are formed from the values of the first location at ti
+        and the second location at tj.
+        """
+        stats = self._lag_stats
+        ti, tj = np.broadcast_arrays(np.atleast_1d(ti), np.atleast_1d(tj))
+        xi, xj = stats['xi'], stats['xj']
+
+        # pairwise differences of shape (space pairs, time pairs)
+        d = np.abs(self._values[xi[:, None], ti] - self._values[xj[:, None], tj])
+        dt = np.broadcast_to(tj - ti, d.shape)
+        g = np.broadcast_to(stats['xgroups'][:, None], d.shape)
+        valid = (g >= 0) & ~np.isnan(d)
+
+        # grow the time lag axis if needed
+        n_x, n_dt = stats['count'].shape
+        if dt.max() >= n_dt:
+            pad = ((0, 0), (0, dt.max() + 1 - n_dt))
+            for key in ('count', 'sq', 'sqrt'):
+                stats[key] = np.pad(stats[key], pad, mode='constant')
+            n_dt = dt.max() + 1
+
+        idx = g[valid] * n_dt + dt[valid]
+        d = d[valid]
+        size = n_x * n_dt
+        count, sq, sqrt = estimators.lag_sums(d, idx.astype(np.int64), size)
+        stats['count'] += sign * count.reshape(n_x, n_dt)
+        stats['sq'] += sign * sq.reshape(n_x, n_dt)
+        stats['sqrt'] += sign * sqrt.reshape(n_x, n_dt)
+
+    def _experimental_from_lag_stats(self):
+        """
+        Aggregate the sufficient lag class statistics over the temporal
+        lag classes and apply the matheron or cressie estimator.
+        """
+        self._calc_lag_stats(force=False)
+        stats = self._lag_stats
+
+        # find the temporal lag class of each time step lag
+        n_dt = stats['count'].shape[1]
+        bins = np.asarray(self.tbins)
+        dt = np.arange(n_dt)
+        tgrp = np.searchsorted(bins, dt, side='left')
+        tgrp[(dt <= 0) | (dt > bins[-1])] = -1
+
+        # sum up all time step lags of each temporal lag class
+        onehot = np.zeros((n_dt, self.t_lags))
+        inside = np.flatnonzero((tgrp >= 0) & (tgrp < self.t_lags))
+        onehot[inside, tgrp[inside]] = 1.
+
+        x_lags = self.x_lags
+        n = stats['count'][:x_lags].dot(onehot)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if self.estimator is estimators.matheron:
+                z = stats['sq'][:x_lags].dot(onehot) / (2 * n)
+            else:
+                nominator = np.power(stats['sqrt'][:x_lags].dot(onehot) / n, 4)
+                denominator = 0.457 + (0.494 / n) + (0.045 / n**2)
+                z = nominator / (2 * denominator)
+
+        z[n < 0.5] = np.nan
+        return z.flatten()
+
     def _get_experimental(self):
+        # use the sufficient statistics if possible
+        if self._use_lag_stats():
+            return self._experimental_from_lag_stats()
+
         # TODO: fix this
         if self.estimator.__name__ == 'entropy':
             raise NotImplementedError
 
+        # estimators with a grouped form calculate all lag classes at once
+        grouped = estimators.get_grouped_estimator(self.estimator)
+        if grouped is not None:
+            if self._diff is None:
+                self._calc_diff(force=False)
+            xgrp = np.asarray(self.lag_groups(axis='space'))
+            tgrp = np.asarray(self.lag_groups(axis='time'))
+
+            # combined lag class index, space lags are the outer axis
+            groups = xgrp[:, None] * self.t_lags + tgrp[None, :]
+            outside = (xgrp[:, None] < 0) | (xgrp[:, None] >= self.x_lags) | \
+                (tgrp[None, :] < 0) | (tgrp[None, :] >= self.t_lags)
+            groups[outside] = -1
+
+            return np.asarray(grouped(
+                self._diff.ravel(), groups.ravel(), self.x_lags * self.t_lags
+            ), dtype=float)
+
         # this might
         z = np.fromiter(
             (self.estimator(vals) for vals in self.lag_classes()),
@@ -987,10 +1230,16 @@ class SpaceTimeVariogram:
         # recalculate distances
         self.__calc_xdist(force=force)
         self.__calc_tdist(force=force)
-        self._calc_diff(force=force)
         self._calc_group(axis='space', force=force)
         self._calc_group(axis='time', force=force)
 
+        # the pairwise differences are only needed if the estimator
+        # cannot be calculated from sufficient statistics
+        if self._use_lag_stats():
+            self._calc_lag_stats(force=force)
+        else:
+            self._calc_diff(force=force)
+
     # ------------------------------------------------------------------------ #
     #                              FITTING                                     #
     # ------------------------------------------------------------------------ #
@@ -2,18 +2,27 @@
 Variogram class
 """
 import copy
+import hashlib
+import json
+import os
 import warnings
 
 import numpy as np
-from pandas import DataFrame
 from scipy.optimize import curve_fit, minimize, OptimizeWarning
 from scipy.spatial.distance import pdist, squareform
-from scipy import stats 
-from sklearn.isotonic import IsotonicRegression
 
 from skgstat import estimators, models, binning
 from skgstat import plotting
-from skgstat.util import shannon_entropy
+from skgstat.util import grouped_histogram, shannon_entropy_from_counts, read_only_view
+
+
+def _read_store_meta(path):
+    """Read the meta data of a preprocessing store, None if missing"""
+    try:
+        with open(os.path.join(path, 'meta.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
 
 
 class Variogram(object):
@@ -173,9 +182,13 @@ class Variogram(object):
             Note maxlag=0.5 will use half the maximum separating distance,
             this is not the same as 'median', which is the median of all
             separating distances
-        n_lags : int
+        n_lags : int, str
             Specify the number of lag classes to be defined by the binning
             function.
+
+            .. versionchanged:: 0.5.0
+                Pass `'fit'` or `'stable'` to optimize the number of lag
+                classes. See :func:`optimize_n_lags <skgstat.Variogram.optimize_n_lags>`.
         verbose : bool
             Set the Verbosity of the class. Not Implemented yet.
 
@@ -192,6 +205,14 @@ class Variogram(object):
 
             If the `estimator <skgstat.Variogram.estimator>` is set to 
             `'entropy'` this argument sets the percentile to be used.
+        genton_max_pairs : int
+            .. versionadded:: 0.5.0
+
+            If the `estimator <skgstat.Variogram.estimator>` is set to
+            `'genton'` and a lag class has more point pairs than this
+            number, the estimator is approximated from a random sample of
+            point pairs. See :func:`genton <skgstat.estimators.genton>`
+            for the error bound.
         binning_random_state : int, None
             .. versionadded:: 0.3.9
 
@@ -200,75 +221,152 @@ class Variogram(object):
             centroids. Note, that K-Means is not deterministic and is therefore
             seeded to 42 here. You can pass `None` to disable this behavior,
             but use it with care, as you will get different results.
+
+            .. versionchanged:: 0.5.0
+                K-Means is solved exactly. The seed is only used for the
+                random sample of `binning_subsample`.
+        binning_max_points : int
+            .. versionadded:: 0.5.0
+
+            If :func:`bin_func <skgstat.Variogram.set_bin_func>` is
+            `'kmeans'` or `'ward'` and there are more distances, they are
+            compressed into this many histogram bins before clustering.
+            Defaults to 1e6, pass None to always cluster exactly.
+        n_lags_candidates : list
+            .. versionadded:: 0.5.0
+
+            Candidate numbers of lag classes, if `n_lags` is `'fit'` or
+            `'stable'`. Defaults to 3 to 30.
+        n_lags_max_rse : float
+            .. versionadded:: 0.5.0
+
+            Largest relative standard error of the semi-variance of each lag
+            class, if `n_lags='stable'`. Defaults to 0.25.
+        binning_sketch_alpha : float
+            .. versionadded:: 0.5.0
+
+            If set, the lag classes are derived from a
+            :class:`DistanceSketch <skgstat.binning.DistanceSketch>` with
+            this relative error, instead of sorting all distances. Used
+            for `'even'`, `'uniform'`, `'fd'`, `'scott'`, `'sturges'`,
+            `'sqrt'`, `'kmeans'` and `'ward'` binning.
         binning_agg_func : str
             .. versionadded:: 0.3.10
 
             If :func:`bin_func <skgstat.Variogram.set_bin_func>` is `'ward'`
             this keyword argument can switch from default mean aggregation to
             median aggregation for calculating the cluster centroids.
+        preprocessing_store : str
+            .. versionadded:: 0.5.0
+
+            Path to a directory used as preprocessing store. If the store
+            was saved for the same coordinates, values and `dist_func`,
+            the distances and pairwise differences (and for a Variogram
+            with the same binning settings the bins and lag groups) are
+            loaded memory-mapped from the store instead of being
+            calculated. Otherwise, they are calculated and saved. See
+            :func:`save_preprocessing <skgstat.Variogram.save_preprocessing>`.
 
         """
-        # Before we do anything else, make kwargs available
-        self._kwargs = self._validate_kwargs(**kwargs)
+        # Before we do anything else, set all attributes to an empty state
+        self._init_attributes(**kwargs)
 
         # Set coordinates
         self._X = np.asarray(coordinates)
 
-        # pairwise differences
-        self._diff = None
-
         # set verbosity
         self.verbose = verbose
 
         # set values
-        self._values = None
         # calc_diff = False here, because it will be calculated by fit() later
         self.set_values(values=values, calc_diff=False)
 
-        # distance matrix
-        self._dist = None
-
         # set distance calculation function
-        self._dist_func_name = None
         self.set_dist_function(func=dist_func)
 
         # lags and max lag
         self._n_lags_passed_value = n_lags
-        self._n_lags = None
         self.n_lags = n_lags
-        self._maxlag = None
         self.maxlag = maxlag
 
-        # harmonize model placeholder
-        self._harmonize = False
-
         # estimator can be a function or a string
-        self._estimator = None
         self.set_estimator(estimator_name=estimator)
 
         # model can be a function or a string
-        self._model = None
         self.set_model(model_name=model)
 
         # the binning settings
-        self._bin_func_name = None
-        self._bin_func = None
-        self._groups = None
-        self._bins = None
         self.set_bin_func(bin_func=bin_func)
 
         # specify if the lag should be given absolute or relative to the maxlag
         self._normalized = normalize
 
         # set if nugget effect shall be used
-        self._use_nugget = None
         self.use_nugget = use_nugget
 
         # set the fitting method and sigma array
         self.fit_method = fit_method
-        self._fit_sigma = None
         self.fit_sigma = fit_sigma
 
+        # do the preprocessing and fitting upon initialization
+        # Note that fit() calls preprocessing
+        self.fit(force=True)
+
+    def _init_attributes(self, **kwargs):
+        """
+        Set all attributes to an empty state. Called by __init__ before the
+        parameters are set and by :func:`from_dict
+        <skgstat.Variogram.from_dict>`. Subclasses extend it by their own
+        attributes.
+        """
+        # make kwargs available
+        self._kwargs = self._validate_kwargs(**kwargs)
+
+        # experimental variogram and counts restored by from_dict
+        self._stored_experimental = None
+
+        # squareform matrices of distances and differences
+        self._square_cache = {}
+
+        # observations, pairwise differences and distances
+        self._X = None
+        self._values = None
+        self._diff = None
+        self._dist = None
+        self.verbose = False
+
+        # sorted or sketched distances of the binning pre-pass
+        self._binning_dist = None
+
+        # distance sorted prefix sums of the n_lags optimization
+        self._lag_prefix = None
+
+        # optional transform applied to the coordinates before distances
+        self._coordinate_transform = None
+
+        # distance function, lags and max lag
+        self._dist_func_name = None
+        self._n_lags_passed_value = None
+        self._n_lags = None
+        self._maxlag = None
+
+        # estimator, model and harmonize model placeholder
+        self._harmonize = False
+        self._estimator = None
+        self._model = None
+
+        # the binning settings
+        self._bin_func_name = None
+        self._bin_func = None
+        self._groups = None
+        self._bins = None
+
+        # fitting settings
+        self._normalized = False
+        self._use_nugget = None
+        self.fit_method = None
+        self._fit_sigma = None
+
         # set attributes to be filled during calculation
         self.cov = None
         self.cof = None
@@ -276,10 +374,6 @@ class Variogram(object):
         # settings, not reachable by init (not yet)
         self._cache_experimental = False
 
-        # do the preprocessing and fitting upon initialization
-        # Note that fit() calls preprocessing
-        self.fit(force=True)
-
     @property
     def coordinates(self):
         """Coordinates property
@@ -295,6 +389,42 @@ class Variogram(object):
         """
         return self._X
 
+    @property
+    def coordinate_transform(self):
+        """Coordinate transform
+
+        .. versionadded:: 0.5.0
+
+        Optional callable, that is applied to the coordinates before the
+        distances are calculated. It has to accept an array of shape
+        (m, d) and return the transformed coordinates.
+        :class:`OrdinaryKriging <skgstat.OrdinaryKriging>` applies the same
+        transform to the observation and target locations.
+        An :class:`Anisotropy <skgstat.Anisotropy>` instance can be used
+        to remove geometric anisotropy. Setting the transform will
+        re-calculate the distances and re-fit the variogram. Note that an
+        absolute maxlag refers to the transformed coordinates.
+
+        Returns
+        -------
+        func : callable, None
+
+        """
+        return self._coordinate_transform
+
+    @coordinate_transform.setter
+    def coordinate_transform(self, func):
+        if func is not None and not callable(func):
+            raise ValueError('The coordinate transform has to be callable.')
+        self._coordinate_transform = func
+
+        # reset the distances and binning and re-fit
+        self._dist = None
+        self._bins = None
+        self._groups = None
+        self.cof, self.cov = None, None
+        self.fit(force=True)
+
     @property
     def dim(self):
         """
@@ -336,6 +466,9 @@ class Variogram(object):
         Note that Variogram.values holds the values themselves, while the
         value_matrix consists of their pairwise differences.
 
+        .. versionchanged:: 0.5.0
+            the matrix is built once and returned as read-only view
+
         Returns
         -------
         values : numpy.matrix
@@ -346,7 +479,18 @@ class Variogram(object):
         Variogram._diff
 
         """
-        return squareform(self._diff)
+        self._calc_diff()
+        return self._square_matrix('value', self._diff)
+
+    def _square_matrix(self, name, condensed):
+        """
+        Squareform of the condensed array, cached until the array changes.
+        """
+        cached = self._square_cache.get(name)
+        if cached is None or cached[0] is not condensed:
+            cached = (condensed, read_only_view(squareform(condensed)))
+            self._square_cache[name] = cached
+        return cached[1]
 
     def set_values(self, values, calc_diff=True):
         """Set new values
@@ -524,6 +668,13 @@ class Variogram(object):
         merge pairs of clusters until there are only `n` remaining clusters.
         The merging is done by minimizing the variance for the merged cluster.
 
+        Both clusterings are exact. Only if there are more than
+        `binning_max_points` (default 1e6) distances up to maxlag, they are
+        compressed into that many weighted histogram bins and the clusters
+        are approximated. Pass `binning_max_points=None` to cluster all
+        distances, which needs `n_lags` integers per distance for
+        `'kmeans'`.
+
         **`'stable_entropy'`** will adjust `n` bin edges by minimizing the
         absolute differences between each lag's Shannon Entropy. This will
         lead to uneven bin widths. Each lag class value distribution will be
@@ -598,7 +749,7 @@ class Variogram(object):
             return binning.kmeans(distances, n, maxlag, **self._kwargs)
 
         elif self._bin_func_name.lower() == 'ward':
-            return binning.ward(distances, n, maxlag)
+            return binning.ward(distances, n, maxlag, **self._kwargs)
 
         elif self._bin_func_name.lower() == 'stable_entropy':
             return binning.stable_entropy_lags(distances, n, maxlag, **self._kwargs)
@@ -606,6 +757,39 @@ class Variogram(object):
         else:
             return binning.auto_derived_lags(distances, self._bin_func_name, maxlag)
 
+    def _binning_distances(self):
+        """
+        Distances passed to the binning function. The built-in binning
+        functions get the sorted distances of
+        :func:`sort_distances <skgstat.binning.sort_distances>`, or a
+        :class:`DistanceSketch <skgstat.binning.DistanceSketch>` if
+        `binning_sketch_alpha` is set. Both are reused until the
+        distances change.
+        """
+        if self._bin_func_name == 'custom':
+            return self.distance
+
+        # use a sketch instead, if requested and supported
+        alpha = self._kwargs.get('binning_sketch_alpha')
+        sketch = alpha is not None and self._bin_func_name.lower() in (
+            'even', 'uniform', 'fd', 'scott', 'sturges', 'sqrt', 'kmeans', 'ward'
+        )
+        key = alpha if sketch else None
+
+        # sort or sketch again only if the distance array was replaced
+        dist = self.distance
+        if self._binning_dist is None or self._binning_dist[0] is not dist \
+                or self._binning_dist[1] != key:
+            if sketch:
+                prepared = binning.DistanceSketch(alpha=alpha)
+                for start in range(0, dist.size, 1000000):
+                    prepared.update(dist[start:start + 1000000])
+            else:
+                prepared = binning.sort_distances(dist)
+            self._binning_dist = (dist, key, prepared)
+
+        return self._binning_dist[2]
+
     @property
     def normalized(self):
         return self._normalized
@@ -624,6 +808,9 @@ class Variogram(object):
         classes. If you need bin centers, use
         :func:`get_empirical <skgstat.Variogram.get_empirical>`.
 
+        .. versionchanged:: 0.5.0
+            returns a read-only view instead of a copy
+
         Returns
         -------
         bins : numpy.ndarray
@@ -635,14 +822,22 @@ class Variogram(object):
 
         """
         # if bins are not calculated, do it
+        if self._bins is None and self._load_stored('bins'):
+            return read_only_view(self._bins)
+
         if self._bins is None:
-            self._bins, n = self.bin_func(self.distance, self._n_lags, self.maxlag)
+            # optimize the number of lag classes, if requested
+            if self._n_lags is None and isinstance(self._n_lags_passed_value, str) \
+                    and self._bin_func_name.lower() in ('even', 'uniform', 'kmeans', 'ward', 'stable_entropy', 'custom'):
+                self._n_lags = self.optimize_n_lags(self._n_lags_passed_value.lower())
+
+            self._bins, n = self.bin_func(self._binning_distances(), self._n_lags, self.maxlag)
             # if the binning function returned an N, the n_lags need
             # to be adjusted directly (not through the setter)
             if n is not None:
                 self._n_lags = n
 
-        return self._bins.copy()
+        return read_only_view(self._bins)
 
     @bins.setter
     def bins(self, bins):
@@ -662,6 +857,11 @@ class Variogram(object):
         this Variogram instance. This will reset
         the grouping index and fitting parameters
 
+        .. versionchanged:: 0.5.0
+            The number of lag bins can be optimized by passing `'fit'` or
+            `'stable'`. The strategies are explained in
+            :func:`optimize_n_lags <skgstat.Variogram.optimize_n_lags>`.
+
         """
         if self._n_lags is None:
             self._n_lags = len(self.bins)
@@ -669,10 +869,13 @@ class Variogram(object):
 
     @n_lags.setter
     def n_lags(self, n):
-        # TODO: here accept strings and implement some optimum methods
-        # string are not implemented yet
+        # strings select an optimization, that is run on the next binning
         if isinstance(n, str):
-            raise NotImplementedError('n_lags string values not implemented')
+            if n.lower() not in ('fit', 'stable'):
+                raise ValueError("n_lags strings have to be one of 'fit', 'stable'")
+
+            self._n_lags = None
+            self._bins = None
 
         # n_lags is int
         elif isinstance(n, int):
@@ -699,6 +902,181 @@ class Variogram(object):
         self.cof = None
         self.cov = None
 
+    def _pair_mask(self):
+        """
+        Boolean mask aligned to the distances of the point pairs used
+        for binning, or None for all pairs. Subclasses use it to exclude
+        point pairs from the lag classes.
+        """
+        return None
+
+    def _lag_prefix_sums(self):
+        """
+        Pre-pass of the n_lags optimization. The pairwise differences
+        are sorted by distance once and the prefix sums of the count,
+        the squared differences, the squared differences squared and
+        the square root of the absolute differences are kept. The sums
+        of any lag class are then the difference of two prefix sums.
+        The result is reused until the distances, values or the pair
+        mask change.
+        """
+        self._calc_diff()
+        dist, diff, pairs = self.distance, self._diff, self._pair_mask()
+
+        if self._lag_prefix is not None and self._lag_prefix[0] is dist \
+                and self._lag_prefix[1] is diff and self._lag_prefix[2] is pairs:
+            return self._lag_prefix[3:]
+
+        # sort the finite pairs by distance
+        mask = np.isfinite(dist) & np.isfinite(diff)
+        if pairs is not None:
+            mask &= pairs
+        order = np.argsort(dist[mask], kind='stable')
+        d = dist[mask][order]
+        x = diff[mask][order]
+
+        cum = np.zeros((4, d.size + 1))
+        np.cumsum(np.ones(d.size), out=cum[0, 1:])
+        np.cumsum(x**2, out=cum[1, 1:])
+        np.cumsum(x**4, out=cum[2, 1:])
+        np.cumsum(np.sqrt(np.abs(x)), out=cum[3, 1:])
+
+        self._lag_prefix = (dist, diff, pairs, d, cum)
+        return d, cum
+
+    def _lag_rse(self, bins):
+        """
+        Number of pairs, semi-variance and its relative standard error of
+        the lag classes with the given upper edges, from the prefix sums.
+        The semi-variance uses the Cressie-Hawkins estimator, if it is the
+        estimator of this instance, and Matheron's estimator otherwise.
+        """
+        d, cum = self._lag_prefix_sums()
+
+        # pairs with lower <= d < upper
+        pos = np.searchsorted(d, np.concatenate(([0], bins)), side='left')
+        count, sq, quad, root = cum[:, pos[1:]] - cum[:, pos[:-1]]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            matheron = sq / (2 * count)
+            if self._estimator is estimators.cressie:
+                nominator = np.power(root / count, 4)
+                denominator = 0.457 + (0.494 / count) + (0.045 / count**2)
+                gamma = nominator / (2 * denominator)
+            else:
+                gamma = matheron
+
+            # standard error of the mean of x**2 / 2
+            var = np.maximum(quad / (4 * count) - matheron**2, 0)
+            rse = np.sqrt(var / count) / matheron
+
+        gamma[count == 0] = np.nan
+        rse[~np.isfinite(rse)] = np.inf
+        return count, gamma, rse
+
+    def _fit_lags(self, x, y):
+        """
+        Fit the model to a candidate experimental variogram, like the
+        unweighted 'trf' fit. Returns None, if the fit fails.
+        """
+        if self.use_nugget:
+            def wrapped(*args):
+                return self._model(*args)
+        else:
+            def wrapped(*args):
+                return self._model(*args, 0)
+
+        mask = ~np.isnan(y)
+        bounds = (0, self.__get_fit_bounds(x, y))
+        try:
+            cof, _ = curve_fit(
+                wrapped, x[mask], y[mask], method='trf',
+                p0=np.asarray(bounds[1]), bounds=bounds
+            )
+        except (RuntimeError, ValueError):
+            return None
+
+        return lambda h: wrapped(h, *cof)
+
+    def optimize_n_lags(self, strategy='fit', candidates=None):
+        r"""Optimize the number of lag classes
+
+        .. versionadded:: 0.5.0
+
+        Evaluates candidate numbers of lag classes with the current binning
+        function. The pairwise differences are sorted by distance once and
+        prefix sums of their statistics are kept. Thus, each candidate only
+        needs a binary search per lag class edge, instead of grouping all
+        point pairs again. Available strategies:
+
+        * `'fit'`: the model is fitted to the experimental variogram of each
+          candidate. The fitted models are compared to the experimental
+          variogram of the largest candidate, weighted by the number of point
+          pairs. The candidate with the lowest error is used.
+        * `'stable'`: the largest candidate, for which the semi-variance of
+          each lag class has a relative standard error of at most
+          `n_lags_max_rse` (default 0.25). For normal distributed
+          values, this is about 30 point pairs per lag class.
+
+        Estimators other than `'cressie'` are approximated by `'matheron'`
+        during the optimization. The DirectionalVariogram evaluates the
+        candidates on the point pairs in direction only.
+
+        Parameters
+        ----------
+        strategy : str
+            Either `'fit'` or `'stable'`.
+        candidates : list
+            Candidate numbers of lag classes. Defaults to the
+            `n_lags_candidates` keyword argument or 3 to 30.
+
+        Returns
+        -------
+        n_lags : int
+            The optimal number of lag classes. It is not set on the
+            instance, use :func:`n_lags <skgstat.Variogram.n_lags>` for
+            this.
+
+        """
+        if candidates is None:
+            candidates = self._kwargs.get('n_lags_candidates', range(3, 31))
+        candidates = sorted(int(n) for n in candidates)
+        if len(candidates) == 0 or candidates[0] < 1:
+            raise ValueError('n_lags candidates have to be positive integers')
+
+        # binning of each candidate
+        distances = self._binning_distances()
+        bins = [np.asarray(self._bin_func(distances, n, self.maxlag)[0]) for n in candidates]
+
+        if strategy == 'stable':
+            max_rse = self._kwargs.get('n_lags_max_rse', 0.25)
+            for n, b in zip(candidates[::-1], bins[::-1]):
+                if np.all(self._lag_rse(b)[2] <= max_rse):
+                    return n
+            return candidates[0]
+
+        elif strategy == 'fit':
+            if self._harmonize:
+                raise ValueError("n_lags='fit' is not available for harmonized models.")
+
+            # reference is the finest candidate
+            ref_count, ref_gamma, _ = self._lag_rse(bins[-1])
+            ref = ref_count > 0
+
+            errors = []
+            for b in bins:
+                model = self._fit_lags(b, self._lag_rse(b)[1])
+                if model is None:
+                    errors.append(np.inf)
+                    continue
+                residual = model(bins[-1][ref]) - ref_gamma[ref]
+                errors.append(np.sum(ref_count[ref] * residual**2))
+
+            return candidates[int(np.argmin(errors))]
+
+        else:
+            raise ValueError("strategy has to be one of 'fit', 'stable'")
+
     @property
     def estimator(self):
         return self._estimator
@@ -712,27 +1090,8 @@ class Variogram(object):
         self.cof, self.cov = None, None
 
         if isinstance(estimator_name, str):
-            if estimator_name.lower() == 'matheron':
-                self._estimator = estimators.matheron
-            elif estimator_name.lower() == 'cressie':
-                self._estimator = estimators.cressie
-            elif estimator_name.lower() == 'dowd':
-                self._estimator = estimators.dowd
-            elif estimator_name.lower() == 'genton':
-                self._estimator = estimators.genton
-            elif estimator_name.lower() == 'minmax':
-                self._estimator = estimators.minmax
-            elif estimator_name.lower() == 'percentile':
-                self._estimator = estimators.percentile
-            elif estimator_name.lower() == 'entropy':
-                self._estimator = estimators.entropy
-            else:
-                raise ValueError(
-                    (
-                        'Variogram estimator %s is not understood, please '
-                        'provide the function.'
-                    ) % estimator_name
-                )
+            # look up the registered estimators
+            self._estimator = estimators.get_estimator(estimator_name)
         elif callable(estimator_name):
             self._estimator = estimator_name
         else:
@@ -783,6 +1142,9 @@ class Variogram(object):
             self._model = model_name
 
     def _build_harmonized_model(self):
+        # sklearn is only needed for harmonized models
+        from sklearn.isotonic import IsotonicRegression
+
         x = self.bins
         y = self.experimental
 
@@ -902,7 +1264,13 @@ class Variogram(object):
 
     @property
     def distance_matrix(self):
-        return squareform(self.distance)
+        """Distance matrix
+
+        .. versionchanged:: 0.5.0
+            the matrix is built once and returned as read-only view
+
+        """
+        return self._square_matrix('distance', self.distance)
 
     @property
     def maxlag(self):
@@ -945,6 +1313,10 @@ class Variogram(object):
         .. versionchanged:: 0.3.11
             added the 'entropy' option.
 
+        .. versionchanged:: 0.5.0
+            if the estimator is 'entropy', the 'entropy' option reuses the
+            experimental variogram.
+
         Parameters
         ----------
         sigma : string, array
@@ -1015,15 +1387,19 @@ class Variogram(object):
 
         # entropy
         elif self._fit_sigma == 'entropy':
-            # get the binning using scotts rule
-            bins = np.histogram_bin_edges(self.distance, 'scott')
+            # reuse the experimental variogram of the entropy estimator
+            if self._estimator is estimators.entropy:
+                h = self._experimental
+            else:
+                # get the binning using scotts rule
+                bins = np.histogram_bin_edges(self.distance, 'scott')
+                h = self._lag_entropy(bins)
 
             # get the maximum entropy
 #            hmax = np.log2(len(self.distance))
 
-            # apply the entropy
-            h = np.asarray([shannon_entropy(grp, bins) for grp in self.lag_classes() if len(grp) > 0])
-            return 1. / h
+            # empty lag classes are dropped
+            return 1. / h[self._lag_counts() > 0]
 
         else:
             raise ValueError(
@@ -1114,6 +1490,29 @@ class Variogram(object):
         for i in range(len(self.bins)):
             yield self._diff[np.where(self.lag_groups() == i)]
 
+    def _lag_counts(self):
+        """
+        .. versionadded:: 0.5.0
+
+        Number of point pairs in each lag class, calculated by
+        :func:`lag_sums <skgstat.estimators.lag_sums>` without forming
+        the lag classes.
+
+        Returns
+        -------
+        count : numpy.ndarray
+
+        """
+        # restored from a dict and still valid
+        if self._stored_experimental is not None and self._stored_valid():
+            return self._stored_experimental[2].copy()
+
+        count, _, _ = estimators.lag_sums(
+            self._diff, np.asarray(self.lag_groups(), dtype=np.int64),
+            len(self.bins)
+        )
+        return count
+
     def preprocessing(self, force=False):
         """Preprocessing function
 
@@ -1140,6 +1539,9 @@ class Variogram(object):
         self._calc_diff(force=force)
         self._calc_groups(force=force)
 
+        # update the preprocessing store
+        self._update_store()
+
     def fit(self, force=False, method=None, sigma=None, **kwargs):
         """Fit the variogram
 
@@ -1284,13 +1686,16 @@ class Variogram(object):
             else:
                 sigma = 1 / self.fit_sigma
 
+            # scipy.stats is only needed for maximum likelihood
+            from scipy.stats import norm
+
             # define the loss function to be minimized
             def ml(params):
                 # predict
                 pred = [wrapped(_, *params) for _ in _x]
 
                 # get the probabilities of _y
-                p = [stats.norm.logpdf(_p, loc=o, scale=1.) for _p, o in zip(pred, _y)]
+                p = [norm.logpdf(_p, loc=o, scale=1.) for _p, o in zip(pred, _y)]
 
                 # weight the probs
                 return - np.sum(p * sigma)
@@ -1403,11 +1808,26 @@ class Variogram(object):
         if self._dist is not None and not force:
             return
 
+        if self._X is None:
+            raise RuntimeError(
+                'The Variogram was restored without coordinates, thus '
+                'pairwise distances cannot be calculated.'
+            )
+
+        # use the preprocessing store, if valid
+        if self._load_stored('distance'):
+            return
+
         # if self._X is of just one dimension, concat zeros.
         if self._X.ndim == 1:
             _x = np.column_stack((self._X, np.zeros(self._X.size)))
         else:
             _x = self._X
+
+        # transform the coordinates, if needed
+        if self._coordinate_transform is not None:
+            _x = self._coordinate_transform(_x)
+
         # else calculate the distances
         self._dist = self._dist_func_wrapper(_x)
 
@@ -1423,6 +1843,10 @@ class Variogram(object):
         if self._diff is not None and not force:
             return
 
+        # use the preprocessing store, if valid
+        if self._load_stored('diff'):
+            return
+
         v = self.values
 
         # Append a column of zeros to make pdist happy
@@ -1440,6 +1864,10 @@ class Variogram(object):
         if self._groups is not None and not force:
             return
 
+        # use the preprocessing store, if valid
+        if self._load_stored('groups'):
+            return
+
         # get the bin edges and distances
         bin_edges = self.bins
         d = self.distance
@@ -1450,6 +1878,346 @@ class Variogram(object):
         for i, bounds in enumerate(zip([0] + list(bin_edges), bin_edges)):
             self._groups[np.where((d >= bounds[0]) & (d < bounds[1]))] = i
 
+    def _store_path(self):
+        """
+        Path of the preprocessing store. Distances of callable distance
+        functions or transformed coordinates are not stored.
+        """
+        path = self._kwargs.get('preprocessing_store')
+        if path is None or self._X is None or callable(self._dist_func_name) \
+                or self._coordinate_transform is not None:
+            return None
+        return path
+
+    def _store_hash(self):
+        """
+        Hash of the coordinates, values and distance function, that
+        validates the preprocessing store.
+        """
+        h = hashlib.sha1()
+        for arr in (self._X, self._values):
+            arr = np.ascontiguousarray(arr)
+            h.update(str((arr.dtype.str, arr.shape)).encode())
+            h.update(arr.tobytes())
+        h.update(str(self._dist_func_name).encode())
+        return h.hexdigest()
+
+    def _store_binning_key(self):
+        """
+        Binning settings the stored bins and lag groups are valid for.
+        Subclasses change the lag groups, thus only a Variogram stores
+        them.
+        """
+        if type(self) is not Variogram or self._bin_func_name == 'custom':
+            return None
+
+        kwargs = sorted(
+            (k, v) for k, v in self._kwargs.items()
+            if k.startswith('binning_') or k.startswith('n_lags_')
+        )
+        maxlag = None if self._maxlag is None else float(self._maxlag)
+        return repr((self._bin_func_name, self._n_lags_passed_value, maxlag, kwargs))
+
+    def _load_stored(self, name):
+        """
+        Load the array `name` memory-mapped from the preprocessing store.
+        Returns False, if there is no valid stored array.
+        """
+        path = self._store_path()
+        if path is None:
+            return False
+
+        meta = _read_store_meta(path)
+        if meta is None or meta.get('hash') != self._store_hash():
+            return False
+        if name in ('bins', 'groups') and (
+                meta.get('binning') is None
+                or meta.get('binning') != self._store_binning_key()):
+            return False
+
+        fname = os.path.join(path, '%s.npy' % name)
+        if not os.path.exists(fname):
+            return False
+        arr = np.load(fname, mmap_mode='r')
+
+        if name == 'distance':
+            self._dist = arr
+        elif name == 'diff':
+            self._diff = arr
+        elif name == 'groups':
+            self._groups = arr
+        else:
+            self._bins = np.array(arr)
+            self._n_lags = meta['n_lags']
+        return True
+
+    def _store_is_current(self):
+        """
+        All preprocessing arrays are loaded from the store.
+        """
+        arrays = [self._dist, self._diff]
+        if self._store_binning_key() is not None:
+            arrays.append(self._groups)
+        return all(isinstance(arr, np.memmap) for arr in arrays)
+
+    def _update_store(self):
+        """
+        Save the preprocessing into the store, if configured and not all
+        arrays were loaded from it. The saved arrays are mapped afterwards.
+        """
+        path = self._store_path()
+        if path is None or self._store_is_current():
+            return
+
+        self.save_preprocessing(path)
+        for name in ('distance', 'diff', 'groups'):
+            self._load_stored(name)
+
+    def save_preprocessing(self, path):
+        """Save the preprocessing
+
+        .. versionadded:: 0.5.0
+
+        Saves the distances, pairwise differences, bins and lag groups as
+        `.npy` files into the directory `path`, along with a hash of the
+        coordinates, values and `dist_func`. A Variogram created with
+        the `preprocessing_store=path` keyword argument for the same data
+        loads the arrays with `numpy.load(mmap_mode='r')` instead of
+        calculating them. Thus, several processes share the arrays
+        through the page cache. The bins and lag groups are only stored
+        for a :class:`Variogram <skgstat.Variogram>` and only loaded if
+        the binning settings match.
+
+        Parameters
+        ----------
+        path : str
+            Directory of the store. It is created, if it does not exist.
+
+        Raises
+        ------
+        ValueError : raised for a callable dist_func or a coordinate
+            transform, as the store cannot be validated for them.
+
+        """
+        if callable(self._dist_func_name) or self._coordinate_transform is not None:
+            raise ValueError(
+                'The preprocessing of a callable dist_func or transformed '
+                'coordinates cannot be stored.'
+            )
+        self._calc_distances()
+        self._calc_diff()
+
+        meta = dict(hash=self._store_hash())
+        arrays = dict(distance=self._dist, diff=self._diff)
+
+        key = self._store_binning_key()
+        if key is not None:
+            arrays.update(bins=self.bins, groups=self.lag_groups())
+            meta.update(binning=key, n_lags=int(self.n_lags))
+
+        os.makedirs(path, exist_ok=True)
+        meta_name = os.path.join(path, 'meta.json')
+
+        # invalidate the store while the arrays are replaced
+        if os.path.exists(meta_name):
+            os.remove(meta_name)
+
+        for name, arr in arrays.items():
+            fname = os.path.join(path, '%s.npy' % name)
+
+            # the array is already mapped from this file
+            if isinstance(arr, np.memmap) and arr.filename is not None \
+                    and os.path.abspath(arr.filename) == os.path.abspath(fname):
+                continue
+
+            # replace the file, mapped files stay valid for other processes
+            tmp = os.path.join(path, '%s.tmp.npy' % name)
+            np.save(tmp, np.asarray(arr))
+            os.replace(tmp, fname)
+
+        with open(meta_name + '.tmp', 'w') as f:
+            json.dump(meta, f)
+        os.replace(meta_name + '.tmp', meta_name)
+
+    def _stored_valid(self):
+        """
+        The stored experimental variogram is valid as long as the bins,
+        estimator and values are the restored ones.
+        """
+        key = self._stored_experimental[0]
+        return key[0] is self._bins and key[1] is self._estimator \
+            and key[2] is self._values
+
+    def _serial_kwargs(self):
+        """
+        Keyword arguments of subclasses, that are serialized by
+        :func:`to_dict <skgstat.Variogram.to_dict>` in addition to the
+        Variogram parameters. They are passed to __init__ and to
+        _set_serial_kwargs by :func:`from_dict <skgstat.Variogram.from_dict>`.
+        """
+        return {}
+
+    def _set_serial_kwargs(self):
+        """
+        Set the keyword arguments returned by _serial_kwargs on a Variogram
+        restored by :func:`from_dict <skgstat.Variogram.from_dict>` without
+        calculating the pairwise data.
+        """
+        pass
+
+    def to_dict(self, include_data=True):
+        """Serialize to a dictionary
+
+        .. versionadded:: 0.5.0
+
+        Returns the configuration, the bins, the experimental variogram,
+        the number of point pairs per lag class and the fitted
+        coefficients as a dictionary of built-in types, i.e. to be stored
+        as JSON. The distances and pairwise differences are not included.
+        Use :func:`from_dict <skgstat.Variogram.from_dict>` to restore the
+        Variogram.
+
+        Parameters
+        ----------
+        include_data : bool
+            If True (default), the coordinates and values are included.
+            They are needed to calculate the pairwise distances again and
+            by :class:`OrdinaryKriging <skgstat.OrdinaryKriging>`.
+
+        Returns
+        -------
+        data : dict
+
+        Raises
+        ------
+        ValueError : raised if the estimator, model, distance or binning
+            function is a custom callable, which cannot be serialized.
+
+        """
+        if not isinstance(self._dist_func_name, str):
+            raise ValueError('A custom dist_func cannot be serialized.')
+        if self._bin_func_name == 'custom':
+            raise ValueError('A custom bin_func cannot be serialized.')
+        if self.cof is None:
+            self.fit(force=True)
+
+        params = self.describe()['params']
+        params['model'] = 'harmonize' if self._harmonize else self._model.__name__
+
+        def _list(arr):
+            return None if arr is None else np.asarray(arr).tolist()
+
+        from skgstat import __version__
+
+        data = dict(
+            version=__version__,
+            params=params,
+            kwargs=dict(self._kwargs),
+            maxlag=None if self._maxlag is None else float(self._maxlag),
+            n_lags=int(self.n_lags),
+            bins=_list(self.bins),
+            experimental=_list(self.experimental),
+            counts=_list(self._lag_counts()),
+            cof=_list(self.cof),
+            cov=_list(self.cov),
+            serial_kwargs=self._serial_kwargs(),
+        )
+
+        if isinstance(data['params']['fit_sigma'], np.ndarray):
+            data['params']['fit_sigma'] = _list(data['params']['fit_sigma'])
+
+        if include_data:
+            data['coordinates'] = _list(self._X)
+            data['values'] = _list(self._values)
+
+        return data
+
+    @classmethod
+    def from_dict(cls, data, model_only=False):
+        """Restore from a dictionary
+
+        .. versionadded:: 0.5.0
+
+        Restore a Variogram serialized by
+        :func:`to_dict <skgstat.Variogram.to_dict>`.
+
+        Parameters
+        ----------
+        data : dict
+            Output of :func:`to_dict <skgstat.Variogram.to_dict>`.
+        model_only : bool
+            If False (default), the Variogram is built again from the
+            coordinates and values, which calculates the pairwise
+            distances and differences. If True, the stored bins,
+            experimental variogram and coefficients are used and no
+            pairwise data is calculated. The
+            :func:`fitted_model <skgstat.Variogram.fitted_model>`,
+            :func:`describe <skgstat.Variogram.describe>` and the plots
+            of the experimental variogram work from the stored data and
+            :class:`OrdinaryKriging <skgstat.OrdinaryKriging>` can use the
+            Variogram, if the data was included. Pairwise data is only
+            calculated again, if it is requested, i.e. by changing the
+            binning.
+
+        Returns
+        -------
+        variogram : Variogram
+
+        """
+        params = dict(data['params'])
+        kwargs = dict(data.get('kwargs', {}))
+        coords, values = data.get('coordinates'), data.get('values')
+
+        if not model_only:
+            if coords is None or values is None:
+                raise ValueError('The data has no coordinates and values. Use model_only=True.')
+
+            V = cls(
+                np.asarray(coords), np.asarray(values),
+                **params, **data.get('serial_kwargs', {}), **kwargs
+            )
+
+            # the passed maxlag might have been relative
+            if V._maxlag != data['maxlag']:
+                V._maxlag = data['maxlag']
+                V._bins, V._groups = None, None
+                V.fit()
+            return V
+
+        # model only: set the attributes without calculating pairs
+        V = cls.__new__(cls)
+        V._init_attributes(**kwargs)
+        V._X = None if coords is None else np.asarray(coords)
+        V._values = None if values is None else np.asarray(values)
+        V.verbose = params.get('verbose', False)
+        V._dist_func_name = params['dist_func']
+        V._n_lags_passed_value = params['n_lags']
+        V._n_lags = data['n_lags']
+        V._maxlag = data['maxlag']
+        V.set_estimator(estimator_name=params['estimator'])
+        V.set_bin_func(bin_func=params['bin_func'])
+        V._n_lags = data['n_lags']
+        V._normalized = params['normalize']
+        V._use_nugget = params['use_nugget']
+        V.fit_method = params['fit_method']
+        V._fit_sigma = params['fit_sigma']
+        V._set_serial_kwargs(**data.get('serial_kwargs', {}))
+
+        # the stored binning and experimental variogram
+        V._bins = np.asarray(data['bins'], dtype=float)
+        V._stored_experimental = (
+            (V._bins, V._estimator, V._values),
+            np.asarray(data['experimental'], dtype=float),
+            np.asarray(data['counts'], dtype=int)
+        )
+
+        # the model needs the experimental variogram, if harmonized
+        V.set_model(model_name=params['model'])
+        V.cof = data['cof']
+        V.cov = None if data.get('cov') is None else np.asarray(data['cov'])
+
+        return V
+
     def clone(self):
         """Deep copy of self
 
@@ -1500,6 +2268,13 @@ class Variogram(object):
             makes use of `kwargs <skgstat.Variogram._kwargs>` for
             specific estimators now
 
+        .. versionchanged:: 0.5.0
+            the lag classes are formed by sorting the differences once
+            in :func:`_experimental_from_groups <skgstat.Variogram._experimental_from_groups>`.
+            Estimators with a grouped form, like Matheron and Cressie,
+            calculate all lag classes at once, the entropy is calculated
+            from one histogram of all lag classes.
+
         Returns
         -------
         experimental : np.ndarray
@@ -1507,6 +2282,41 @@ class Variogram(object):
             as :func:`bins <skgstat.Variogram.bins>`
 
         """
+        # restored from a dict and still valid
+        stored = self._stored_experimental
+        if stored is not None and self._stored_valid():
+            return stored[1].copy()
+
+        return self._experimental_from_groups(self.lag_groups(), len(self.bins))
+
+    def _experimental_from_groups(self, groups, n_lags):
+        """
+        .. versionadded:: 0.5.0
+
+        Apply the current estimator to the pairwise differences grouped by
+        the given lag class index array. The index array has to be aligned
+        to the pairwise differences and use -1 for all pairs outside of any
+        lag class. The differences are sorted by lag class once, instead of
+        searching the index array for each lag class.
+
+        Parameters
+        ----------
+        groups : numpy.ndarray
+            Lag class index for each pairwise difference.
+        n_lags : int
+            Number of lag classes.
+
+        Returns
+        -------
+        experimental : np.ndarray
+            1D array of the experimental variogram values of length n_lags.
+
+        """
+        # estimators with a grouped form calculate all lag classes at once
+        grouped = estimators.get_grouped_estimator(self._estimator)
+        if grouped is not None:
+            return np.asarray(grouped(self._diff, groups, n_lags), dtype=float)
+
         if self._estimator.__name__ == 'entropy':
             # get the parameter from kwargs, if not set use 50
             N = self._kwargs.get('entropy_bins', 50)
@@ -1517,6 +2327,10 @@ class Variogram(object):
 
             bins = np.histogram_bin_edges(self.distance, bins=N)
 
+            # one histogram for all lag classes
+            if self._estimator is estimators.entropy:
+                return self._lag_entropy(bins, groups, n_lags)
+
             # define the mapper to the estimator function
             def mapper(lag_values):
                 return self._estimator(lag_values, bins=bins)
@@ -1530,11 +2344,60 @@ class Variogram(object):
             else:
                 mapper = self._estimator
 
+        elif self._estimator.__name__ == 'genton':
+            if self._kwargs.get('genton_max_pairs', False):
+                max_pairs = int(self._kwargs.get('genton_max_pairs'))
+
+                def mapper(lag_values):
+                    return self._estimator(lag_values, max_pairs=max_pairs)
+            else:
+                mapper = self._estimator
+
         else:
             mapper = self._estimator
 
+        # sort the differences by lag class, -1 is sorted first
+        groups = np.asarray(groups)
+        order = np.argsort(groups, kind='stable')
+        counts = np.bincount(groups[groups >= 0], minlength=n_lags)[:n_lags]
+        start = np.count_nonzero(groups < 0)
+        diffs = self._diff[order[start:start + counts.sum()]]
+        lag_classes = np.split(diffs, np.cumsum(counts)[:-1])
+
         # return the mapped result
-        return np.fromiter(map(mapper, self.lag_classes()), dtype=float)
+        return np.fromiter(map(mapper, lag_classes), dtype=float)
+
+    def _lag_entropy(self, bins, groups=None, n_lags=None):
+        """
+        .. versionadded:: 0.5.0
+
+        Shannon Entropy of the pairwise differences in each lag class.
+        The histograms of all lag classes are calculated at once by
+        :func:`grouped_histogram <skgstat.util.grouped_histogram>`.
+
+        Parameters
+        ----------
+        bins : numpy.ndarray
+            Bin edges of the histograms.
+        groups : numpy.ndarray
+            Lag class index of each pairwise difference. Defaults to
+            :func:`lag_groups <skgstat.Variogram.lag_groups>`.
+        n_lags : int
+            Number of lag classes. Defaults to the number of bins.
+
+        Returns
+        -------
+        h : numpy.ndarray
+            Entropy for each lag class. NaN for empty lag classes.
+
+        """
+        if groups is None:
+            groups = self.lag_groups()
+        if n_lags is None:
+            n_lags = len(self.bins)
+
+        counts = grouped_histogram(self._diff, groups, n_lags, bins)
+        return shannon_entropy_from_counts(counts)
 
     def get_empirical(self, bin_center=False):
         """Empirical variogram
@@ -2001,6 +2864,9 @@ class Variogram(object):
         Variogram.data
 
         """
+        # pandas is only needed for the export
+        from pandas import DataFrame
+
         lags, data = self.data(n=n, force=force)
 
         return DataFrame({
@@ -2077,6 +2943,17 @@ class Variogram(object):
             If True (default), the `show` method of the Figure will be 
             called. Can be set to False to prevent duplicated plots in 
             some environments.
+        max_pairs : int
+            .. versionadded:: 0.5.0
+
+            If there are more point pairs, a random sample of this size
+            is plotted. Defaults to 50000, None plots all pairs.
+        density : bool
+            .. versionadded:: 0.5.0
+
+            If True, the number of point pairs is plotted as a 2D
+            histogram of `bins` (default 100) bins along each axis,
+            counted over all pairs, instead of a marker per point pair.
         
         Returns
         -------
@@ -2151,7 +3028,7 @@ class Variogram(object):
         # if we reach this line, somethings wrong with plotting backend
         raise ValueError('The plotting backend has an undefined state.')
 
-    def distance_difference_plot(self, ax=None, plot_bins=True, show=True):
+    def distance_difference_plot(self, ax=None, plot_bins=True, show=True, density='auto', max_points=50000, **kwargs):
         """Raw distance plot
 
         Plots all absoulte value differences of all point pair combinations
@@ -2171,6 +3048,19 @@ class Variogram(object):
             If True (default), the show method of the Figure will be called
             before returning the Figure. Can be set to False, to avoid
             doubled figure rendering in Jupyter notebooks.
+        density : bool, str
+            .. versionadded:: 0.5.0
+
+            If True, the number of point pairs is plotted as a 2D
+            histogram of `bins` (default 100) bins along each axis,
+            instead of a marker per point pair. If `'auto'` (default),
+            the histogram is plotted if there are more than `max_points`
+            point pairs.
+        max_points : int
+            .. versionadded:: 0.5.0
+
+            Maximum number of plotted point pairs. If there are more,
+            a random sample is plotted. None plots all pairs.
 
         Returns
         -------
@@ -2181,9 +3071,9 @@ class Variogram(object):
         used_backend = plotting.backend()
 
         if used_backend == 'matplotlib':
-            return plotting.matplotlib_dd_plot(self, ax=ax, plot_bins=plot_bins, show=show)
+            return plotting.matplotlib_dd_plot(self, ax=ax, plot_bins=plot_bins, show=show, density=density, max_points=max_points, **kwargs)
         elif used_backend == 'plotly':
-            return plotting.plotly_dd_plot(self, fig=ax, plot_bins=plot_bins, show=show)
+            return plotting.plotly_dd_plot(self, fig=ax, plot_bins=plot_bins, show=show, density=density, max_points=max_points, **kwargs)
 
         # if we reach this line, somethings wrong with plotting backend
         raise ValueError('The plotting backend has an undefined state.')
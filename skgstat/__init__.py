@@ -1,8 +1,10 @@
 from .Variogram import Variogram
 from .DirectionalVariogram import DirectionalVariogram
 from .SpaceTimeVariogram import SpaceTimeVariogram
-from .Kriging import OrdinaryKriging
+from .Kriging import OrdinaryKriging, SpaceTimeOrdinaryKriging
+from .Anisotropy import Anisotropy
 from . import interfaces
+from .util import warmup
 
 # set some stuff
 __version__ = '0.4.3'
@@ -0,0 +1,436 @@
+"""
+Streaming versions of the estimators in :mod:`skgstat.estimators`.
+An accumulator holds a compact summary of the pairwise differences of
+all lag classes, instead of the differences themselves. The protocol is:
+
+* **init**: create the accumulator for a number of lag classes
+* **update**: add a chunk of pairwise differences and their lag classes
+* **merge**: combine the summary of another accumulator, i.e. of another
+  chunk or worker
+* **finalize**: calculate the semi-variance for each lag class
+
+Missing values are ignored by all accumulators. The Genton estimator
+cannot be accumulated, as it needs the differences among all values of
+a lag class.
+
+Example
+-------
+
+.. code-block:: python
+
+    acc = get_accumulator('matheron', n_lags=10)
+    for diffs, groups in chunks:
+        acc.update(diffs, groups)
+    experimental = acc.finalize()
+
+"""
+import numpy as np
+
+from skgstat.util import grouped_histogram, shannon_entropy_from_counts
+
+
+class Accumulator:
+    """Accumulator base class
+
+    .. versionadded:: 0.5.0
+
+    Keeps the number of pairwise differences per lag class. Subclasses
+    add their sufficient statistics by implementing `_update`, `_merge`
+    and `finalize`.
+
+    Parameters
+    ----------
+    n_lags : int
+        Number of lag classes.
+
+    """
+    def __init__(self, n_lags=1):
+        self.n_lags = int(n_lags)
+        self.count = np.zeros(self.n_lags, dtype=int)
+
+    def _prepare(self, x, groups):
+        """
+        Flatten the input and remove missing values and all pairs, that
+        are not in any lag class.
+        """
+        x = np.asarray(x, dtype=float).ravel()
+        if groups is None:
+            groups = np.zeros(x.size, dtype=int)
+        else:
+            groups = np.asarray(groups, dtype=int).ravel()
+
+        if groups.size != x.size:
+            raise ValueError('x and groups need to have the same size.')
+
+        mask = (groups >= 0) & (groups < self.n_lags) & ~np.isnan(x)
+        return x[mask], groups[mask]
+
+    def update(self, x, groups=None):
+        """Update
+
+        Add pairwise differences to the accumulator.
+
+        Parameters
+        ----------
+        x : numpy.ndarray
+            Array of pairwise differences.
+        groups : numpy.ndarray
+            Lag class index of each pairwise difference. Negative indices
+            are ignored, as they are outside the maxlag. If None, all
+            differences are added to the first lag class.
+
+        Returns
+        -------
+        self : Accumulator
+
+        """
+        x, groups = self._prepare(x, groups)
+        self.count += np.bincount(groups, minlength=self.n_lags)
+        self._update(x, groups)
+        return self
+
+    def merge(self, other):
+        """Merge
+
+        Add the summary of another accumulator of the same kind.
+
+        Parameters
+        ----------
+        other : Accumulator
+            Accumulator of the same type and number of lag classes.
+
+        Returns
+        -------
+        self : Accumulator
+
+        """
+        if type(other) is not type(self) or other.n_lags != self.n_lags:
+            raise ValueError('Only accumulators of the same type and number '
+                             'of lag classes can be merged.')
+        self._check_compatible(other)
+
+        self.count += other.count
+        self._merge(other)
+        return self
+
+    def _check_compatible(self, other):
+        pass
+
+    def _update(self, x, groups):  # pragma: no cover
+        raise NotImplementedError
+
+    def _merge(self, other):  # pragma: no cover
+        raise NotImplementedError
+
+    def finalize(self):  # pragma: no cover
+        """Finalize
+
+        Returns
+        -------
+        semivariance : numpy.ndarray
+            The estimated semi-variance for each lag class. Empty lag
+            classes are NaN.
+
+        """
+        raise NotImplementedError
+
+
+class MatheronAccumulator(Accumulator):
+    """Matheron accumulator
+
+    Exact streaming version of :func:`matheron <skgstat.estimators.matheron>`.
+    Keeps the sum of squared differences.
+
+    """
+    def __init__(self, n_lags=1):
+        super(MatheronAccumulator, self).__init__(n_lags=n_lags)
+        self.sq = np.zeros(self.n_lags)
+
+    def _update(self, x, groups):
+        self.sq += np.bincount(groups, weights=x**2, minlength=self.n_lags)
+
+    def _merge(self, other):
+        self.sq += other.sq
+
+    def finalize(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.count > 0, self.sq / (2 * self.count), np.nan)
+
+
+class CressieAccumulator(Accumulator):
+    """Cressie-Hawkins accumulator
+
+    Exact streaming version of :func:`cressie <skgstat.estimators.cressie>`.
+    Keeps the sum of square roots of the differences.
+
+    """
+    def __init__(self, n_lags=1):
+        super(CressieAccumulator, self).__init__(n_lags=n_lags)
+        self.sqrt = np.zeros(self.n_lags)
+
+    def _update(self, x, groups):
+        self.sqrt += np.bincount(
+            groups, weights=np.sqrt(x), minlength=self.n_lags
+        )
+
+    def _merge(self, other):
+        self.sqrt += other.sqrt
+
+    def finalize(self):
+        n = self.count.astype(float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            nominator = np.power(self.sqrt / n, 4)
+            denominator = 0.457 + (0.494 / n) + (0.045 / n**2)
+            return np.where(n > 0, nominator / (2 * denominator), np.nan)
+
+
+class MinMaxAccumulator(Accumulator):
+    """MinMax accumulator
+
+    Exact streaming version of :func:`minmax <skgstat.estimators.minmax>`.
+    Keeps the running minimum, maximum and sum.
+
+    """
+    def __init__(self, n_lags=1):
+        super(MinMaxAccumulator, self).__init__(n_lags=n_lags)
+        self.min = np.ones(self.n_lags) * np.inf
+        self.max = np.ones(self.n_lags) * -np.inf
+        self.sum = np.zeros(self.n_lags)
+
+    def _update(self, x, groups):
+        np.minimum.at(self.min, groups, x)
+        np.maximum.at(self.max, groups, x)
+        self.sum += np.bincount(groups, weights=x, minlength=self.n_lags)
+
+    def _merge(self, other):
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        self.sum += other.sum
+
+    def finalize(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = self.sum / self.count
+            return np.where(
+                self.count > 0, (self.max - self.min) / mean, np.nan
+            )
+
+
+class EntropyAccumulator(Accumulator):
+    """Entropy accumulator
+
+    Exact streaming version of :func:`entropy <skgstat.estimators.entropy>`.
+    Keeps the histogram counts of each lag class on fixed bin edges.
+
+    Parameters
+    ----------
+    n_lags : int
+        Number of lag classes.
+    bins : list, numpy.ndarray
+        Bin edges of the histogram. As the edges have to be the same for
+        all chunks, they cannot be derived from the data.
+
+    """
+    def __init__(self, n_lags=1, bins=None):
+        super(EntropyAccumulator, self).__init__(n_lags=n_lags)
+        if bins is None or np.ndim(bins) != 1:
+            raise ValueError('The entropy accumulator needs fixed bin edges.')
+        self.bins = np.asarray(bins, dtype=float)
+        self.hist = np.zeros((self.n_lags, len(self.bins) - 1), dtype=int)
+
+    def _check_compatible(self, other):
+        if not np.array_equal(self.bins, other.bins):
+            raise ValueError('The bin edges of both accumulators differ.')
+
+    def _update(self, x, groups):
+        self.hist += grouped_histogram(x, groups, self.n_lags, self.bins)
+
+    def _merge(self, other):
+        self.hist += other.hist
+
+    def finalize(self):
+        h = shannon_entropy_from_counts(self.hist)
+        return np.where(self.count > 0, h, np.nan)
+
+
+class QuantileAccumulator(Accumulator):
+    r"""Quantile sketch accumulator
+
+    Mergeable quantile sketch with a relative error guarantee. The
+    differences are counted in logarithmic buckets, that are
+    :math:`\gamma = (1 + \alpha) / (1 - \alpha)` times larger than the
+    previous one. Each quantile is returned with a relative error of at
+    most :math:`\alpha`. The memory needed only grows with the
+    logarithm of the value range, not with the number of differences.
+
+    Parameters
+    ----------
+    n_lags : int
+        Number of lag classes.
+    p : float
+        Percentile in the range [0, 100].
+    alpha : float
+        Relative error of the quantiles. Defaults to 0.01.
+
+    """
+    # bucket index offset used to combine lag class and bucket
+    _offset = 2**20
+
+    def __init__(self, n_lags=1, p=50, alpha=0.01):
+        super(QuantileAccumulator, self).__init__(n_lags=n_lags)
+        if not 0 < alpha < 1:
+            raise ValueError('alpha has to be in the interval ]0, 1[.')
+        self.p = p
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+
+        # sparse bucket counts with lag class * offset + bucket as key
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    def _check_compatible(self, other):
+        if self.alpha != other.alpha:
+            raise ValueError('Only sketches of the same alpha can be merged.')
+
+    def _add(self, keys, counts):
+        keys, inv = np.unique(
+            np.concatenate((self.keys, keys)), return_inverse=True
+        )
+        self.counts = np.bincount(
+            inv, weights=np.concatenate((self.counts, counts))
+        ).astype(np.int64)
+        self.keys = keys
+
+    def _update(self, x, groups):
+        # bucket zero holds all zero differences
+        with np.errstate(divide='ignore'):
+            b = np.ceil(np.log(np.abs(x)) / np.log(self.gamma))
+        b = np.clip(np.nan_to_num(b, neginf=0), 1 - self._offset // 2, self._offset // 2 - 1)
+        b = np.where(x == 0, -self._offset // 2, b).astype(np.int64)
+
+        keys = groups.astype(np.int64) * self._offset + b + self._offset // 2
+        self._add(keys, np.ones(keys.size, dtype=np.int64))
+
+    def _merge(self, other):
+        self._add(other.keys, other.counts)
+
+    def histogram(self, lag=0):
+        """Bucket histogram
+
+        .. versionadded:: 0.5.0
+
+        Parameters
+        ----------
+        lag : int
+            Lag class index.
+
+        Returns
+        -------
+        values : numpy.ndarray
+            Sorted representative absolute value of each filled bucket.
+            Each value has a relative error of at most alpha.
+        counts : numpy.ndarray
+            Number of differences in each bucket.
+
+        """
+        # the keys are sorted, find the range of the lag class
+        lo, hi = np.searchsorted(self.keys // self._offset, [lag, lag + 1])
+
+        b = self.keys[lo:hi] % self._offset - self._offset // 2
+        values = np.where(
+            b == -self._offset // 2,
+            0.,
+            2 * np.power(self.gamma, b.astype(float)) / (self.gamma + 1)
+        )
+        return values, self.counts[lo:hi]
+
+    def quantile(self, p=None):
+        """Quantile
+
+        Parameters
+        ----------
+        p : float
+            Percentile in the range [0, 100]. Defaults to the percentile
+            of this instance.
+
+        Returns
+        -------
+        quantile : numpy.ndarray
+            Approximated percentile for each lag class, interpolated like
+            numpy.percentile.
+
+        """
+        p = self.p if p is None else p
+        out = np.ones(self.n_lags) * np.nan
+
+        for lag in range(self.n_lags):
+            values, counts = self.histogram(lag)
+            if values.size == 0:
+                continue
+            cum = np.cumsum(counts)
+
+            # interpolate between the two order statistics
+            rank = p / 100 * (cum[-1] - 1)
+            low = values[np.searchsorted(cum, np.floor(rank), side='right')]
+            high = values[np.searchsorted(cum, np.ceil(rank), side='right')]
+            out[lag] = low + (rank - np.floor(rank)) * (high - low)
+
+        return out
+
+    def finalize(self):
+        return self.quantile()
+
+
+class DowdAccumulator(QuantileAccumulator):
+    """Dowd accumulator
+
+    Approximated streaming version of :func:`dowd <skgstat.estimators.dowd>`.
+    The median is taken from a
+    :class:`QuantileAccumulator <skgstat.accumulators.QuantileAccumulator>`,
+    thus the semi-variance has a relative error of about 2 * alpha.
+
+    """
+    def __init__(self, n_lags=1, alpha=0.01):
+        super(DowdAccumulator, self).__init__(n_lags=n_lags, p=50, alpha=alpha)
+
+    def finalize(self):
+        return 2.198 * self.quantile()**2
+
+
+def get_accumulator(name, n_lags=1, **kwargs):
+    """Accumulator factory
+
+    .. versionadded:: 0.5.0
+
+    Parameters
+    ----------
+    name : str
+        Name of the estimator. One of ['matheron', 'cressie', 'dowd',
+        'minmax', 'percentile', 'entropy'].
+    n_lags : int
+        Number of lag classes.
+    kwargs : dict
+        Passed to the accumulator. 'percentile' takes `p` and `alpha`,
+        'dowd' takes `alpha`, 'entropy' needs the `bins`.
+
+    Returns
+    -------
+    accumulator : Accumulator
+
+    """
+    name = name.lower()
+    if name == 'matheron':
+        return MatheronAccumulator(n_lags)
+    elif name == 'cressie':
+        return CressieAccumulator(n_lags)
+    elif name == 'dowd':
+        return DowdAccumulator(n_lags, **kwargs)
+    elif name == 'minmax':
+        return MinMaxAccumulator(n_lags)
+    elif name == 'percentile':
+        return QuantileAccumulator(n_lags, **kwargs)
+    elif name == 'entropy':
+        return EntropyAccumulator(n_lags, **kwargs)
+    elif name == 'genton':
+        raise ValueError('The genton estimator cannot be accumulated.')
+    else:
+        raise ValueError('Estimator %s is not understood.' % name)
@@ -1,8 +1,358 @@
+import heapq
+
 import numpy as np
-from sklearn.cluster import KMeans, AgglomerativeClustering
+from numba import njit
 from scipy.optimize import minimize, OptimizeWarning
+from scipy.spatial.distance import cdist
+
+from skgstat.util import shannon_entropy_from_counts
+from skgstat.accumulators import QuantileAccumulator
+
+
+class SortedDistances(np.ndarray):
+    """Sorted distances
+
+    .. versionadded:: 0.5.0
+
+    Result of the binning pre-pass :func:`sort_distances`. The finite
+    distances are sorted once, which turns the maximum distance, the
+    maxlag filter and quantiles into lookups. All binning functions in
+    this module accept it in place of the distances.
+
+    """
+    pass
+
+
+def sort_distances(distances):
+    """Binning pre-pass
+
+    .. versionadded:: 0.5.0
+
+    Sort the finite distances once. The result can be passed to all
+    binning functions in this module instead of the distances. Thus,
+    changing the binning function or the number of lag classes does not
+    need to search or filter the full distance array again.
+
+    Parameters
+    ----------
+    distances : numpy.array
+        Flat numpy array representing the upper triangle of
+        the distance matrix.
+
+    Returns
+    -------
+    distances : SortedDistances
+        The sorted, finite distances.
+
+    """
+    if isinstance(distances, SortedDistances):
+        return distances
+
+    d = np.sort(np.asarray(distances, dtype=float).ravel())
 
-from skgstat.util import shannon_entropy
+    # NaNs are sorted to the end
+    d = d[:np.searchsorted(d, np.inf, side='right')]
+
+    return d.view(SortedDistances)
+
+
+def _filter_distances(distances, maxlag):
+    """
+    Apply maxlag to the distances. Returns the distances up to maxlag,
+    the maxlag limited to the maximum distance and whether the returned
+    distances are sorted.
+    """
+    if isinstance(distances, SortedDistances):
+        d = distances.view(np.ndarray)
+        if d.size == 0:
+            # no finite distances, the lag edges will be NaN
+            return d, np.nan if maxlag is None else maxlag, True
+        if maxlag is None or maxlag > d[-1]:
+            maxlag = d[-1]
+        return d[:np.searchsorted(d, maxlag, side='right')], maxlag, True
+
+    # maxlags larger than the maximum separating distance will be ignored
+    max_dist = np.nanmax(distances)
+    if maxlag is None or maxlag > max_dist:
+        maxlag = max_dist
+
+    # filter for distances < maxlag
+    return distances[distances <= maxlag], maxlag, False
+
+
+def _sorted_quantiles(d, q):
+    """
+    Linear interpolated quantiles of the sorted array d, like
+    `numpy.percentile`. The quantiles of no distances are NaN.
+    """
+    if d.size == 0:
+        return np.full(np.shape(q), np.nan)
+
+    pos = np.asarray(q) * (d.size - 1)
+    lo = np.floor(pos).astype(int)
+    hi = np.minimum(lo + 1, d.size - 1)
+    return d[lo] + (d[hi] - d[lo]) * (pos - lo)
+
+
+class DistanceSketch:
+    r"""Distance sketch
+
+    .. versionadded:: 0.5.0
+
+    Mergeable summary of the distances, that can be built chunk by chunk
+    while the distances are calculated. The number, minimum, maximum,
+    mean and variance of the distances are kept exactly, the quantiles
+    are approximated by a
+    :class:`QuantileAccumulator <skgstat.accumulators.QuantileAccumulator>`.
+    Each quantile has a relative error of at most `alpha`, and the memory
+    only grows with the logarithm of the distance range.
+
+    :func:`even_width_lags`, :func:`uniform_count_lags`,
+    :func:`auto_derived_lags` (`'fd'`, `'scott'`, `'sturges'`, `'sqrt'`),
+    :func:`kmeans` and :func:`ward` accept the sketch in place of the
+    distances. The resulting lag edges have these errors:
+
+    * `'even'`, `'sturges'`, `'sqrt'`, `'scott'`: exact, as long as the
+      maxlag is larger than the maximum distance. Otherwise, the number and
+      variance of the distances up to maxlag are taken from the buckets.
+    * `'uniform'`: each edge has a relative error of at most `alpha`.
+      If the maxlag is smaller than the maximum distance, the bucket that
+      contains maxlag adds an error to the rank of the quantiles.
+    * `'fd'`: the lag class width has a relative error of at most
+      :math:`\alpha (q_{75} + q_{25}) / (q_{75} - q_{25})`.
+    * `'kmeans'`, `'ward'`: the buckets are clustered, weighted by their
+      count. As a bucket cannot be split, the clusters are approximated.
+
+    Parameters
+    ----------
+    alpha : float
+        Relative error of the quantiles. Defaults to 0.01.
+
+    Example
+    -------
+
+    .. code-block:: python
+
+        sketch = DistanceSketch(alpha=0.01)
+        for chunk in distance_chunks:
+            sketch.update(chunk)
+        bins, _ = uniform_count_lags(sketch, 10, None)
+
+    """
+    def __init__(self, alpha=0.01):
+        self.alpha = alpha
+        self._acc = QuantileAccumulator(n_lags=1, alpha=alpha)
+
+        # exact moments
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.mean = 0.
+        self._m2 = 0.
+
+    def _add_moments(self, count, min_, max_, mean, m2):
+        # parallel update of the mean and sum of squared deviations
+        if count == 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self._m2 += m2 + delta**2 * self.count * count / total
+        self.mean += delta * count / total
+        self.count = total
+        self.min = min(self.min, min_)
+        self.max = max(self.max, max_)
+
+    def update(self, distances):
+        """Update
+
+        Add a chunk of distances. Missing values are ignored.
+
+        Parameters
+        ----------
+        distances : numpy.ndarray
+            Array of distances.
+
+        Returns
+        -------
+        self : DistanceSketch
+
+        """
+        d = np.asarray(distances, dtype=float).ravel()
+        d = d[np.isfinite(d)]
+        if d.size == 0:
+            return self
+
+        self._acc.update(d)
+        mean = d.mean()
+        self._add_moments(d.size, d.min(), d.max(), mean, np.sum((d - mean)**2))
+        return self
+
+    def merge(self, other):
+        """Merge
+
+        Add the summary of another sketch with the same alpha.
+
+        Parameters
+        ----------
+        other : DistanceSketch
+            Sketch of other distances, i.e. another chunk or worker.
+
+        Returns
+        -------
+        self : DistanceSketch
+
+        """
+        self._acc.merge(other._acc)
+        self._add_moments(other.count, other.min, other.max, other.mean, other._m2)
+        return self
+
+    @classmethod
+    def from_coordinates(cls, coordinates, dist_func='euclidean', alpha=0.01, chunk_size=1000):
+        """Sketch pairwise distances
+
+        Calculate the pairwise distances of the coordinates in blocks of
+        rows of the upper triangle of the distance matrix and add each
+        block to a new sketch. Only one block of distances is held in
+        memory.
+
+        Parameters
+        ----------
+        coordinates : numpy.ndarray
+            Coordinates of shape (n, dim).
+        dist_func : str, callable
+            Any metric accepted by `scipy.spatial.distance.cdist`.
+        alpha : float
+            Relative error of the quantiles.
+        chunk_size : int
+            Number of rows of the distance matrix in one block.
+
+        Returns
+        -------
+        sketch : DistanceSketch
+
+        """
+        coordinates = np.asarray(coordinates, dtype=float)
+        if coordinates.ndim == 1:
+            coordinates = coordinates.reshape(-1, 1)
+        n = len(coordinates)
+
+        sketch = cls(alpha=alpha)
+        for start in range(0, n, chunk_size):
+            stop = min(start + chunk_size, n)
+            block = cdist(coordinates[start:stop], coordinates[start:], metric=dist_func)
+
+            # upper triangle only
+            rows, cols = np.triu_indices(stop - start, k=1, m=n - start)
+            sketch.update(block[rows, cols])
+
+        return sketch
+
+    def _max(self, maxlag=None):
+        if maxlag is None or maxlag > self.max:
+            return self.max
+        return maxlag
+
+    def histogram(self, maxlag=None):
+        """Bucket histogram
+
+        Parameters
+        ----------
+        maxlag : float
+            Only return the buckets up to this distance.
+
+        Returns
+        -------
+        values : numpy.ndarray
+            Sorted representative distance of each bucket, limited to
+            the exact minimum and maximum distance.
+        counts : numpy.ndarray
+            Number of distances in each bucket.
+
+        """
+        values, counts = self._acc.histogram()
+        values = np.clip(values, self.min, self.max)
+        n = np.searchsorted(values, self._max(maxlag), side='right')
+        return values[:n], counts[:n].astype(float)
+
+    def quantile(self, q, maxlag=None):
+        """Quantiles
+
+        Parameters
+        ----------
+        q : float, numpy.ndarray
+            Quantiles in the range [0, 1].
+        maxlag : float
+            Quantiles of the distances up to this distance.
+
+        Returns
+        -------
+        quantiles : numpy.ndarray
+            Quantiles interpolated like numpy.percentile, with a relative
+            error of at most alpha.
+
+        """
+        values, counts = self.histogram(maxlag)
+        cum = np.cumsum(counts)
+
+        # interpolate between the two order statistics
+        rank = np.asarray(q, dtype=float) * (cum[-1] - 1)
+        low = values[np.searchsorted(cum, np.floor(rank), side='right')]
+        high = values[np.searchsorted(cum, np.ceil(rank), side='right')]
+        return low + (rank - np.floor(rank)) * (high - low)
+
+    def _stats(self, maxlag=None):
+        """number and standard deviation of the distances up to maxlag"""
+        if maxlag is None or maxlag >= self.max:
+            return self.count, np.sqrt(self._m2 / self.count)
+
+        values, counts = self.histogram(maxlag)
+        n = counts.sum()
+        mean = np.sum(values * counts) / n
+        return n, np.sqrt(np.sum(counts * (values - mean)**2) / n)
+
+    def histogram_bin_edges(self, method_name, maxlag=None):
+        """Bin edges
+
+        Bin edges like `numpy.histogram_bin_edges`, derived from the
+        sketch.
+
+        Parameters
+        ----------
+        method_name : str
+            One of `'fd'`, `'scott'`, `'sturges'` or `'sqrt'`.
+        maxlag : float
+            Limit the bins to this distance.
+
+        Returns
+        -------
+        bin_edges : numpy.ndarray
+            All bin edges, including the lower edge of the first bin.
+
+        """
+        first, last = self.min, self._max(maxlag)
+        n, std = self._stats(maxlag)
+
+        if method_name == 'sturges':
+            width = (last - first) / (np.log2(n) + 1.0)
+        elif method_name == 'sqrt':
+            width = (last - first) / np.sqrt(n)
+        elif method_name == 'scott':
+            width = (24.0 * np.pi**0.5 / n)**(1.0 / 3.0) * std
+        elif method_name == 'fd':
+            q25, q75 = self.quantile([0.25, 0.75], maxlag)
+            width = 2.0 * (q75 - q25) * n**(-1.0 / 3.0)
+        else:
+            raise ValueError(
+                "The binning method '%s' is not supported by the "
+                "DistanceSketch." % method_name
+            )
+
+        if width:
+            n_bins = int(np.ceil((last - first) / width))
+        else:
+            n_bins = 1
+
+        return np.linspace(first, last, n_bins + 1)
 
 
 def even_width_lags(distances, n, maxlag):
@@ -32,8 +382,14 @@ def even_width_lags(distances, n, maxlag):
 
     """
     # maxlags larger than the maximum separating distance will be ignored
-    if maxlag is None or maxlag > np.nanmax(distances):
-        maxlag = np.nanmax(distances)
+    if isinstance(distances, SortedDistances):
+        max_dist = distances[-1] if distances.size > 0 else np.nan
+    elif isinstance(distances, DistanceSketch):
+        max_dist = distances.max
+    else:
+        max_dist = np.nanmax(distances)
+    if maxlag is None or maxlag > max_dist:
+        maxlag = max_dist
 
     return np.linspace(0, maxlag, n + 1)[1:], None
 
@@ -64,17 +420,18 @@ def uniform_count_lags(distances, n, maxlag):
         The **upper** bin edges of the lag classes
 
     """
-    # maxlags larger than the maximum separating distance will be ignored
-    if maxlag is None or maxlag > np.nanmax(distances):
-        maxlag = np.nanmax(distances)
+    # all quantiles at once
+    q = np.arange(1, n + 1) / n
+    if isinstance(distances, DistanceSketch):
+        return distances.quantile(q, maxlag), None
 
     # filter for distances < maxlag
-    d = distances[np.where(distances <= maxlag)]
+    d, maxlag, is_sorted = _filter_distances(distances, maxlag)
 
-    return np.fromiter(
-        (np.nanpercentile(d, (i / n) * 100) for i in range(1, n + 1)),
-        dtype=float
-    ), None
+    if is_sorted:
+        return _sorted_quantiles(d, q), None
+    else:
+        return np.nanpercentile(d, q * 100), None
 
 
 def auto_derived_lags(distances, method_name, maxlag):
@@ -107,12 +464,12 @@ def auto_derived_lags(distances, method_name, maxlag):
     numpy.histogram_bin_edges
 
     """
-    # maxlags larger than maximum separating distance will be ignored
-    if maxlag is None or maxlag > np.nanmax(distances):
-        maxlag = np.nanmax(distances)
+    if isinstance(distances, DistanceSketch):
+        edges = distances.histogram_bin_edges(method_name, maxlag)[1:]
+        return edges, len(edges)
 
     # filter for distances < maxlag
-    d = distances[np.where(distances <= maxlag)]
+    d, maxlag, _ = _filter_distances(distances, maxlag)
 
     # calculate the edges
     edges = np.histogram_bin_edges(d, bins=method_name)[1:]
@@ -120,6 +477,186 @@ def auto_derived_lags(distances, method_name, maxlag):
     return edges, len(edges)
 
 
+def _weighted_points(d, max_points=1000000, subsample=None, random_state=42, is_sorted=False):
+    """
+    Sort the distances and compress them to at most max_points weighted
+    points. If there are more distances, they are counted in even width
+    histogram bins and each bin is represented by the mean of its
+    distances, weighted by its count. Optionally, a random sample of
+    subsample distances is used instead of all distances.
+    """
+    if subsample is not None and d.size > subsample:
+        rng = np.random.default_rng(random_state)
+        d = rng.choice(d, size=int(subsample), replace=False)
+        is_sorted = False
+
+    if not is_sorted:
+        d = np.sort(d)
+    if max_points is None or d.size <= max_points:
+        return d, np.ones(d.size)
+
+    # histogram compression
+    edges = np.linspace(d[0], d[-1], int(max_points) + 1)
+    idx = np.clip(np.searchsorted(edges, d, side='right') - 1, 0, int(max_points) - 1)
+    w = np.bincount(idx, minlength=int(max_points)).astype(float)
+    x = np.bincount(idx, weights=d, minlength=int(max_points))
+
+    filled = w > 0
+    return x[filled] / w[filled], w[filled]
+
+
+@njit(cache=True)
+def _kmeans_1d(x, w, k):
+    """
+    Optimal 1D k-means of the sorted, weighted points x by dynamic
+    programming (Ckmeans). The row of the cost matrix for each number of
+    clusters is filled by divide and conquer, as the optimal split index
+    is monotone. Only the last row of the cost matrix is kept, the split
+    indices for the backtracking need k * m integers.
+    Returns the index of the first point of each cluster.
+    """
+    m = x.size
+
+    # prefix sums for the within cluster sum of squares
+    sw = np.zeros(m + 1)
+    sx = np.zeros(m + 1)
+    sxx = np.zeros(m + 1)
+    for i in range(m):
+        sw[i + 1] = sw[i] + w[i]
+        sx[i + 1] = sx[i] + w[i] * x[i]
+        sxx[i + 1] = sxx[i] + w[i] * x[i] * x[i]
+
+    D = np.empty(m)
+    prev = np.empty(m)
+    B = np.zeros((k, m), dtype=np.int32)
+
+    # one cluster: points 0..j
+    for j in range(m):
+        D[j] = sxx[j + 1] - sx[j + 1]**2 / sw[j + 1]
+
+    # stack of (j_lo, j_hi, i_lo, i_hi) for the divide and conquer
+    stack = np.empty((2 * m + 4, 4), dtype=np.int64)
+    for c in range(1, k):
+        prev[:] = D
+        top = 0
+        stack[0] = (c, m - 1, c, m - 1)
+        while top >= 0:
+            jlo, jhi, ilo, ihi = stack[top]
+            top -= 1
+            if jlo > jhi:
+                continue
+            j = (jlo + jhi) // 2
+
+            # best first index i of the last cluster i..j
+            best = np.inf
+            arg = ilo
+            for i in range(max(ilo, c), min(ihi, j) + 1):
+                cw = sw[j + 1] - sw[i]
+                cost = sxx[j + 1] - sxx[i] - (sx[j + 1] - sx[i])**2 / cw
+                val = prev[i - 1] + cost
+                if val < best:
+                    best = val
+                    arg = i
+            D[j] = best
+            B[c, j] = arg
+
+            top += 1
+            stack[top] = (jlo, j - 1, ilo, arg)
+            top += 1
+            stack[top] = (j + 1, jhi, arg, ihi)
+
+    # backtrack the cluster starts
+    starts = np.zeros(k, dtype=np.int64)
+    j = m - 1
+    for c in range(k - 1, 0, -1):
+        starts[c] = B[c, j]
+        j = starts[c] - 1
+    return starts
+
+
+@njit(cache=True)
+def _ward_1d(x, w, k):
+    """
+    Ward clustering of the sorted, weighted points x. In one dimension,
+    the cheapest Ward merge is always between neighbouring clusters,
+    thus only the merge costs of neighbours are kept in a heap.
+    Returns the index of the first point of each cluster.
+    """
+    m = x.size
+    size = w.astype(np.float64).copy()
+    mean = x.astype(np.float64).copy()
+    left = np.arange(-1, m - 1)
+    right = np.arange(1, m + 1)
+    alive = np.ones(m, dtype=np.bool_)
+    version = np.zeros(m, dtype=np.int64)
+
+    # merge cost of i and its right neighbour with the versions of both
+    heap = [(_ward_cost(size, mean, i, i + 1), i, 0, 0) for i in range(m - 1)]
+    heapq.heapify(heap)
+
+    n_clusters = m
+    while n_clusters > k and len(heap) > 0:
+        _, a, va, vb = heapq.heappop(heap)
+        b = right[a] if alive[a] else m
+
+        # skip outdated merges
+        if b >= m or not alive[a] or version[a] != va or version[b] != vb:
+            continue
+
+        # merge b into a
+        total = size[a] + size[b]
+        mean[a] = (size[a] * mean[a] + size[b] * mean[b]) / total
+        size[a] = total
+        alive[b] = False
+        version[a] += 1
+        right[a] = right[b]
+        if right[b] < m:
+            left[right[b]] = a
+        n_clusters -= 1
+
+        # new merge costs with the neighbours
+        lo, hi = left[a], right[a]
+        if lo >= 0:
+            heapq.heappush(heap, (_ward_cost(size, mean, lo, a), lo, version[lo], version[a]))
+        if hi < m:
+            heapq.heappush(heap, (_ward_cost(size, mean, a, hi), a, version[a], version[hi]))
+
+    return np.flatnonzero(alive)
+
+
+@njit(cache=True)
+def _ward_cost(size, mean, a, b):
+    """Increase of the within cluster sum of squares by merging a and b"""
+    return size[a] * size[b] / (size[a] + size[b]) * (mean[a] - mean[b])**2
+
+
+def _centers_from_starts(x, w, starts, agg='mean'):
+    """
+    Cluster centers of the sorted, weighted points given the index of
+    the first point of each cluster.
+    """
+    centers = []
+    for lo, hi in zip(starts, list(starts[1:]) + [x.size]):
+        cx, cw = x[lo:hi], w[lo:hi]
+        if agg == 'median':
+            # weighted median
+            cum = np.cumsum(cw)
+            i = np.searchsorted(cum, cum[-1] / 2)
+            if cum[i] == cum[-1] / 2 and i + 1 < cx.size:
+                centers.append((cx[i] + cx[i + 1]) / 2)
+            else:
+                centers.append(cx[i])
+        else:
+            centers.append(np.sum(cx * cw) / np.sum(cw))
+    return np.asarray(centers)
+
+
+def _edges_from_centers(centers):
+    """upper lag class edges equidistant between the cluster centers"""
+    centers = np.sort(centers)
+    return (np.concatenate(([0], centers[:-1])) + centers) / 2
+
+
 def kmeans(distances, n, maxlag, binning_random_state=42, **kwargs):
     """KMeans binning
     .. versionadded:: 0.3.9
@@ -143,32 +680,62 @@ def kmeans(distances, n, maxlag, binning_random_state=42, **kwargs):
     bin_edges : numpy.ndarray
         The **upper** bin edges of the lag classes
 
+    Keyword Arguments
+    -----------------
+    binning_max_points : int
+        .. versionadded:: 0.5.0
+
+        If there are more distances, they are compressed into this many
+        even width histogram bins, weighted by their count, and the
+        clustering is approximated. Defaults to 1e6. Pass None to always
+        cluster all distances exactly.
+    binning_subsample : int
+        .. versionadded:: 0.5.0
+
+        If given, a random sample of this size is clustered, seeded by
+        `binning_random_state`.
+
     Note
     ----
-    The `KMeans <sklearn.cluster.KMeans>` that is used under the hood is not
-    a deterministic algorithm, as the starting cluster centroids are seeded
-    randomly. This can yield slightly different results on reach run.
-    Thus, for this application, the random_state on KMeans is fixed to a
-    specific value. You can change the seed by passing another seed to
-    `Variogram <skgstat.Variogram>` as `binning_random_state`. 
+    .. versionchanged:: 0.5.0
+        The distances are clustered by an exact 1D k-means. The optimal
+        clusters of the sorted distances are found by dynamic programming
+        (Ckmeans), instead of the randomly initialized
+        `KMeans <sklearn.cluster.KMeans>`. The result is deterministic and
+        `binning_random_state` is only used to seed the optional
+        subsample.
+
+    References
+    ----------
+    Wang, H., Song, M. (2011): Ckmeans.1d.dp: Optimal k-means Clustering
+    in One Dimension by Dynamic Programming. The R Journal, 3(2), 29-33.
 
     """
-    # maxlags larger than maximum separating distance will be ignored
-    if maxlag is None or maxlag > np.nanmax(distances):
-        maxlag = np.nanmax(distances)
-
-    # filter for distances < maxlag
-    d = distances[np.where(distances <= maxlag)]
+    if isinstance(distances, DistanceSketch):
+        # the buckets are weighted points already
+        x, w = distances.histogram(maxlag)
+    else:
+        # filter for distances < maxlag
+        d, maxlag, is_sorted = _filter_distances(distances, maxlag)
+
+        # sorted and weighted distances
+        x, w = _weighted_points(
+            d,
+            max_points=kwargs.get('binning_max_points', 1000000),
+            subsample=kwargs.get('binning_subsample'),
+            random_state=binning_random_state,
+            is_sorted=is_sorted
+        )
+
+    # no distances up to maxlag
+    if x.size == 0:
+        return np.full(n, np.nan), None
 
     # cluster the filtered distances
-    km = KMeans(n_clusters=n, random_state=binning_random_state).fit(d.reshape(-1, 1))
-
-    # get the centers
-    _centers = np.sort(km.cluster_centers_.flatten())
+    starts = _kmeans_1d(x, w, n)
 
-    # build the upper edges
-    bounds = zip([0] + list(_centers)[:-1], _centers)
-    edges = np.fromiter(((low + up) / 2 for low, up in bounds), dtype=float)
+    # get the centers and build the upper edges
+    edges = _edges_from_centers(_centers_from_starts(x, w, starts))
 
     return edges, None
 
@@ -194,34 +761,70 @@ def ward(distances, n, maxlag, **kwargs):
     maxlag : integer, float
         Limit the last lag class to this separating distance.
 
+    Keyword Arguments
+    -----------------
+    binning_agg_func : str
+        If 'median', the cluster centers are the median instead of the
+        mean distance.
+    binning_max_points : int
+        .. versionadded:: 0.5.0
+
+        If there are more distances, they are compressed into this many
+        even width histogram bins, weighted by their count, and the
+        clustering is approximated. Defaults to 1e6. Pass None to always
+        cluster all distances exactly.
+    binning_subsample : int
+        .. versionadded:: 0.5.0
+
+        If given, a random sample of this size is clustered, seeded by
+        `binning_random_state`.
+
     Returns
     -------
     bin_edges : numpy.ndarray
         The **upper** bin edges of the lag classes
 
-    """
-    # maxlags larger than maximum separating distance will be ignored
-    if maxlag is None or maxlag > np.nanmax(distances):
-        maxlag = np.nanmax(distances)
+    Note
+    ----
+    .. versionchanged:: 0.5.0
+        In one dimension, the Ward merge with the lowest cost is always
+        between neighbouring clusters. Thus, the sorted distances are
+        merged using a heap of the merge costs of neighbours, instead of
+        `AgglomerativeClustering <sklearn.cluster.AgglomerativeClustering>`,
+        which needs quadratic memory.
 
-    # filter for distances < maxlag
-    d = distances[np.where(distances <= maxlag)]
+    """
+    if isinstance(distances, DistanceSketch):
+        # the buckets are weighted points already
+        x, w = distances.histogram(maxlag)
+    else:
+        # filter for distances < maxlag
+        d, maxlag, is_sorted = _filter_distances(distances, maxlag)
+
+        # sorted and weighted distances
+        x, w = _weighted_points(
+            d,
+            max_points=kwargs.get('binning_max_points', 1000000),
+            subsample=kwargs.get('binning_subsample'),
+            random_state=kwargs.get('binning_random_state', 42),
+            is_sorted=is_sorted
+        )
+
+    # no distances up to maxlag
+    if x.size == 0:
+        return np.full(n, np.nan), None
 
     # cluster the filtered distances
-    w = AgglomerativeClustering(linkage='ward', n_clusters=n).fit(d.reshape(-1, 1))
+    starts = _ward_1d(x, w, n)
 
     # get the aggregation function
     if kwargs.get('binning_agg_func', False) == 'median':
-        agg = np.median
+        agg = 'median'
     else:
-        agg = np.mean
+        agg = 'mean'
 
-    # get the centers
-    _centers = np.sort([agg(d[np.where(w.labels_ == i)[0]]) for i in np.unique(w.labels_)])
-
-    # build the upper edges
-    bounds = zip([0] + list(_centers)[:-1], _centers)
-    edges = np.fromiter(((low + up) / 2 for low, up in bounds), dtype=float)
+    # get the centers and build the upper edges
+    edges = _edges_from_centers(_centers_from_starts(x, w, starts, agg=agg))
 
     return edges, None
 
@@ -253,34 +856,74 @@ def stable_entropy_lags(distances, n, maxlag, **kwargs):
     binning_entropy_bins : int, str
         Binning method for calculating the shannon entropy
         on each iteration.
+    binning_subsample : int
+        .. versionadded:: 0.5.0
+
+        If given and more distances are within maxlag, the lag class
+        entropies are calculated on a random sample of this size.
+        The sample is seeded by `binning_random_state`.
+    binning_random_state : int, None
+        .. versionadded:: 0.5.0
+
+        Seed for `binning_subsample`. Defaults to 42.
+
+    Notes
+    -----
+    .. versionchanged:: 0.5.0
+        The distances are sorted once. As the entropy bins are contiguous,
+        each of them is a contiguous range of the sorted distances. The
+        histogram of each lag class is the overlap of its range with the
+        ranges of the entropy bins. Thus, each loss function evaluation
+        only needs a binary search for each lag edge.
+
     Returns
     -------
     bin_edges : numpy.ndarray
         The **upper** bin edges of the lag classes
 
     """
-    # maxlags larger than maximum separating distance will be ignored
-    if maxlag is None or maxlag > np.nanmax(distances):
-        maxlag = np.nanmax(distances)
+    if isinstance(distances, DistanceSketch):
+        raise ValueError('stable_entropy_lags needs the distances, not a DistanceSketch.')
 
     # filter for distances < maxlag
-    d = distances[np.where(distances <= maxlag)]
+    d, maxlag, is_sorted = _filter_distances(distances, maxlag)
+
+    # no distances up to maxlag
+    if d.size == 0:
+        return np.full(n, np.nan), None
 
     # create a global binning and initial guess
     bins = np.histogram_bin_edges(d, bins=kwargs.get('binning_entropy_bins', 'sqrt'))
-    initial_guess = np.linspace(0, np.nanmax(d), n + 1)[1:]
+    initial_guess = np.linspace(0, d[-1] if is_sorted else np.nanmax(d), n + 1)[1:]
+
+    # use a sample of the distances
+    subsample = kwargs.get('binning_subsample')
+    if subsample is not None and d.size > subsample:
+        rng = np.random.default_rng(kwargs.get('binning_random_state', 42))
+        d = rng.choice(d, size=int(subsample), replace=False)
+        is_sorted = False
+
+    # sort once and find the range of each entropy bin
+    if not is_sorted:
+        d = np.sort(d)
+    bin_start = np.searchsorted(d, bins[:-1], side='left')
+    bin_end = np.append(bin_start[1:], d.size)
 
     # define the loss function
     def loss(edges):
+        # range of each lag class: l <= d < u
+        pos = np.searchsorted(d, edges, side='left')
+        lower, upper = pos[:-1, None], pos[1:, None]
+
+        # histogram of each lag class
+        counts = np.maximum(
+            np.minimum(upper, bin_end) - np.maximum(lower, bin_start), 0
+        )
+
         # get the shannon entropy for the current binning
         h = np.ones(len(edges) - 1) * 9999
-        for i, bnd in enumerate(zip(edges, edges[1:])):
-            l, u = bnd
-            x = d[np.where((d >= l) & (d < u))[0]]
-            if len(x) == 0:
-                continue
-            else:
-                h[i] = shannon_entropy(x, bins)
+        filled = (upper > lower).ravel()
+        h[filled] = shannon_entropy_from_counts(counts[filled])
 
         # return the absolute differences between the bins
         return np.sum(np.abs(np.diff(h)))
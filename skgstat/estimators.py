@@ -5,13 +5,76 @@ the estimate for one bin. If you want a Variogram, use the variogram functions o
 submodule, or order the bins yourself
 """
 import numpy as np
-from scipy.special import binom
-from numba import njit, jit
+from numba import njit, prange, get_num_threads
 
 from skgstat.util import shannon_entropy
 
 
-@njit
+@njit(parallel=True, cache=True)
+def _lag_sums(x, groups, n_lags, n_chunks):
+    # the number of threads is passed in, as reading it in the
+    # kernel prevents caching the kernel
+    chunk = (x.size + n_chunks - 1) // n_chunks
+
+    # each thread accumulates into its own row
+    count = np.zeros((n_chunks, n_lags), dtype=np.int64)
+    sq = np.zeros((n_chunks, n_lags))
+    sqrt = np.zeros((n_chunks, n_lags))
+
+    for c in prange(n_chunks):
+        for i in range(c * chunk, min(x.size, (c + 1) * chunk)):
+            g = groups[i]
+            if g < 0 or g >= n_lags:
+                continue
+            count[c, g] += 1
+            sq[c, g] += x[i] * x[i]
+            sqrt[c, g] += np.sqrt(np.abs(x[i]))
+
+    # reduce the thread rows
+    for c in range(1, n_chunks):
+        for g in range(n_lags):
+            count[0, g] += count[c, g]
+            sq[0, g] += sq[c, g]
+            sqrt[0, g] += sqrt[c, g]
+
+    return count[0], sq[0], sqrt[0]
+
+
+def lag_sums(x, groups, n_lags):
+    """Sufficient statistics per lag class
+
+    .. versionadded:: 0.5.0
+
+    Calculates the number of pairwise differences, the sum of squared
+    differences and the sum of square roots of the absolute differences
+    for all lag classes in one parallel pass. The Matheron and Cressie
+    estimators as well as the lag class histogram can be derived from
+    these statistics, without forming the lag classes.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        Array of pairwise differences.
+    groups : numpy.ndarray
+        Lag class index aligned to x. Pairs with an index outside
+        [0, n_lags[ are ignored.
+    n_lags : int
+        Number of lag classes.
+
+    Returns
+    -------
+    count : numpy.ndarray
+        Number of pairwise differences per lag class.
+    sq : numpy.ndarray
+        Sum of squared differences per lag class.
+    sqrt : numpy.ndarray
+        Sum of square roots of the absolute differences per lag class.
+
+    """
+    return _lag_sums(x, groups, n_lags, get_num_threads())
+
+
+@njit(cache=True)
 def matheron(x):
     r"""Matheron Semi-Variance
 
@@ -66,7 +129,7 @@ def matheron(x):
     return (1. / (2 * x.size)) * np.sum(np.power(x, 2))
 
 
-@njit
+@njit(cache=True)
 def cressie(x):
     r""" Cressie-Hawkins Semi-Variance
 
@@ -178,8 +241,135 @@ def dowd(x):
     return 2.198 * np.nanmedian(x)**2
 
 
-@jit(forceobj=True)
-def genton(x):
+@njit(cache=True)
+def _weighted_median(a, w):
+    """
+    Weighted median of a in expected O(n) time by a quickselect over
+    the values, like the whimed routine of Croux & Rousseeuw.
+    """
+    a = a.copy()
+    w = w.copy()
+    half = w.sum() / 2
+    wrest = 0.
+    n = a.size
+
+    while True:
+        pivot = a[n // 2]
+
+        # three-way partition of the weights
+        wleft = 0.
+        wmid = 0.
+        for i in range(n):
+            if a[i] < pivot:
+                wleft += w[i]
+            elif a[i] == pivot:
+                wmid += w[i]
+
+        if wrest + wleft >= half:
+            # median is in the lower part
+            m = 0
+            for i in range(n):
+                if a[i] < pivot:
+                    a[m] = a[i]
+                    w[m] = w[i]
+                    m += 1
+            n = m
+        elif wrest + wleft + wmid >= half:
+            return pivot
+        else:
+            # median is in the upper part
+            wrest += wleft + wmid
+            m = 0
+            for i in range(n):
+                if a[i] > pivot:
+                    a[m] = a[i]
+                    w[m] = w[i]
+                    m += 1
+            n = m
+
+
+@njit(cache=True)
+def _kth_pair_difference(y, k):
+    """
+    Return the k-th smallest (1-based) of all pairwise differences
+    y[j] - y[i], i < j of the sorted array y, without building them.
+    Croux & Rousseeuw [6]_ selection: every row i of the implicit matrix of
+    differences is sorted and only the range left[i]:right[i] of each row
+    is kept as candidates. The weighted median of the row medians is used
+    as trial value and at least a quarter of the candidates is discarded
+    in each O(n) counting sweep.
+    """
+    n = y.size
+    left = np.arange(1, n + 1)
+    right = np.ones(n, dtype=np.int64) * (n - 1)
+    below = np.empty(n, dtype=np.int64)
+    upto = np.empty(n, dtype=np.int64)
+
+    # number of differences smaller than all candidates
+    knew = 0
+    # number of remaining candidates
+    nl = n * (n - 1) // 2
+
+    while nl > n:
+        # weighted high median of the row medians
+        med = np.empty(n)
+        weight = np.empty(n)
+        m = 0
+        for i in range(n):
+            if left[i] <= right[i]:
+                med[m] = y[(left[i] + right[i] + 1) // 2] - y[i]
+                weight[m] = right[i] - left[i] + 1
+                m += 1
+        trial = _weighted_median(med[:m], weight[:m])
+
+        # count differences smaller than or equal to trial per row
+        sum_below = 0
+        sum_upto = 0
+        j = 0
+        jj = 0
+        for i in range(n):
+            j = max(j, i + 1)
+            while j < n and y[j] - y[i] < trial:
+                j += 1
+            below[i] = j - 1
+            sum_below += j - i - 1
+
+            jj = max(jj, i + 1)
+            while jj < n and y[jj] - y[i] <= trial:
+                jj += 1
+            upto[i] = jj - 1
+            sum_upto += jj - i - 1
+
+        if k <= sum_below:
+            # the result is smaller than trial
+            for i in range(n):
+                right[i] = min(right[i], below[i])
+        elif k > sum_upto:
+            # the result is larger than trial
+            for i in range(n):
+                left[i] = max(left[i], upto[i] + 1)
+        else:
+            return trial
+
+        # update the candidate counters
+        knew = 0
+        nl = 0
+        for i in range(n):
+            knew += left[i] - i - 1
+            if left[i] <= right[i]:
+                nl += right[i] - left[i] + 1
+
+    # select from the remaining candidates
+    cand = np.empty(nl)
+    c = 0
+    for i in range(n):
+        for j in range(left[i], right[i] + 1):
+            cand[c] = y[j] - y[i]
+            c += 1
+    return np.sort(cand)[k - knew - 1]
+
+
+def genton(x, max_pairs=None):
     r""" Genton robust semi-variance estimator
 
     Return the Genton semi-variance of the given sample x. Genton is a highly
@@ -189,6 +379,10 @@ def genton(x):
     data sets be close or equal to the 25% quartile of all ordered point pairs
     in X.
 
+    .. versionchanged:: 0.5.0
+        The order statistics are selected in O(n log n) time and O(n)
+        memory, instead of building all pairwise differences.
+
     Parameters
     ----------
     x : numpy.ndarray
@@ -196,6 +390,12 @@ def genton(x):
         between pairwise observations in value space. If xi and x[i+h] fall
         into the h separating distance class, x should contain abs(xi - x[i+h])
         as an element.
+    max_pairs : int
+        .. versionadded:: 0.5.0
+
+        If given and x has more than max_pairs point pairs, the estimator
+        is approximated from a random sample of max_pairs point pairs.
+        The sample is seeded for reproducible results.
 
     Returns
     -------
@@ -221,42 +421,87 @@ def genton(x):
      will therefore be set to 0.5 and the two binomial coefficients k,
      q are not calculated.
 
+     The quantile is interpolated between two order statistics of the
+     pairwise differences. These are selected by the algorithm of Croux
+     and Rousseeuw [6]_ from the sorted sample.
+
+     For the approximation, m = max_pairs point pairs are drawn at random.
+     By the Dvoretzky-Kiefer-Wolfowitz inequality, the approximated
+     quantile lies between the exact quantiles at
+     :math:`(k/q) \pm \epsilon` with a probability of
+     :math:`1 - \alpha`, where
+     :math:`\epsilon = \sqrt{\ln(2 / \alpha) / (2m)}`.
+     For m = 1e6 and :math:`\alpha = 0.05`, :math:`\epsilon` is ~0.0014.
+
     References
     ----------
 
     ..  [5] Genton, M. G., (1998): Highly robust variogram estimation,
         Math. Geol., 30, 213 - 221.
+    ..  [6] Croux, C., Rousseeuw, P. J. (1992): Time-efficient algorithms
+        for two highly robust estimators of scale. Computational
+        Statistics, 1, 411 - 428.
 
     """
-    # get length
+    x = np.asarray(x, dtype=float)
     n = x.size
 
-    if n < 2:
+    if n < 2 or np.any(np.isnan(x)):
         return np.nan
 
-    # pre-populate y => we need (n*n -n) / 2
-    y = np.zeros(int((n*n - n) / 2))
+    # approximate from a random sample of pairs, drawn outside of the
+    # kernel to leave the global random state untouched
+    if max_pairs is not None and n * (n - 1) // 2 > max_pairs:
+        rng = np.random.default_rng(42)
+        i = rng.integers(0, n, size=max_pairs)
+        j = rng.integers(0, n - 1, size=max_pairs)
+        j[j >= i] += 1
+        y = np.abs(x[i] - x[j])
+        return 0.5 * np.power(2.219 * np.percentile(y, _genton_quantile(n)), 2)
 
-    # calculate
-    z = 0
-    for i in range(n):
-        for j in range(n):
-            if i < j:
-                y[z] = np.abs(x[i] - x[j])
-                z += 1
+    return _genton(x)
 
+
+@njit(cache=True)
+def _genton_quantile(n):
+    """
+    Percentile k/q of the pairwise differences used by Genton.
+    """
     # if N > 500, (k/q) will be ~ 1/4 anyway
     if n >= 500:
-        k, q, = 1, 4
-    else:
-        # get k  k is binom(N(x)/2+1, 2)
-        k = binom(n / 2 + 1, 2)
+        return 0.25
+
+    # get k  k is binom(N(x)/2+1, 2)
+    a = n / 2 + 1
+    k = a * (a - 1) / 2
+
+    # get q. Genton needs the kth quantile of q
+    q = n * (n - 1) / 2
 
-        # get q. Genton needs the kth quantile of q
-        q = binom(n, 2)
+    return k / q
+
+
+@njit(cache=True)
+def _genton(x):
+    """
+    Genton kernel using the exact order statistics of all pairwise
+    differences of x. x must not contain NaN.
+    """
+    n = x.size
+    npairs = n * (n - 1) // 2
+
+    # the kth percentile is interpolated like numpy.percentile
+    pos = _genton_quantile(n) / 100 * (npairs - 1)
+    lo = int(np.floor(pos))
+    frac = pos - lo
+
+    y = np.sort(x)
+    p = _kth_pair_difference(y, lo + 1)
+    if frac > 0:
+        p = p + frac * (_kth_pair_difference(y, lo + 2) - p)
 
     # return the kth percentile
-    return 0.5 * np.power(2.219 * np.percentile(y, (k / q)), 2)
+    return 0.5 * np.power(2.219 * p, 2)
 
 
 def minmax(x):
@@ -349,3 +594,141 @@ def entropy(x, bins=None):
         bins = 15
 
     return shannon_entropy(x, bins)
+
+
+def _grouped_matheron(x, groups, n_lags):
+    """Matheron for all lag classes from the lag class sums"""
+    count, sq, _ = lag_sums(x, np.asarray(groups, dtype=np.int64), n_lags)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = sq / (2 * count)
+    z[count == 0] = np.nan
+    return z
+
+
+def _grouped_cressie(x, groups, n_lags):
+    """Cressie-Hawkins for all lag classes from the lag class sums"""
+    count, _, sqrt = lag_sums(x, np.asarray(groups, dtype=np.int64), n_lags)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        nominator = np.power(sqrt / count, 4)
+        denominator = 0.457 + (0.494 / count) + (0.045 / count**2)
+        z = nominator / (2 * denominator)
+    z[count == 0] = np.nan
+    return z
+
+
+# registry of all estimators by name: (scalar function, grouped function)
+_ESTIMATORS = dict()
+
+
+def register_estimator(name, func=None, grouped=None):
+    """Register an estimator
+
+    .. versionadded:: 0.5.0
+
+    Registers an estimator under the given name, which can then be used
+    as `estimator` in :class:`Variogram <skgstat.Variogram>`,
+    :class:`DirectionalVariogram <skgstat.DirectionalVariogram>` and
+    :class:`SpaceTimeVariogram <skgstat.SpaceTimeVariogram>`. An
+    estimator can be given in two forms:
+
+    * **func**: a function of the pairwise differences of one lag class,
+      returning the semi-variance. It is mapped on each lag class.
+    * **grouped**: a function of (x, groups, n_lags), which receives all
+      pairwise differences x and the lag class index of each difference.
+      Differences with an index outside [0, n_lags[ have to be ignored.
+      It returns the semi-variance of all n_lags lag classes at once.
+
+    If the grouped form is registered, the variograms use it instead of
+    mapping the function on each lag class. If only the grouped form is
+    given, the function for one lag class is derived from it.
+
+    Parameters
+    ----------
+    name : str
+        Name of the estimator. Existing names are overwritten.
+    func : callable
+        Estimator for one lag class.
+    grouped : callable
+        Estimator for all lag classes.
+
+    Returns
+    -------
+    func : callable
+        The estimator for one lag class.
+
+    """
+    if func is None and grouped is None:
+        raise ValueError('Either func or grouped has to be given.')
+
+    if func is None:
+        def func(x):
+            x = np.asarray(x, dtype=float)
+            return grouped(x, np.zeros(x.size, dtype=np.int64), 1)[0]
+        func.__name__ = name
+        func.__doc__ = grouped.__doc__
+
+    _ESTIMATORS[name.lower()] = (func, grouped)
+    return func
+
+
+def get_estimator(name):
+    """Get a registered estimator
+
+    .. versionadded:: 0.5.0
+
+    Parameters
+    ----------
+    name : str
+        Name of the estimator.
+
+    Returns
+    -------
+    func : callable
+        The estimator for one lag class.
+
+    Raises
+    ------
+    ValueError : if no estimator of that name is registered.
+
+    """
+    try:
+        return _ESTIMATORS[name.lower()][0]
+    except KeyError:
+        raise ValueError(
+            'Variogram estimator %s is not understood, please provide the '
+            'function.' % name
+        )
+
+
+def get_grouped_estimator(func):
+    """Get the grouped form of an estimator
+
+    .. versionadded:: 0.5.0
+
+    Parameters
+    ----------
+    func : callable
+        An estimator for one lag class, as returned by
+        :func:`get_estimator <skgstat.estimators.get_estimator>`.
+
+    Returns
+    -------
+    grouped : callable, None
+        The registered grouped form of the estimator, or None, if func is
+        not registered or has no grouped form.
+
+    """
+    for f, grouped in _ESTIMATORS.values():
+        if f is func:
+            return grouped
+    return None
+
+
+# register the built-in estimators
+register_estimator('matheron', matheron, grouped=_grouped_matheron)
+register_estimator('cressie', cressie, grouped=_grouped_cressie)
+register_estimator('dowd', dowd)
+register_estimator('genton', genton)
+register_estimator('minmax', minmax)
+register_estimator('percentile', percentile)
+register_estimator('entropy', entropy)
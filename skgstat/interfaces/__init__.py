@@ -1,3 +1,63 @@
-from .variogram_estimator import VariogramEstimator
-from .pykrige import pykrige_model, pykrige_params, pykrige_as_kwargs
-from .gstools import gstools_cov_model
+import importlib
+
+# the interfaces are imported on first use, as they import
+# sklearn, pykrige and gstools
+
+
+def _lazy(module, name):
+    """
+    Thin wrapper of the interface function name of module. The module
+    is imported on the first call.
+    """
+    def wrapper(*args, **kwargs):
+        func = getattr(importlib.import_module('.%s' % module, __name__), name)
+        return func(*args, **kwargs)
+
+    wrapper.__name__ = name
+    wrapper.__doc__ = 'Imports skgstat.interfaces.%s and calls %s.' % (module, name)
+    return wrapper
+
+
+pykrige_model = _lazy('pykrige', 'pykrige_model')
+pykrige_params = _lazy('pykrige', 'pykrige_params')
+pykrige_as_kwargs = _lazy('pykrige', 'pykrige_as_kwargs')
+gstools_cov_model = _lazy('gstools', 'gstools_cov_model')
+gstools_params = _lazy('gstools', 'gstools_params')
+
+
+class _LazyClass(type):
+    """
+    Metaclass of the VariogramEstimator proxy. Instantiation, attribute
+    access and isinstance checks are passed to
+    :class:`skgstat.interfaces.variogram_estimator.VariogramEstimator`,
+    which is imported on first use.
+    """
+    @staticmethod
+    def _target():
+        from .variogram_estimator import VariogramEstimator
+        return VariogramEstimator
+
+    def __call__(cls, *args, **kwargs):
+        return cls._target()(*args, **kwargs)
+
+    def __getattr__(cls, name):
+        return getattr(cls._target(), name)
+
+    def __setattr__(cls, name, value):
+        setattr(cls._target(), name, value)
+
+    def __delattr__(cls, name):
+        delattr(cls._target(), name)
+
+    def __instancecheck__(cls, obj):
+        return isinstance(obj, cls._target())
+
+    def __subclasscheck__(cls, subclass):
+        return issubclass(subclass, cls._target())
+
+
+class VariogramEstimator(metaclass=_LazyClass):
+    """
+    Proxy of :class:`skgstat.interfaces.variogram_estimator.VariogramEstimator`,
+    which imports sklearn on first use.
+    """
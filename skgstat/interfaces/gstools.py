@@ -14,6 +14,70 @@ def __check_gstools_available():  # pragma: no cover
     return True
 
 
+def gstools_params(variogram):
+    """GSTools model parameters
+
+    .. versionadded:: 0.5.0
+
+    Map the fitted model of a :class:`skgstat.Variogram` to the native
+    `gstools.CovModel` class and its parameters. All models are given
+    with `rescale=1`, thus the length scale is the range parameter of
+    the skgstat model:
+
+    * spherical, cubic: `len_scale` is the effective range
+    * exponential: `len_scale` is a third of the effective range
+    * gaussian: `len_scale` is half of the effective range
+    * stable: `len_scale` is the effective range divided by
+      :math:`3^{1/s}` and `alpha` is the shape s
+    * matern: `len_scale` is half of the range parameter and `nu` is the
+      smoothness s
+
+    Parameters
+    ----------
+    variogram : skgstat.Variogram
+        Fitted Variogram instance.
+
+    Returns
+    -------
+    model_name : str
+        Name of the gstools model class, or None, if the model has no
+        native gstools counterpart, i.e. harmonized or custom models.
+    params : dict
+        Keyword arguments of the gstools model class.
+
+    """
+    if variogram.cof is None:
+        variogram.fit(force=True)
+
+    name = variogram._model.__name__
+    if variogram._harmonize or name not in (
+        'spherical', 'exponential', 'gaussian', 'cubic', 'stable', 'matern'
+    ):
+        return None, dict()
+
+    # the fitted model uses the coefficients directly
+    cof = variogram.cof
+    r, c0 = cof[0], cof[1]
+    b = cof[-1] if variogram.use_nugget else 0.
+
+    params = dict(var=c0, nugget=b, rescale=1.)
+    if name in ('spherical', 'cubic'):
+        params['len_scale'] = r
+    elif name == 'exponential':
+        params['len_scale'] = r / 3.
+    elif name == 'gaussian':
+        params['len_scale'] = r / 2.
+    elif name == 'stable':
+        params['len_scale'] = r / np.power(3, 1 / cof[2])
+        params['alpha'] = cof[2]
+    elif name == 'matern':
+        a = r / 3. if cof[2] >= 10 or cof[2] <= 0.5 else r / 2.
+        params['len_scale'] = a / 2.
+        params['nu'] = cof[2]
+
+    return name.capitalize(), params
+
+
 def gstools_cov_model(variogram, **kwargs):
     """GSTools Interface
 
@@ -23,7 +87,24 @@ def gstools_cov_model(variogram, **kwargs):
     kwargs passed will be passed to
     `gstools.CovModel`.
 
+    .. versionchanged:: 0.5.0
+        The spherical, exponential, gaussian, cubic, stable and matern
+        models are returned as the native gstools model, with the
+        parameters of :func:`gstools_params`. No further fit is
+        needed and gstools uses its own model implementation. Harmonized
+        and custom models are still wrapped into a `gstools.CovModel`.
+
     """
+    # dim can be infered from variogram
+    if 'dim' not in kwargs.keys():
+        kwargs['dim'] = variogram.coordinates.ndim
+
+    # use the native gstools model, if available
+    model_name, params = gstools_params(variogram)
+    if model_name is not None:
+        params.update(kwargs)
+        return getattr(gstools, model_name)(**params)
+
     # extract the fitted variogram model
     fitted_model = variogram.fitted_model
 
@@ -35,10 +116,6 @@ def gstools_cov_model(variogram, **kwargs):
             else:
                 return fitted_model(r)
 
-    # dim can be infered from variogram
-    if 'dim' not in kwargs.keys():
-        kwargs['dim'] = variogram.coordinates.ndim
-
     # Create the instance
     model = VariogramModel(**kwargs)
     model.fit_variogram(variogram.bins, variogram.experimental)
@@ -41,11 +41,10 @@ def pykrige_model(variogram):
         star operator.
 
         """
-        if not isinstance(lags, np.ndarray):
-            lags = np.asarray(lags, dtype=float)
+        lags = np.asarray(lags, dtype=float)
 
-        # get the semi-variances
-        semivar = np.fromiter(map(model, lags.flatten()), dtype=float)
+        # get the semi-variances of all lags at once
+        semivar = np.asarray(model(lags.flatten()), dtype=float)
 
         # return
         return semivar.reshape(lags.shape)
@@ -1,3 +1,9 @@
+import copy
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
 import numpy as np
 from sklearn.base import BaseEstimator
 from sklearn.utils.validation import check_X_y
@@ -5,6 +11,67 @@ from sklearn.utils.validation import check_X_y
 from skgstat import Variogram
 
 
+# preprocessed Variograms by coordinates, values and distance function.
+# A cross-validation keeps one entry per training fold and one for the
+# refit on all data, thus the size covers the common fold numbers.
+_CACHE = OrderedDict()
+_CACHE_SIZE = 16
+_CACHE_LOCK = threading.Lock()
+
+# events of the keys, that are built right now. The lock is only held
+# to look up and insert, other threads wait for the event of their key.
+_PENDING = dict()
+
+
+def _cache_key(X, y, dist_func):
+    """hash of the input data and the distance function"""
+    h = hashlib.sha1()
+    for arr in (X, y):
+        arr = np.ascontiguousarray(arr)
+        h.update(str((arr.shape, arr.dtype.str)).encode())
+        h.update(arr.tobytes())
+    return h.hexdigest(), dist_func
+
+
+def set_cache_size(size):
+    """Set the cache size
+
+    .. versionadded:: 0.5.0
+
+    Set the number of preprocessed Variograms kept by
+    :class:`VariogramEstimator <skgstat.interfaces.VariogramEstimator>`.
+    A cross-validation needs one entry for each training fold and one
+    for the refit on all data. Defaults to 16.
+
+    Parameters
+    ----------
+    size : int
+        Number of cached Variograms.
+
+    """
+    global _CACHE_SIZE
+    if int(size) < 1:
+        raise ValueError('The cache size has to be a positive integer.')
+
+    with _CACHE_LOCK:
+        _CACHE_SIZE = int(size)
+        while len(_CACHE) > _CACHE_SIZE:
+            _CACHE.popitem(last=False)
+
+
+def clear_cache():
+    """Clear the cache
+
+    .. versionadded:: 0.5.0
+
+    Remove all preprocessed Variograms kept by
+    :class:`VariogramEstimator <skgstat.interfaces.VariogramEstimator>`.
+
+    """
+    with _CACHE_LOCK:
+        _CACHE.clear()
+
+
 class VariogramEstimator(BaseEstimator):
     def __init__(self,
                  estimator='matheron',
@@ -18,7 +85,9 @@ class VariogramEstimator(BaseEstimator):
                  maxlag=None,
                  n_lags=10,
                  verbose=False,
-                 use_score='rmse'
+                 use_score='rmse',
+                 use_cache=False,
+                 cache_dir=None
                  ):
         r"""VariogramEstimator class
 
@@ -38,6 +107,28 @@ class VariogramEstimator(BaseEstimator):
             Scoring parameter to assess the Variogram fitting quality.
             Defaults to `'rmse'`, the Root mean squared error.
             Can be changed to ``['r2', 'residuals']``.
+        use_cache : bool
+            .. versionadded:: 0.5.0
+
+            If True, the distances and pairwise differences are
+            calculated once for the same coordinates, values and
+            `dist_func` and shared by all fits, i.e. of all parameter sets
+            in a `GridSearchCV`. Defaults to False. The cache is module
+            wide and keeps the last 16 inputs with all their pairwise
+            arrays alive after the search returned. Use
+            :func:`set_cache_size <skgstat.interfaces.variogram_estimator.set_cache_size>`
+            to change it and
+            :func:`clear_cache <skgstat.interfaces.variogram_estimator.clear_cache>`
+            to release them. The shared arrays are not copied.
+        cache_dir : str
+            .. versionadded:: 0.5.0
+
+            If given and `use_cache` is True, the cached preprocessing of
+            each input is saved to a sub-directory, see the
+            `preprocessing_store` keyword argument of
+            :class:`Variogram <skgstat.Variogram>`. Process workers of a
+            parallel `GridSearchCV` load the arrays memory-mapped from
+            there, instead of each calculating them.
 
         Note
         ----
@@ -67,6 +158,8 @@ class VariogramEstimator(BaseEstimator):
 
         # add Estimator specific attributes
         self.use_score = use_score
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir
 
     def fit(self, X, y):
         """Fit a model
@@ -87,24 +180,25 @@ class VariogramEstimator(BaseEstimator):
         variogram : VariogramEstimator
             A fitted instance of VariogramEstimator
 
+        Note
+        ----
+        .. versionchanged:: 0.5.0
+            With `use_cache=True`, the preprocessed Variogram of X and y
+            stays in a module wide cache, that keeps the pairwise arrays
+            of the last 16 inputs alive after fitting. For large inputs,
+            call
+            :func:`clear_cache <skgstat.interfaces.variogram_estimator.clear_cache>`
+            once the search is done.
+
         """
         # check the input data
         X, y = check_X_y(X, y)
 
         # build the model
-        self.variogram = Variogram(
-            X, y,
-            estimator=self.estimator,
-            model=self.model,
-            dist_func=self.dist_func,
-            bin_func=self.bin_func,
-            normalize=self.normalize,
-            fit_method=self.fit_method,
-            fit_sigma=self.fit_sigma,
-            use_nugget=self.use_nugget,
-            maxlag=self.maxlag,
-            n_lags=self.n_lags
-        )
+        if self.use_cache:
+            self.variogram = self._cached_variogram(X, y)
+        else:
+            self.variogram = self._build_variogram(X, y)
 
         # append the data
         self.X_ = X
@@ -122,6 +216,94 @@ class VariogramEstimator(BaseEstimator):
         # return
         return self
 
+    def _build_variogram(self, X, y, **kwargs):
+        return Variogram(
+            X, y,
+            estimator=self.estimator,
+            model=self.model,
+            dist_func=self.dist_func,
+            bin_func=self.bin_func,
+            normalize=self.normalize,
+            fit_method=self.fit_method,
+            fit_sigma=self.fit_sigma,
+            use_nugget=self.use_nugget,
+            maxlag=self.maxlag,
+            n_lags=self.n_lags,
+            **kwargs
+        )
+
+    def _cached_variogram(self, X, y):
+        """
+        Shallow copy of the cached Variogram of X and y with the parameters
+        of this instance. The copy shares the distances, pairwise
+        differences and binning pre-pass of the cached Variogram.
+        """
+        try:
+            key = _cache_key(X, y, self.dist_func)
+            hash(key)
+        except TypeError:
+            # unhashable dist_func
+            return self._build_variogram(X, y)
+
+        base = None
+        while base is None:
+            with _CACHE_LOCK:
+                if key in _CACHE:
+                    _CACHE.move_to_end(key)
+                    base = _CACHE[key]
+                    break
+
+                # wait, if another thread builds this key
+                event = _PENDING.get(key)
+                building = event is None
+                if building:
+                    event = _PENDING[key] = threading.Event()
+
+            if not building:
+                # look up again, the build might have failed
+                event.wait()
+                continue
+
+            # build outside of the lock
+            try:
+                kwargs = dict()
+                if self.cache_dir is not None:
+                    # one store per input, shared by all processes
+                    name = hashlib.sha1(str(key).encode()).hexdigest()
+                    kwargs['preprocessing_store'] = os.path.join(self.cache_dir, name)
+
+                base = self._build_variogram(X, y, **kwargs)
+                base.preprocessing()
+
+                with _CACHE_LOCK:
+                    _CACHE[key] = base
+                    if len(_CACHE) > _CACHE_SIZE:
+                        _CACHE.popitem(last=False)
+            finally:
+                with _CACHE_LOCK:
+                    del _PENDING[key]
+                event.set()
+
+        V = copy.copy(base)
+        V._kwargs = dict(base._kwargs)
+
+        # the copies do not update the store with their binning
+        V._kwargs.pop('preprocessing_store', None)
+
+        # the setters reset the binning and fitting of the copy
+        V.n_lags = self.n_lags
+        V.maxlag = self.maxlag
+        V.estimator = self.estimator
+        V.bin_func = self.bin_func
+        V.model = self.model
+        V.normalized = self.normalize
+        V.use_nugget = self.use_nugget
+        V.fit_method = self.fit_method
+        V.fit_sigma = self.fit_sigma
+
+        V.fit()
+        return V
+
     def predict(self, X):
         """Predict
 
@@ -129,8 +311,12 @@ class VariogramEstimator(BaseEstimator):
         the estimation of semi-variance values for a given distance
         array. The X here is an 1D array of distances, **not coordinates**.
 
+        .. versionchanged:: 0.5.0
+            The model is evaluated on the whole array at once.
+
         """
-        return np.fromiter(map(self._model_func_, X.flatten()), dtype=float)
+        X = np.asarray(X, dtype=float).flatten()
+        return np.asarray(self._model_func_(X), dtype=float)
 
     def score(self, X, y=None):
         """Fit score
@@ -1,25 +1,77 @@
 import math
+import inspect
 from functools import wraps
 
 import numpy as np
 from scipy import special
-from numba import jit
+from numba import jit, vectorize
+
+
+# array versions of the models, built on first use
+_ARRAY_MODELS = dict()
+
+
+def _numpy_model(func):
+    """
+    Mark a model, that is written with numpy and scipy ufuncs and thus
+    evaluates arrays directly. Like for the jitted models, `py_func` is
+    the Python function.
+    """
+    func.py_func = func
+    return func
+
+
+def _array_model(func):
+    """
+    Array-native version of the scalar model func. Jitted models are
+    compiled into a numba ufunc, which is cached on disk. Numpy models
+    are called on the array.
+    """
+    if func not in _ARRAY_MODELS:
+        if func.py_func is func:
+            _ARRAY_MODELS[func] = func
+        else:
+            _ARRAY_MODELS[func] = vectorize(nopython=True, cache=True)(func.py_func)
+    return _ARRAY_MODELS[func]
 
 
 def variogram(func):
+    """
+    .. versionchanged:: 0.5.0
+        Arrays of lags passed to a jitted model are evaluated by an
+        array-native version of the model, instead of calling the model
+        for each lag. The shape of the lag array is kept.
+    """
+    # plain python functions are mapped on each lag
+    if not hasattr(func, 'py_func'):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if hasattr(args[0], '__iter__'):
+                new_args = args[1:]
+                mapping = map(lambda h: func(h, *new_args, **kwargs), args[0])
+                return np.fromiter(mapping, dtype=float)
+            else:
+                return func(*args, **kwargs)
+        return wrapper
+
+    signature = inspect.signature(func.py_func)
+
     @wraps(func)
     def wrapper(*args, **kwargs):
         if hasattr(args[0], '__iter__'):
-            new_args = args[1:]
-            mapping = map(lambda h: func(h, *new_args, **kwargs), args[0])
-            return np.fromiter(mapping, dtype=float)
+            # bind the default parameters, all arguments are broadcasted
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = [np.asarray(a, dtype=float) for a in bound.args]
+
+            return np.asarray(_array_model(func)(*params), dtype=float)
         else:
             return func(*args, **kwargs)
     return wrapper
 
 
 @variogram
-@jit
+@jit(cache=True)
 def spherical(h, r, c0, b=0):
     r"""Spherical Variogram function
 
@@ -83,7 +135,7 @@ def spherical(h, r, c0, b=0):
 
 
 @variogram
-@jit
+@jit(cache=True)
 def exponential(h, r, c0, b=0):
     r"""Exponential Variogram function
 
@@ -145,7 +197,7 @@ def exponential(h, r, c0, b=0):
 
 
 @variogram
-@jit
+@jit(cache=True)
 def gaussian(h, r, c0, b=0):
     r""" Gaussian Variogram function
 
@@ -210,7 +262,7 @@ def gaussian(h, r, c0, b=0):
 
 
 @variogram
-@jit
+@jit(cache=True)
 def cubic(h, r, c0, b=0):
     r"""Cubic Variogram function
 
@@ -274,7 +326,7 @@ def cubic(h, r, c0, b=0):
 
 
 @variogram
-@jit
+@jit(cache=True)
 def stable(h, r, c0, s, b=0):
     r"""Stable Variogram function
 
@@ -339,7 +391,7 @@ def stable(h, r, c0, s, b=0):
 
 
 @variogram
-@jit(forceobj=True)
+@_numpy_model
 def matern(h, r, c0, s, b=0):
     r"""Matérn Variogram function
 
@@ -349,6 +401,11 @@ def matern(h, r, c0, s, b=0):
     .. versionchanged:: 0.3.2
         a is now r/3 for s <= 0.2 or s >= 10.
 
+    .. versionchanged:: 0.5.0
+        implemented with numpy and scipy ufuncs instead of a numba
+        object mode function, as scipy.special is not supported by
+        numba. Arrays of lags are evaluated at once.
+
     Parameters
     ----------
     h : float
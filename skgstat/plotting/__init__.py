@@ -1,13 +1,39 @@
+import importlib
+
 import skgstat
 
-from .variogram_plot import matplotlib_variogram_plot, plotly_variogram_plot
-from .variogram_scattergram import matplotlib_variogram_scattergram, plotly_variogram_scattergram
-from .variogram_location_trend import matplotlib_location_trend, plotly_location_trend
-from .variogram_dd_plot import matplotlib_dd_plot, plotly_dd_plot
-from .directtional_variogram import matplotlib_pair_field, plotly_pair_field
-from .stvariogram_plot3d import matplotlib_plot_3d, plotly_plot_3d
-from .stvariogram_plot2d import matplotlib_plot_2d, plotly_plot_2d
-from .stvariogram_marginal import matplotlib_marginal, plotly_marginal
+
+def _lazy(module, name):
+    """
+    Thin wrapper of the plot function name of module. The module is
+    imported on the first call, as importing matplotlib and plotly
+    takes considerable time.
+    """
+    def wrapper(*args, **kwargs):
+        func = getattr(importlib.import_module('.%s' % module, __name__), name)
+        return func(*args, **kwargs)
+
+    wrapper.__name__ = name
+    wrapper.__doc__ = 'Imports skgstat.plotting.%s and calls %s.' % (module, name)
+    return wrapper
+
+
+matplotlib_variogram_plot = _lazy('variogram_plot', 'matplotlib_variogram_plot')
+plotly_variogram_plot = _lazy('variogram_plot', 'plotly_variogram_plot')
+matplotlib_variogram_scattergram = _lazy('variogram_scattergram', 'matplotlib_variogram_scattergram')
+plotly_variogram_scattergram = _lazy('variogram_scattergram', 'plotly_variogram_scattergram')
+matplotlib_location_trend = _lazy('variogram_location_trend', 'matplotlib_location_trend')
+plotly_location_trend = _lazy('variogram_location_trend', 'plotly_location_trend')
+matplotlib_dd_plot = _lazy('variogram_dd_plot', 'matplotlib_dd_plot')
+plotly_dd_plot = _lazy('variogram_dd_plot', 'plotly_dd_plot')
+matplotlib_pair_field = _lazy('directtional_variogram', 'matplotlib_pair_field')
+plotly_pair_field = _lazy('directtional_variogram', 'plotly_pair_field')
+matplotlib_plot_3d = _lazy('stvariogram_plot3d', 'matplotlib_plot_3d')
+plotly_plot_3d = _lazy('stvariogram_plot3d', 'plotly_plot_3d')
+matplotlib_plot_2d = _lazy('stvariogram_plot2d', 'matplotlib_plot_2d')
+plotly_plot_2d = _lazy('stvariogram_plot2d', 'plotly_plot_2d')
+matplotlib_marginal = _lazy('stvariogram_marginal', 'matplotlib_marginal')
+plotly_marginal = _lazy('stvariogram_marginal', 'plotly_marginal')
 
 
 ALLOWED_BACKENDS = [
@@ -0,0 +1,101 @@
+import numpy as np
+
+from skgstat.util import pair_indices
+
+
+def _bin_index(x, edges):
+    # bin index of equal width bins, the last bin includes its right edge
+    n = len(edges) - 1
+    width = (edges[-1] - edges[0]) / n
+    if width == 0:
+        return np.where(x == edges[0], 0, -1)
+    idx = np.floor((x - edges[0]) / width).astype(np.int64)
+    idx[x == edges[-1]] = n - 1
+    idx[(x < edges[0]) | (x > edges[-1]) | np.isnan(x)] = -1
+    return idx
+
+
+def _edges(x, bins):
+    return np.linspace(np.nanmin(x), np.nanmax(x), bins + 1)
+
+
+def density_grid(x, y, bins=100, chunk_size=1000000):
+    """2D histogram
+
+    .. versionadded:: 0.5.0
+
+    Counts the observations in a grid of equal width bins. The arrays
+    are binned in chunks by one :func:`bincount <numpy.bincount>` over
+    the combined bin index, thus only a chunk of indices is held in
+    memory. Missing values are ignored.
+
+    Parameters
+    ----------
+    x, y : numpy.ndarray
+        Flat arrays of the same length.
+    bins : int, tuple
+        Number of bins along x and y.
+    chunk_size : int
+        Number of observations binned at once.
+
+    Returns
+    -------
+    counts : numpy.ndarray
+        Array of shape (x bins, y bins).
+    x_edges, y_edges : numpy.ndarray
+        Bin edges along x and y.
+    """
+    nx, ny = (bins, bins) if isinstance(bins, int) else bins
+    x_edges, y_edges = _edges(x, nx), _edges(y, ny)
+
+    counts = np.zeros(nx * ny, dtype=np.int64)
+    for start in range(0, len(x), chunk_size):
+        ix = _bin_index(np.asarray(x[start:start + chunk_size], dtype=float), x_edges)
+        iy = _bin_index(np.asarray(y[start:start + chunk_size], dtype=float), y_edges)
+        inside = (ix >= 0) & (iy >= 0)
+        counts += np.bincount(ix[inside] * ny + iy[inside], minlength=nx * ny)
+
+    return counts.reshape(nx, ny), x_edges, y_edges
+
+
+def pair_density_grid(values, bins=100, chunk_size=1000000):
+    """Head and tail 2D histogram
+
+    .. versionadded:: 0.5.0
+
+    Counts all point pairs of the values in both directions in a grid
+    of equal width bins, without building the head and tail arrays. Each
+    value is binned once and the condensed pair indices are processed in
+    chunks.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Observation values.
+    bins : int
+        Number of bins along both axes.
+    chunk_size : int
+        Number of point pairs counted at once.
+
+    Returns
+    -------
+    counts : numpy.ndarray
+        Symmetric array of shape (bins, bins), tails along the first axis.
+    edges : numpy.ndarray
+        Bin edges of both axes.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    edges = _edges(values, bins)
+    idx = _bin_index(values, edges)
+
+    counts = np.zeros(bins * bins, dtype=np.int64)
+    for start in range(0, n * (n - 1) // 2, chunk_size):
+        i, j = pair_indices(np.arange(start, min(start + chunk_size, n * (n - 1) // 2)), n)
+        bi, bj = idx[i], idx[j]
+        inside = (bi >= 0) & (bj >= 0)
+        counts += np.bincount(bi[inside] * bins + bj[inside], minlength=bins * bins)
+
+    # add the reversed direction
+    counts = counts.reshape(bins, bins)
+    return counts + counts.T, edges
@@ -1,7 +1,8 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.collections import LineCollection
-from scipy.spatial.distance import squareform
+
+from skgstat.util import pair_indices
 
 try:
     import plotly.graph_objects as go
@@ -9,27 +10,27 @@ except ImportError:
     pass
 
 
-def __calculate_plot_data(variogram, points):
-    # get the direction mask
-    direction_mask = squareform(variogram._direction_mask())
-
-    # build a coordinate meshgrid
+def __calculate_plot_data(variogram, points, max_lines=10000, random_state=42):
+    # get the point indices of the pairs in direction
     n = len(variogram._X)
-    r = np.arange(n)
-    x1, x2 = np.meshgrid(r, r)
+    i, j = pair_indices(np.flatnonzero(variogram._direction_mask()), n)
 
     # handle the point pairs
     if isinstance(points, int):
         points = [points]
     if isinstance(points, (list, tuple)):
-        point_mask = np.zeros((n, n), dtype=bool)
-        point_mask[:, points] = True
-    else:
-        # use all points
-        point_mask = np.ones((n, n), dtype=bool)
+        # start each line at the requested point
+        fwd, bwd = np.isin(i, points), np.isin(j, points)
+        i, j = np.concatenate((i[fwd], j[bwd])), np.concatenate((j[fwd], i[bwd]))
+
+    # subsample the lines to a drawable number
+    if max_lines is not None and i.size > max_lines:
+        rng = np.random.default_rng(random_state)
+        sample = np.sort(rng.choice(i.size, size=max_lines, replace=False))
+        i, j = i[sample], j[sample]
 
-    start = variogram._X[x1[direction_mask & point_mask]]
-    end = variogram._X[x2[direction_mask & point_mask]]
+    start = variogram._X[i]
+    end = variogram._X[j]
 
     # extract all lines
     lines = np.column_stack((
@@ -49,7 +50,7 @@ def matplotlib_pair_field(
     **kwargs
 ):
     # get the plot data
-    lines = __calculate_plot_data(variogram, points)
+    lines = __calculate_plot_data(variogram, points, max_lines=kwargs.get('max_lines', 10000))
 
     # align the colors
     colors = plt.cm.get_cmap(cmap)(np.linspace(0, 1, len(lines)))
@@ -92,7 +93,7 @@ def plotly_pair_field(
     **kwargs
 ):
     # get the plot data
-    lines = __calculate_plot_data(variogram, points)
+    lines = __calculate_plot_data(variogram, points, max_lines=kwargs.get('max_lines', 10000))
 
     # create a figure if none is passed
     if fig is None:
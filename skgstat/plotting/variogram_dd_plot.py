@@ -1,13 +1,15 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+from .density import density_grid
+
 try:
     import plotly.graph_objects as go 
 except ImportError:
     pass
 
 
-def __calculate_plot_data(variogram):
+def __calculate_plot_data(variogram, max_points=None, random_state=42):
    # get all distances
     _dist = variogram.distance
 
@@ -16,26 +18,48 @@ def __calculate_plot_data(variogram):
         variogram._calc_diff()
     _diff = variogram._diff
 
+    # subsample the point pairs to a drawable number
+    if max_points is not None and _dist.size > max_points:
+        rng = np.random.default_rng(random_state)
+        idx = np.sort(rng.choice(_dist.size, size=max_points, replace=False))
+        _diff, _dist = _diff[idx], _dist[idx]
+
     return _diff, _dist
 
 
-def matplotlib_dd_plot(variogram, ax=None, plot_bins=True, show=True):
-    # get the plotting data 
-    _diff, _dist = __calculate_plot_data(variogram)
-   
+def __use_density(variogram, density, max_points):
+    if density == 'auto':
+        return max_points is not None and variogram.distance.size > max_points
+    return bool(density)
+
+
+def matplotlib_dd_plot(variogram, ax=None, plot_bins=True, show=True, density='auto', max_points=50000, **kwargs):
     # create the plot
     if ax is None:
         fig, ax = plt.subplots(1, 1, figsize=(8, 6))
     else:
         fig = ax.get_figure()
 
+    # get the plotting data
+    use_density = __use_density(variogram, density, max_points)
+    _diff, _dist = __calculate_plot_data(variogram, max_points=None if use_density else max_points)
+
     # plot the bins
     if plot_bins:
         _bins = variogram.bins
         ax.vlines(_bins, 0, np.max(_diff), linestyle='--', lw=1, color='r')
 
-    # plot
-    ax.scatter(_dist, _diff, 8, color='b', marker='o', alpha=0.5)
+    if use_density:
+        # plot the number of point pairs
+        counts, x_edges, y_edges = density_grid(_dist, _diff, bins=kwargs.get('bins', 100))
+        mesh = ax.pcolormesh(
+            x_edges, y_edges, np.ma.masked_equal(counts.T, 0),
+            cmap=kwargs.get('cmap', 'Blues')
+        )
+        fig.colorbar(mesh, ax=ax, label='point pairs')
+    else:
+        # plot
+        ax.scatter(_dist, _diff, 8, color='b', marker='o', alpha=0.5)
 
     # set limits
     ax.set_ylim((0, np.max(_diff)))
@@ -51,21 +75,35 @@ def matplotlib_dd_plot(variogram, ax=None, plot_bins=True, show=True):
     return fig
 
 
-def plotly_dd_plot(variogram, fig=None, plot_bins=True, show=True):
-    # get the plotting data
-    _diff, _dist = __calculate_plot_data(variogram)
-
+def plotly_dd_plot(variogram, fig=None, plot_bins=True, show=True, density='auto', max_points=50000, **kwargs):
     # create a new Figure if needed
     if fig is None:
         fig = go.Figure()
 
-    # plot
-    fig.add_trace(
-        go.Scattergl(
-            x=_dist, y=_diff, 
-            mode='markers', marker=dict(color='blue', opacity=0.5)
+    # get the plotting data
+    use_density = __use_density(variogram, density, max_points)
+    _diff, _dist = __calculate_plot_data(variogram, max_points=None if use_density else max_points)
+
+    if use_density:
+        # plot the number of point pairs, empty cells are transparent
+        counts, x_edges, y_edges = density_grid(_dist, _diff, bins=kwargs.get('bins', 100))
+        z = np.where(counts.T > 0, counts.T, np.nan)
+        fig.add_trace(
+            go.Heatmap(
+                x=(x_edges[1:] + x_edges[:-1]) / 2,
+                y=(y_edges[1:] + y_edges[:-1]) / 2,
+                z=z, colorscale=kwargs.get('colorscale', 'Blues'),
+                colorbar=dict(title='point pairs')
+            )
+        )
+    else:
+        # plot
+        fig.add_trace(
+            go.Scattergl(
+                x=_dist, y=_diff, 
+                mode='markers', marker=dict(color='blue', opacity=0.5)
+            )
         )
-    )
 
     # plot the bins
     if plot_bins:
@@ -19,7 +19,7 @@ def __calculate_plot_data(variogram):
 
     # handle the relative experimental variogram
     if variogram.normalized:
-        _bins /= np.nanmax(_bins)
+        _bins = _bins / np.nanmax(_bins)
         y /= np.max(_exp)
         _exp /= np.nanmax(_exp)
         x /= np.nanmax(x)
@@ -69,9 +69,7 @@ def matplotlib_variogram_plot(variogram, axes=None, grid=True, show=True, hist=T
     # plot histogram
     if ax2 is not None and hist:
         # calc the histogram
-        _count = np.fromiter(
-            (g.size for g in variogram.lag_classes()), dtype=int
-        )
+        _count = variogram._lag_counts()
 
         # set the sum of hist bar widths to 70% of the x-axis space
         w = (np.max(_bins) * 0.7) / len(_count)
@@ -140,7 +138,7 @@ def plotly_variogram_plot(variogram, fig=None, grid=True, show=True, hist=True):
     # hist
     if hist:
         # calculate
-        _count = np.fromiter((g.size for g in variogram.lag_classes()), dtype=int)
+        _count = variogram._lag_counts()
 
         fig.add_trace(
             go.Bar(x=_bins, y=_count, marker=dict(color='red'), name='Histogram')
@@ -1,46 +1,75 @@
 import numpy as np
-from scipy.spatial.distance import squareform
 import matplotlib.pyplot as plt
 
+from skgstat.util import pair_indices
+from .density import pair_density_grid
+
 try:
     import plotly.graph_objects as go
 except ImportError:
     pass
 
 
-def __calculate_plot_data(variogram):
-    tails = []
-    heads = []
+def __calculate_plot_data(variogram, max_pairs=50000, random_state=42):
+    groups = np.asarray(variogram.lag_groups())
+    values = variogram.values
+    n = len(values)
+
+    # subsample the point pairs to a drawable number
+    idx = np.arange(groups.size)
+    if max_pairs is not None and groups.size > max_pairs:
+        rng = np.random.default_rng(random_state)
+        idx = np.sort(rng.choice(groups.size, size=max_pairs, replace=False))
 
-    sq_lags = squareform(variogram.lag_groups())
+    # sort the pairs by lag group once
+    order = np.argsort(groups[idx], kind='stable')
+    idx = idx[order]
+    _, starts = np.unique(groups[idx], return_index=True)
+    bounds = np.append(starts, idx.size)
 
-    for h in np.unique(variogram.lag_groups()):
-        # get head and tail
-        x, y = np.where(sq_lags == h)
+    # get the point indices of the pairs, without the squareform
+    i, j = pair_indices(idx, n)
 
-        # add
-        tails.append(variogram.values[x].flatten())
-        heads.append(variogram.values[y].flatten())
+    # add each pair in both directions
+    tails = [
+        np.concatenate((values[i[a:b]], values[j[a:b]])) for a, b in zip(bounds[:-1], bounds[1:])
+    ]
+    heads = [
+        np.concatenate((values[j[a:b]], values[i[a:b]])) for a, b in zip(bounds[:-1], bounds[1:])
+    ]
 
     return tails, heads
 
 
 def matplotlib_variogram_scattergram(variogram, ax=None, show=True, single_color=True, **kwargs):
-    # get the plot data
-    tails, heads = __calculate_plot_data(variogram)
-
     # create a new figure or use the given
     if ax is None:
         fig, ax = plt.subplots(1, 1)
     else:
         fig = ax.get_figure()
 
+    if kwargs.get('density', False):
+        # count all point pairs in a grid
+        counts, edges = pair_density_grid(variogram.values, bins=kwargs.get('bins', 100))
+        mesh = ax.pcolormesh(
+            edges, edges, np.ma.masked_equal(counts.T, 0),
+            cmap=kwargs.get('cmap', 'Oranges')
+        )
+        fig.colorbar(mesh, ax=ax, label='point pairs')
+
+        # each value is tail and head of the same number of pairs
+        h = t = np.asarray(variogram.values)
+        tails, heads = [], []
+    else:
+        # get the plot data
+        tails, heads = __calculate_plot_data(variogram, max_pairs=kwargs.get('max_pairs', 50000))
+        h = np.concatenate(heads).ravel()
+        t = np.concatenate(tails).ravel()
+
     # some settings
     color = 'orange' if single_color else None
 
     # plot
-    h = np.concatenate(heads).ravel()
-    t = np.concatenate(tails).ravel()
     ax.vlines(np.nanmean(t), np.min(t), np.nanmax(t), linestyles='--', color='red', lw=kwargs.get('lw', 1.5))
     ax.hlines(np.nanmean(h), np.nanmin(h), np.nanmax(h), linestyles='--', color='red', lw=kwargs.get('lw', 1.5))
 
@@ -60,13 +89,31 @@ def matplotlib_variogram_scattergram(variogram, ax=None, show=True, single_color
 
 
 def plotly_variogram_scattergram(variogram, fig=None, show=False, single_color=False, **kwargs):
-    # get the plot data
-    tails, heads = __calculate_plot_data(variogram)
-
     # create a new Figure if needed
     if fig is None:
         fig = go.Figure()
 
+    if kwargs.get('density', False):
+        # count all point pairs in a grid, empty cells are transparent
+        counts, edges = pair_density_grid(variogram.values, bins=kwargs.get('bins', 100))
+        centers = (edges[1:] + edges[:-1]) / 2
+        fig.add_trace(
+            go.Heatmap(
+                x=centers, y=centers, z=np.where(counts.T > 0, counts.T, np.nan),
+                colorscale=kwargs.get('colorscale', 'Oranges'),
+                colorbar=dict(title='point pairs')
+            )
+        )
+
+        # each value is tail and head of the same number of pairs
+        h = t = np.asarray(variogram.values)
+        tails, heads = [], []
+    else:
+        # get the plot data
+        tails, heads = __calculate_plot_data(variogram, max_pairs=kwargs.get('max_pairs', 50000))
+        h = np.concatenate(heads).ravel()
+        t = np.concatenate(tails).ravel()
+
     # some arguments
     lw = kwargs.get('line_width', kwargs.get('lw', 1.5))
     ld = kwargs.get('line_dash', 'dash')
@@ -74,8 +121,6 @@ def plotly_variogram_scattergram(variogram, fig=None, show=False, single_color=F
 
     # add vertical and horizontal lines
     try:
-        h = np.concatenate(heads).ravel()
-        t = np.concatenate(tails).ravel()
         fig.add_vline(x=np.nanmean(t), line_dash=ld, line_width=lw, line_color='red')
         fig.add_hline(y=np.nanmean(h), line_dash=ld, line_width=lw, line_color='red')
     except AttributeError:
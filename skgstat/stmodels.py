@@ -6,11 +6,13 @@ import numpy as np
 def stvariogram(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
-        st = args[0]
+        st = np.asarray(args[0])
         if st.ndim == 2:
+            # the marginal models accept arrays, thus all space and time
+            # lags can be passed at once as two columns
             new_args = args[1:]
-            mapping = map(lambda lags: func(lags, *new_args, **kwargs), st)
-            return np.fromiter(mapping, dtype=np.float)
+            gamma = func(st.T, *new_args, **kwargs)
+            return np.asarray(gamma, dtype=float).reshape(len(st))
         else:
             return func(*args, **kwargs)
     return wrapper
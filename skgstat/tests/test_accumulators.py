@@ -0,0 +1,93 @@
+import unittest
+
+import numpy as np
+from numpy.testing import assert_array_almost_equal
+
+from skgstat import estimators
+from skgstat.accumulators import get_accumulator, MatheronAccumulator
+
+
+class TestAccumulators(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(42)
+        self.x = np.abs(np.random.normal(0, 3, 5000))
+        np.random.seed(42)
+        self.groups = np.random.randint(-1, 4, 5000)
+        self.bins = np.linspace(0, 10, 16)
+
+    def chunked(self, name, **kwargs):
+        """accumulate in two chunks and merge them"""
+        a = get_accumulator(name, n_lags=4, **kwargs)
+        b = get_accumulator(name, n_lags=4, **kwargs)
+        a.update(self.x[:2000], self.groups[:2000])
+        b.update(self.x[2000:], self.groups[2000:])
+        return a.merge(b).finalize()
+
+    def expected(self, func):
+        return np.array([func(self.x[self.groups == i]) for i in range(4)])
+
+    def test_matheron(self):
+        assert_array_almost_equal(
+            self.chunked('matheron'), self.expected(estimators.matheron)
+        )
+
+    def test_cressie(self):
+        assert_array_almost_equal(
+            self.chunked('cressie'), self.expected(estimators.cressie)
+        )
+
+    def test_minmax(self):
+        assert_array_almost_equal(
+            self.chunked('minmax'), self.expected(estimators.minmax)
+        )
+
+    def test_entropy(self):
+        assert_array_almost_equal(
+            self.chunked('entropy', bins=self.bins),
+            self.expected(lambda x: estimators.entropy(x, bins=self.bins))
+        )
+
+    def test_dowd_relative_error(self):
+        res = self.chunked('dowd', alpha=0.01)
+        exp = self.expected(estimators.dowd)
+
+        # the median has a relative error of alpha
+        self.assertTrue(np.all(np.abs(res - exp) / exp <= 0.0201))
+
+    def test_percentile_relative_error(self):
+        res = self.chunked('percentile', p=25, alpha=0.005)
+        exp = self.expected(lambda x: estimators.percentile(x, p=25))
+
+        self.assertTrue(np.all(np.abs(res - exp) / exp <= 0.005))
+
+    def test_empty_lag_and_nan(self):
+        acc = MatheronAccumulator(n_lags=3)
+        acc.update([1., 2., np.nan, 4.], [0, 0, 0, 2])
+
+        assert_array_almost_equal(acc.count, [2, 0, 1])
+        assert_array_almost_equal(acc.finalize(), [1.25, np.nan, 8.])
+
+    def test_merge_mismatch(self):
+        a = get_accumulator('matheron', n_lags=3)
+
+        with self.assertRaises(ValueError):
+            a.merge(get_accumulator('cressie', n_lags=3))
+        with self.assertRaises(ValueError):
+            a.merge(get_accumulator('matheron', n_lags=4))
+        with self.assertRaises(ValueError):
+            get_accumulator('dowd', alpha=0.01).merge(
+                get_accumulator('dowd', alpha=0.02)
+            )
+
+    def test_invalid_names(self):
+        for name in ('genton', 'foobar'):
+            with self.assertRaises(ValueError):
+                get_accumulator(name)
+
+    def test_entropy_needs_bins(self):
+        with self.assertRaises(ValueError):
+            get_accumulator('entropy')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+import os
+
+import numpy as np
+from numpy.testing import assert_array_almost_equal
+from scipy.spatial.distance import pdist
+
+from skgstat import Variogram, DirectionalVariogram, OrdinaryKriging
+from skgstat import Anisotropy
+from skgstat.Anisotropy import fit_ellipse
+
+
+def ellipse_ranges(azimuths, angle, a, b):
+    theta = -np.radians(azimuths)
+    phi = -np.radians(angle)
+    return 1. / np.sqrt(
+        np.cos(theta - phi)**2 / a**2 + np.sin(theta - phi)**2 / b**2
+    )
+
+
+class TestFitEllipse(unittest.TestCase):
+    def setUp(self):
+        self.azimuths = np.arange(-90, 90, 10.)
+
+    def test_exact_ellipse(self):
+        r = ellipse_ranges(self.azimuths, 30, 40, 10)
+        angle, a, b = fit_ellipse(self.azimuths, r)
+
+        self.assertAlmostEqual(angle, 30, places=4)
+        self.assertAlmostEqual(a, 40, places=4)
+        self.assertAlmostEqual(b, 10, places=4)
+
+    def test_negative_angle_and_nan(self):
+        r = ellipse_ranges(self.azimuths, -60, 25, 20)
+        r[[2, 7]] = np.nan
+        angle, a, b = fit_ellipse(self.azimuths, r)
+
+        self.assertAlmostEqual(angle, -60, places=4)
+        self.assertAlmostEqual(a, 25, places=4)
+        self.assertAlmostEqual(b, 20, places=4)
+
+    def test_too_few_ranges(self):
+        with self.assertRaises(ValueError):
+            fit_ellipse([0, 45, 90], [10, np.nan, 5])
+
+
+class TestAnisotropy(unittest.TestCase):
+    def setUp(self):
+        data = np.loadtxt(os.path.join(
+            os.path.dirname(__file__), 'aniso_sample.txt'
+        ))
+        self.c = data[:, :2]
+        self.v = data[:, 2]
+        self.DV = DirectionalVariogram(
+            self.c, self.v, maxlag=0.6, n_lags=8, tolerance=30, bandwidth=10
+        )
+
+    def test_wrong_variogram_type(self):
+        V = Variogram(self.c, self.v)
+
+        with self.assertRaises(TypeError):
+            Anisotropy(V)
+
+    def test_ellipse(self):
+        A = Anisotropy(self.DV)
+
+        self.assertEqual(len(A.ranges), 18)
+        self.assertGreater(A.major_range, A.minor_range)
+        self.assertAlmostEqual(A.ratio, A.minor_range / A.major_range)
+
+        # the sample is stretched north-south
+        self.assertGreater(np.abs(A.angle), 45)
+
+    def test_transform(self):
+        A = Anisotropy(self.DV, azimuths=[-60, -30, 0, 30, 60, 90])
+
+        # unit vectors along the major and minor axis
+        phi = -np.radians(A.angle)
+        u = np.array([
+            [0, 0],
+            [np.cos(phi), np.sin(phi)],
+            [-np.sin(phi), np.cos(phi)]
+        ])
+        d = pdist(A(u))
+
+        assert_array_almost_equal(d, [1, 1 / A.ratio, np.sqrt(1 + A.ratio**-2)])
+
+    def test_transform_needs_2d(self):
+        A = Anisotropy(self.DV)
+
+        with self.assertRaises(ValueError):
+            A.transform(np.ones((5, 3)))
+
+
+class TestCoordinateTransform(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(42)
+        self.c = np.random.gamma(10, 4, size=(50, 2))
+        np.random.seed(42)
+        self.v = np.random.normal(10, 2, size=50)
+
+    def transform(self, coords):
+        return coords * [1., 3.]
+
+    def test_variogram_distances(self):
+        V = Variogram(self.c, self.v)
+        V.coordinate_transform = self.transform
+
+        assert_array_almost_equal(V.distance, pdist(self.c * [1., 3.]))
+        self.assertIsNotNone(V.cof)
+
+    def test_invalid_transform(self):
+        V = Variogram(self.c, self.v)
+
+        with self.assertRaises(ValueError):
+            V.coordinate_transform = 'anisotropy'
+
+    def test_kriging_exact(self):
+        V = Variogram(self.c, self.v, model='gaussian', normalize=False)
+        V.coordinate_transform = self.transform
+        ok = OrdinaryKriging(V, min_points=3, max_points=10, mode='exact')
+
+        assert_array_almost_equal(ok.coords, self.c * [1., 3.])
+        assert_array_almost_equal(
+            ok.transform(self.c[:10, 0], self.c[:10, 1]), self.v[:10]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@ import unittest
 
 import numpy as np
 from numpy.testing import assert_array_almost_equal
+from scipy.spatial.distance import pdist
 
 from skgstat.binning import (
     even_width_lags,
@@ -9,7 +10,10 @@ from skgstat.binning import (
     auto_derived_lags,
     kmeans,
     ward,
-    stable_entropy_lags
+    stable_entropy_lags,
+    sort_distances,
+    SortedDistances,
+    DistanceSketch
 )
 
 
@@ -118,11 +122,82 @@ class TestClusteringBins(unittest.TestCase):
         bins, _ = kmeans(np.random.gamma(10, 40, 500), 6, None)
 
         assert_array_almost_equal(
-            np.array([118.5, 283.2, 374.7, 467.9, 574.5, 762.5]),
+            np.array([117.9, 281.5, 370.8, 460.2, 566.9, 759.8]),
             bins,
             decimal=1
         )
 
+    def test_kmeans_is_optimal(self):
+        # compare the dynamic programming to all splits of few points
+        from itertools import combinations
+        from skgstat.binning import _kmeans_1d
+
+        np.random.seed(42)
+        x = np.sort(np.random.gamma(2, 10, 12))
+        w = np.ones(x.size)
+
+        def sse(starts):
+            parts = np.split(x, starts[1:])
+            return sum(((p - p.mean())**2).sum() for p in parts)
+
+        best = min(
+            sse([0] + list(c)) for c in combinations(range(1, x.size), 3)
+        )
+        self.assertAlmostEqual(sse(list(_kmeans_1d(x, w, 4))), best)
+
+    def test_ward_like_sklearn(self):
+        from sklearn.cluster import AgglomerativeClustering
+
+        np.random.seed(42)
+        d = np.random.gamma(5, 20, 300)
+        bins, _ = ward(d, 5, None)
+
+        labels = AgglomerativeClustering(
+            linkage='ward', n_clusters=5).fit(d.reshape(-1, 1)).labels_
+        centers = np.sort([d[labels == i].mean() for i in range(5)])
+        expected = (np.concatenate(([0], centers[:-1])) + centers) / 2
+
+        assert_array_almost_equal(bins, expected)
+
+    def test_histogram_compression(self):
+        np.random.seed(1312)
+        d = np.random.gamma(10, 40, 20000)
+
+        exact, _ = kmeans(d, 6, None, binning_max_points=None)
+        compressed, _ = kmeans(d, 6, None, binning_max_points=2000)
+        assert_array_almost_equal(exact, compressed, decimal=0)
+
+        exact, _ = ward(d, 6, None)
+        compressed, _ = ward(d, 6, None, binning_max_points=2000)
+        assert_array_almost_equal(exact / exact[-1], compressed / exact[-1], decimal=1)
+
+    def test_exact_by_default(self):
+        from skgstat import Variogram
+
+        np.random.seed(42)
+        c = np.random.random((200, 2))
+        np.random.seed(42)
+        v = np.random.normal(10, 4, 200)
+
+        # 19900 point pairs are clustered exactly by default
+        for bin_func in ('kmeans', 'ward'):
+            V = Variogram(c, v, bin_func=bin_func, n_lags=6)
+            exact = Variogram(
+                c, v, bin_func=bin_func, n_lags=6, binning_max_points=None
+            )
+            assert_array_almost_equal(V.bins, exact.bins)
+
+    def test_subsample(self):
+        np.random.seed(1312)
+        d = np.random.gamma(10, 40, 5000)
+
+        a, _ = kmeans(d, 6, None, binning_subsample=1000)
+        b, _ = kmeans(d, 6, None, binning_subsample=1000)
+        c, _ = kmeans(d, 6, None, binning_subsample=1000, binning_random_state=1)
+
+        assert_array_almost_equal(a, b)
+        self.assertFalse(np.allclose(a, c))
+
     def test_ward(self):
         np.random.seed(1312)
         bins, _ = ward(np.random.gamma(10, 40, 500), 6, None)
@@ -156,6 +231,141 @@ class TestClusteringBins(unittest.TestCase):
             decimal=1
         )
 
+    def test_stable_entropy_subsample(self):
+        np.random.seed(1312)
+        d = np.random.gamma(1500, 40, 5000)
+
+        bins, _ = stable_entropy_lags(d, 6, None, binning_subsample=1000)
+        bins2, _ = stable_entropy_lags(d, 6, None, binning_subsample=1000)
+
+        # the sample is seeded
+        self.assertEqual(len(bins), 6)
+        assert_array_almost_equal(bins, bins2)
+
+        # not subsampled, if the sample is larger than the data
+        full, _ = stable_entropy_lags(d[:500], 6, None)
+        sub, _ = stable_entropy_lags(d[:500], 6, None, binning_subsample=1000)
+        assert_array_almost_equal(full, sub)
+
+
+class TestSortedDistances(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(1312)
+        self.d = np.random.gamma(10, 40, 500)
+        self.d[[3, 42]] = np.nan
+
+    def test_sort_distances(self):
+        s = sort_distances(self.d)
+
+        self.assertIsInstance(s, SortedDistances)
+        self.assertEqual(s.size, 498)
+        self.assertTrue(np.all(np.diff(s) >= 0))
+
+        # sorting again is a no-op
+        self.assertIs(sort_distances(s), s)
+
+    def test_same_lags(self):
+        s = sort_distances(self.d)
+
+        for maxlag in (None, 500):
+            for func in (even_width_lags, uniform_count_lags):
+                assert_array_almost_equal(
+                    func(self.d, 6, maxlag)[0], func(s, 6, maxlag)[0]
+                )
+
+            assert_array_almost_equal(
+                auto_derived_lags(self.d, 'fd', maxlag)[0],
+                auto_derived_lags(s, 'fd', maxlag)[0]
+            )
+            assert_array_almost_equal(
+                kmeans(self.d, 6, maxlag)[0], kmeans(s, 6, maxlag)[0]
+            )
+            assert_array_almost_equal(
+                ward(self.d, 6, maxlag)[0], ward(s, 6, maxlag)[0]
+            )
+
+
+    def test_no_distances_up_to_maxlag(self):
+        s = sort_distances(self.d)
+
+        # maxlag below the smallest distance and no finite distances
+        for d, maxlag in ((s, 1e-6), (sort_distances([np.nan]), None)):
+            for func in (uniform_count_lags, kmeans, ward, stable_entropy_lags):
+                bins, _ = func(d, 4, maxlag)
+                self.assertEqual(len(bins), 4)
+                self.assertTrue(np.isnan(bins).all())
+
+        self.assertTrue(np.isnan(even_width_lags(sort_distances([]), 4, None)[0]).all())
+
+
+class TestDistanceSketch(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(42)
+        self.c = np.random.gamma(10, 4, (300, 2))
+        self.d = pdist(self.c)
+        self.sketch = DistanceSketch.from_coordinates(self.c, chunk_size=70)
+
+    def test_exact_moments(self):
+        s = self.sketch
+
+        self.assertEqual(s.count, self.d.size)
+        self.assertAlmostEqual(s.min, self.d.min())
+        self.assertAlmostEqual(s.max, self.d.max())
+        self.assertAlmostEqual(s.mean, self.d.mean())
+
+    def test_merge(self):
+        a = DistanceSketch().update(self.d[:1000])
+        b = DistanceSketch().update(self.d[1000:])
+        a.merge(b)
+
+        assert_array_almost_equal(
+            a.quantile([0.1, 0.5, 0.9]), self.sketch.quantile([0.1, 0.5, 0.9])
+        )
+        self.assertAlmostEqual(np.sqrt(a._m2 / a.count), self.d.std())
+
+    def test_uniform_relative_error(self):
+        exact, _ = uniform_count_lags(self.d, 8, None)
+        approx, _ = uniform_count_lags(self.sketch, 8, None)
+        self.assertTrue(np.all(np.abs(approx - exact) <= 0.01 * exact))
+
+        # the maxlag bucket adds a rank error
+        exact, _ = uniform_count_lags(self.d, 8, 20)
+        approx, _ = uniform_count_lags(self.sketch, 8, 20)
+        self.assertTrue(np.all(np.abs(approx - exact) <= 0.03 * exact))
+
+    def test_exact_auto_lags(self):
+        for method in ('even', 'sturges', 'scott', 'sqrt'):
+            if method == 'even':
+                exact, _ = even_width_lags(self.d, 8, None)
+                approx, _ = even_width_lags(self.sketch, 8, None)
+            else:
+                exact, _ = auto_derived_lags(self.d, method, None)
+                approx, _ = auto_derived_lags(self.sketch, method, None)
+            assert_array_almost_equal(exact, approx)
+
+    def test_fd_lags(self):
+        exact, _ = auto_derived_lags(self.d, 'fd', None)
+        approx, _ = auto_derived_lags(self.sketch, 'fd', None)
+
+        # relative error of the lag class width
+        q25, q75 = np.percentile(self.d, [25, 75])
+        bound = 0.01 * (q75 + q25) / (q75 - q25)
+        width, approx_width = np.diff(exact)[0], np.diff(approx)[0]
+        self.assertLessEqual(abs(approx_width - width) / width, bound)
+
+    def test_clustering(self):
+        exact, _ = kmeans(self.d, 5, None)
+        approx, _ = kmeans(self.sketch, 5, None)
+
+        assert_array_almost_equal(exact / exact[-1], approx / exact[-1], decimal=1)
+
+    def test_unsupported(self):
+        with self.assertRaises(ValueError):
+            auto_derived_lags(self.sketch, 'doane', None)
+
+        with self.assertRaises(ValueError):
+            stable_entropy_lags(self.sketch, 5, None)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -4,6 +4,7 @@ import numpy as np
 from numpy.testing import assert_array_almost_equal
 
 from skgstat import DirectionalVariogram, Variogram
+from skgstat.plotting import directtional_variogram
 
 
 class TestDirectionalVariogramInstantiation(unittest.TestCase):
@@ -90,6 +91,29 @@ class TestDirectionalVariogramInstantiation(unittest.TestCase):
         # with scott, there are 6 classes now
         self.assertEqual(DV.n_lags, 6)
 
+    def test_directional_empirical(self):
+        azimuths = [-60, 0, 45, 90]
+        for model in ('triangle', 'compass', 'circle'):
+            DV = DirectionalVariogram(
+                self.c, self.v, directional_model=model, n_lags=6
+            )
+            bins, exp = DV.get_directional_empirical(azimuths)
+            self.assertEqual(bins.shape, (4, 6))
+
+            for i, a in enumerate(azimuths):
+                V = DirectionalVariogram(
+                    self.c, self.v, azimuth=a, directional_model=model,
+                    n_lags=6
+                )
+                assert_array_almost_equal(bins[i], V.bins)
+                assert_array_almost_equal(exp[i], V.experimental)
+
+    def test_directional_empirical_invalid_azimuth(self):
+        DV = DirectionalVariogram(self.c, self.v)
+
+        with self.assertRaises(ValueError):
+            DV.get_directional_empirical([0, 200])
+
 
 
 
@@ -136,6 +160,136 @@ class TestDirectionalVariogramMethods(unittest.TestCase):
             decimal=1
         )
 
+    def test_circle_mask(self):
+        DV = DirectionalVariogram(self.c, self.v, azimuth=0, bandwidth=2)
+
+        # local vectors as (along azimuth, perpendicular)
+        local = np.array([
+            [3, 0.5], [0.5, 0.9], [0.5, 0.5], [3, 1.5], [-3, 0.5], [0, 0.1]
+        ])
+        angles = np.arctan2(local[:, 1], local[:, 0])
+        dists = np.sqrt(np.sum(local**2, axis=1))
+
+        assert_array_almost_equal(
+            DV._circle(angles, dists),
+            [True, False, True, False, True, False]
+        )
+
+    def test_circle_rotation(self):
+        DV = DirectionalVariogram(self.c, self.v, bandwidth=2)
+
+        # a vector heading north is found by azimuth -90 only
+        mask = DV._circle(np.array([np.pi / 2]), np.array([3.]), azimuth=[0, -90])
+        assert_array_almost_equal(mask, [[False], [True]])
+
+    def test_circle_needs_bandwidth(self):
+        DV = DirectionalVariogram(self.c, self.v)
+        DV.bandwidth = 0
+
+        with self.assertRaises(ValueError):
+            DV._circle(DV._angles, DV._euclidean_dist)
+
+    def test_n_lags_fit(self):
+        DV = DirectionalVariogram(self.c, self.v, azimuth=30, n_lags='fit')
+
+        self.assertIn(DV.n_lags, range(3, 31))
+        self.assertEqual(len(DV.bins), DV.n_lags)
+
+        # the candidates are evaluated on the pairs in direction only
+        count, gamma, _ = DV._lag_rse(DV.bins)
+        assert_array_almost_equal(count, DV._lag_counts())
+        assert_array_almost_equal(gamma, DV.experimental)
+
+    def test_n_lags_stable(self):
+        DV = DirectionalVariogram(
+            self.c, self.v, azimuth=30, n_lags='stable', n_lags_max_rse=1.
+        )
+
+        self.assertIn(DV.n_lags, range(3, 31))
+        self.assertTrue(np.all(DV._lag_rse(DV.bins)[2] <= 1.))
+
+    def test_shared_search_area_kernel(self):
+        DV = DirectionalVariogram(self.c, self.v, tolerance=30, bandwidth=5)
+        angles, dists = DV._angles, DV._euclidean_dist
+
+        # the triangle is the compass limited by the bandwidth
+        compass = DV._compass(angles, dists)
+        triangle = DV._triangle(angles, dists)
+        self.assertTrue(np.all(compass[triangle]))
+        self.assertLess(np.count_nonzero(triangle), np.count_nonzero(compass))
+
+
+class TestDirectionalVariogramPlots(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(42)
+        self.c = np.random.gamma(10, 4, (150, 2))
+        np.random.seed(42)
+        self.v = np.random.normal(10, 4, 150)
+
+        self.DV = DirectionalVariogram(self.c, self.v, azimuth=30, tolerance=20)
+        self.calc = getattr(directtional_variogram, '__calculate_plot_data')
+
+    def test_pair_field_data(self):
+        lines = self.calc(self.DV, 'all', max_lines=None)
+
+        # one line per pair in direction
+        self.assertEqual(len(lines), np.count_nonzero(self.DV._direction_mask()))
+        self.assertEqual(lines.shape[1:], (2, 2))
+
+    def test_pair_field_points(self):
+        lines = self.calc(self.DV, [3, 7], max_lines=None)
+
+        # all lines start at the requested points
+        starts = {tuple(p) for p in lines[:, 0]}
+        self.assertTrue(starts <= {tuple(self.c[3]), tuple(self.c[7])})
+
+    def test_pair_field_max_lines(self):
+        lines = self.calc(self.DV, 'all', max_lines=100)
+        self.assertEqual(len(lines), 100)
+
 
 if __name__ == '__main__':
     unittest.main()
+
+
+class TestDirectionalVariogramSerialization(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(42)
+        self.c = np.random.gamma(10, 4, (150, 2))
+        np.random.seed(42)
+        self.v = np.random.normal(10, 4, 150)
+
+        self.DV = DirectionalVariogram(
+            self.c, self.v, azimuth=30, tolerance=20, bandwidth=12,
+            directional_model='compass', n_lags=8
+        )
+
+    def assert_directional(self, DV):
+        self.assertIsInstance(DV, DirectionalVariogram)
+        self.assertEqual(DV.azimuth, 30)
+        self.assertEqual(DV.tolerance, 20)
+        self.assertEqual(DV.bandwidth, 12)
+        self.assertEqual(DV._directional_model, DV._compass)
+        assert_array_almost_equal(DV.bins, self.DV.bins)
+        assert_array_almost_equal(DV.experimental, self.DV.experimental)
+        assert_array_almost_equal(DV.cof, self.DV.cof)
+
+    def test_from_dict(self):
+        DV = DirectionalVariogram.from_dict(self.DV.to_dict())
+
+        self.assert_directional(DV)
+        assert_array_almost_equal(DV._direction_mask(), self.DV._direction_mask())
+
+    def test_from_dict_model_only(self):
+        data = self.DV.to_dict(include_data=False)
+        DV = DirectionalVariogram.from_dict(data, model_only=True)
+
+        self.assert_directional(DV)
+        self.assertIsNone(DV._dist)
+
+    def test_custom_directional_model(self):
+        self.DV.set_directional_model(lambda angles, dists: angles < 0.5)
+
+        with self.assertRaises(ValueError) as e:
+            self.DV.to_dict()
+        self.assertTrue('directional_model' in str(e.exception))
@@ -6,7 +6,10 @@ import unittest
 import numpy as np
 
 from skgstat.estimators import matheron, cressie, dowd, genton
-from skgstat.estimators import minmax, percentile, entropy
+from skgstat.estimators import minmax, percentile, entropy, lag_sums
+from skgstat.estimators import register_estimator, get_estimator
+from skgstat.estimators import get_grouped_estimator
+from skgstat import estimators
 
 
 class TestEstimator(unittest.TestCase):
@@ -60,7 +63,7 @@ class TestEstimator(unittest.TestCase):
 
     def test_genton(self):
         # extract actual estimator
-        e = genton.py_func
+        e = genton
 
         np.random.seed(42)
         x1 = np.random.gamma(40, 2, 100)
@@ -72,11 +75,83 @@ class TestEstimator(unittest.TestCase):
 
     def test_genton_nan(self):
         # extract actual estimator
-        e = genton.py_func
+        e = genton
 
         # genton cannot be solved for only one element
         self.assertTrue(np.isnan(e(np.array([0.1]))))
 
+    def test_genton_large(self):
+        np.random.seed(42)
+        x = np.random.normal(0, 1, 700)
+
+        # brute force: the 0.25th percentile of all pairwise differences
+        i, j = np.triu_indices(x.size, 1)
+        expected = 0.5 * (2.219 * np.percentile(np.abs(x[i] - x[j]), 0.25))**2
+
+        self.assertAlmostEqual(genton(x), expected, places=10)
+
+    def test_genton_ties(self):
+        np.random.seed(42)
+        x = np.random.randint(0, 4, 60).astype(float)
+
+        i, j = np.triu_indices(x.size, 1)
+        y = np.abs(x[i] - x[j])
+        k = (31 * 30 / 2) / (60 * 59 / 2)
+        expected = 0.5 * (2.219 * np.percentile(y, k))**2
+
+        self.assertAlmostEqual(genton(x), expected, places=10)
+
+    def test_genton_approximation(self):
+        np.random.seed(42)
+        x = np.random.normal(0, 1, 3000)
+
+        # the approximation has to lie in the DKW bounds at alpha=0.001
+        m = 100000
+        eps = np.sqrt(np.log(2 / 0.001) / (2 * m)) * 100
+        i, j = np.triu_indices(x.size, 1)
+        y = np.abs(x[i] - x[j])
+        lower, upper = 0.5 * (2.219 * np.percentile(y, [0, 0.25 + eps]))**2
+
+        approx = genton(x, max_pairs=m)
+        self.assertGreaterEqual(approx, lower)
+        self.assertLessEqual(approx, upper)
+
+        # the sample is seeded
+        self.assertEqual(approx, genton(x, max_pairs=m))
+
+        # without touching the global random state
+        np.random.seed(1)
+        expected = np.random.rand()
+        np.random.seed(1)
+        genton(x, max_pairs=m)
+        self.assertEqual(np.random.rand(), expected)
+
+    def test_lag_sums(self):
+        np.random.seed(42)
+        x = np.random.normal(0, 2, 1000)
+        np.random.seed(42)
+        groups = np.random.randint(-1, 5, 1000)
+
+        count, sq, sqrt = lag_sums(x, groups, 4)
+
+        for i in range(4):
+            self.assertEqual(count[i], np.sum(groups == i))
+            self.assertAlmostEqual(sq[i], np.sum(x[groups == i]**2))
+            self.assertAlmostEqual(
+                sqrt[i], np.sum(np.sqrt(np.abs(x[groups == i])))
+            )
+
+    def test_lag_sums_estimators(self):
+        np.random.seed(42)
+        x = np.abs(np.random.normal(0, 2, 500))
+        n, sq, sqrt = lag_sums(x, np.zeros(500, dtype=int), 1)
+
+        self.assertAlmostEqual(sq[0] / (2 * n[0]), matheron(x))
+        self.assertAlmostEqual(
+            (sqrt[0] / n[0])**4 / (2 * (0.457 + 0.494 / n[0] + 0.045 / n[0]**2)),
+            cressie(x)
+        )
+
     def test_minmax_skew(self):
         # heavily skewed gamma
         np.random.seed(1306)
@@ -116,5 +191,50 @@ class TestEstimator(unittest.TestCase):
         self.assertAlmostEqual(entropy(x), 2.91, places=2)
 
 
+def mean_abs(x, groups, n_lags):
+    """mean absolute difference of all lag classes"""
+    g = groups[(groups >= 0) & (groups < n_lags)]
+    x = x[(groups >= 0) & (groups < n_lags)]
+    return np.bincount(g, weights=np.abs(x), minlength=n_lags) / \
+        np.bincount(g, minlength=n_lags)
+
+
+class TestEstimatorRegistry(unittest.TestCase):
+    def tearDown(self):
+        estimators._ESTIMATORS.pop('mean_abs', None)
+
+    def test_builtin_estimators(self):
+        self.assertIs(get_estimator('Matheron'), matheron)
+        self.assertIs(get_estimator('genton'), genton)
+        self.assertIsNotNone(get_grouped_estimator(matheron))
+        self.assertIsNone(get_grouped_estimator(dowd))
+
+    def test_unknown_estimator(self):
+        with self.assertRaises(ValueError):
+            get_estimator('foobar')
+
+    def test_register_nothing(self):
+        with self.assertRaises(ValueError):
+            register_estimator('mean_abs')
+
+    def test_register_grouped_only(self):
+        func = register_estimator('mean_abs', grouped=mean_abs)
+
+        self.assertIs(get_estimator('mean_abs'), func)
+        self.assertIs(get_grouped_estimator(func), mean_abs)
+        self.assertEqual(func.__name__, 'mean_abs')
+        self.assertAlmostEqual(func(np.array([1., -2., 3.])), 2.)
+
+    def test_grouped_builtins(self):
+        np.random.seed(42)
+        x = np.abs(np.random.normal(0, 2, 300))
+        groups = np.random.randint(-1, 3, 300)
+
+        for func in (matheron, cressie):
+            grouped = get_grouped_estimator(func)(x, groups, 3)
+            for i in range(3):
+                self.assertAlmostEqual(grouped[i], func(x[groups == i]))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,49 @@
+"""
+Import time benchmark. Importing skgstat must not load the plotting
+backends, pandas or sklearn, as they take most of the import time.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+LAZY_MODULES = ('matplotlib', 'plotly', 'pandas', 'sklearn')
+
+
+def _import_times(statement='import skgstat'):
+    # run in a fresh interpreter, the test session has imported everything
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([root, os.environ.get('PYTHONPATH', '')]))
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True, env=env, check=True
+    )
+
+    # parse 'import time: self [us] | cumulative | imported package'
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_no_lazy_modules_on_import():
+    times = _import_times()
+
+    loaded = [m for m in times if m.split('.')[0] in LAZY_MODULES]
+    assert loaded == [], 'import skgstat (%.2fs) loaded: %s' % (
+        times['skgstat'] / 1e6, ', '.join(loaded[:10])
+    )
+
+
+@pytest.mark.parametrize('statement,module', [
+    ('import skgstat, numpy as np; skgstat.Variogram(np.random.rand(20, 2), np.random.rand(20)).plot(show=False)', 'matplotlib'),
+    ('import skgstat; skgstat.interfaces.VariogramEstimator()', 'sklearn'),
+])
+def test_lazy_modules_on_use(statement, module):
+    times = _import_times(statement)
+    assert module in times
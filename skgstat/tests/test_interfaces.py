@@ -1,5 +1,8 @@
 import os
+import shutil
+import tempfile
 import unittest
+from unittest import mock
 
 import numpy as np
 import pandas as pd
@@ -8,6 +11,8 @@ from sklearn.model_selection import GridSearchCV
 
 from skgstat import Variogram
 from skgstat.interfaces import VariogramEstimator
+from skgstat.interfaces import variogram_estimator
+from skgstat.interfaces import gstools_params
 
 try:
     import pykrige
@@ -106,6 +111,131 @@ class TestVariogramEstimator(unittest.TestCase):
 
         self.assertEqual(gs.best_params_['model'], 'exponential')
 
+    def test_predict_shape(self):
+        ve = VariogramEstimator(n_lags=15).fit(self.c, self.v)
+        x = np.linspace(0, ve.range_, 100)
+
+        # matrices are flattened
+        assert_array_almost_equal(ve.predict(x.reshape(10, 10)), ve.predict(x))
+
+    def test_cache_same_result(self):
+        for params in (
+            dict(n_lags=8, model='exponential'),
+            dict(n_lags=12, bin_func='uniform', estimator='cressie', maxlag=0.6),
+            dict(bin_func='fd', use_nugget=True, normalize=False),
+        ):
+            a = VariogramEstimator(use_cache=True, **params).fit(self.c, self.v)
+            b = VariogramEstimator(use_cache=False, **params).fit(self.c, self.v)
+
+            assert_array_almost_equal(a.variogram.bins, b.variogram.bins)
+            assert_array_almost_equal(a.variogram.experimental, b.variogram.experimental)
+            assert_array_almost_equal(a.variogram.parameters, b.variogram.parameters)
+
+    def test_cache_shares_distances(self):
+        variogram_estimator.clear_cache()
+
+        a = VariogramEstimator(n_lags=8, use_cache=True).fit(self.c, self.v).variogram
+        b = VariogramEstimator(n_lags=12, model='gaussian', use_cache=True).fit(self.c, self.v).variogram
+        self.assertIs(a.distance, b.distance)
+        self.assertEqual(b.n_lags, 12)
+
+        # other values are not shared
+        c = VariogramEstimator(n_lags=8, use_cache=True).fit(self.c, self.v[::-1]).variogram
+        self.assertIsNot(a.distance, c.distance)
+
+        variogram_estimator.clear_cache()
+        self.assertEqual(len(variogram_estimator._CACHE), 0)
+
+    def test_cache_cross_validation(self):
+        variogram_estimator.clear_cache()
+        builds = []
+        build = VariogramEstimator._build_variogram
+
+        def counting_build(self, X, y, **kwargs):
+            builds.append(len(X))
+            return build(self, X, y, **kwargs)
+
+        parameters = dict(model=('spherical', 'gaussian', 'exponential'), n_lags=(8, 15))
+        with mock.patch.object(VariogramEstimator, '_build_variogram', counting_build):
+            GridSearchCV(VariogramEstimator(use_cache=True), parameters, cv=5, refit=False).fit(self.c, self.v)
+
+        # one build per training fold
+        self.assertEqual(len(builds), 5)
+
+    def test_cache_opt_in(self):
+        variogram_estimator.clear_cache()
+
+        VariogramEstimator().fit(self.c, self.v)
+        self.assertEqual(len(variogram_estimator._CACHE), 0)
+
+    def test_cache_build_outside_lock(self):
+        variogram_estimator.clear_cache()
+        locked = []
+        build = VariogramEstimator._build_variogram
+
+        def checking_build(self, X, y, **kwargs):
+            # other threads can use the cache during the build
+            free = variogram_estimator._CACHE_LOCK.acquire(blocking=False)
+            if free:
+                variogram_estimator._CACHE_LOCK.release()
+            locked.append(not free)
+            return build(self, X, y, **kwargs)
+
+        with mock.patch.object(VariogramEstimator, '_build_variogram', checking_build):
+            VariogramEstimator(use_cache=True).fit(self.c, self.v)
+
+        self.assertEqual(locked, [False])
+        self.assertEqual(len(variogram_estimator._PENDING), 0)
+        variogram_estimator.clear_cache()
+
+    def test_cache_dir(self):
+        variogram_estimator.clear_cache()
+        path = tempfile.mkdtemp()
+        try:
+            a = VariogramEstimator(use_cache=True, cache_dir=path).fit(self.c, self.v)
+
+            # another process starts with an empty cache
+            variogram_estimator.clear_cache()
+            b = VariogramEstimator(use_cache=True, cache_dir=path, n_lags=12).fit(self.c, self.v)
+
+            self.assertIsInstance(b.variogram.distance, np.memmap)
+            assert_array_almost_equal(a.variogram.distance, b.variogram.distance)
+            self.assertFalse('preprocessing_store' in b.variogram._kwargs)
+        finally:
+            variogram_estimator.clear_cache()
+            shutil.rmtree(path)
+
+    def test_cache_size(self):
+        variogram_estimator.clear_cache()
+        variogram_estimator.set_cache_size(2)
+        try:
+            for i in range(3):
+                VariogramEstimator(use_cache=True).fit(self.c, self.v + i)
+            self.assertEqual(len(variogram_estimator._CACHE), 2)
+        finally:
+            variogram_estimator.set_cache_size(16)
+            variogram_estimator.clear_cache()
+
+    def test_cache_threading(self):
+        from joblib import Parallel, delayed
+
+        variogram_estimator.clear_cache()
+        params = [
+            dict(model=m, n_lags=n)
+            for m in ('spherical', 'gaussian', 'exponential') for n in (8, 15)
+        ]
+
+        def fit(p):
+            return VariogramEstimator(use_cache=True, **p).fit(self.c, self.v).variogram
+
+        # the jobs share one cached Variogram
+        variograms = Parallel(n_jobs=2, backend='threading')(delayed(fit)(p) for p in params)
+        self.assertEqual(len(variogram_estimator._CACHE), 1)
+
+        for p, V in zip(params, variograms):
+            expected = VariogramEstimator(use_cache=False, **p).fit(self.c, self.v)
+            assert_array_almost_equal(V.parameters, expected.variogram.parameters)
+
 
 class TestPyKrigeInterface(unittest.TestCase):
     def setUp(self):
@@ -239,6 +369,73 @@ class TestGstoolsInterface(unittest.TestCase):
             model.variogram(self.xi), self.yi, decimal=2
         )
 
+    def test_native_models(self):
+        if not GSTOOLS_AVAILABLE:  # pragma: no cover
+            return True
+
+        for model in ('spherical', 'exponential', 'gaussian', 'cubic', 'stable', 'matern'):
+            V = Variogram(self.c, self.v, model=model, normalize=False, use_nugget=True)
+            gs_model = gstools_interface.gstools_cov_model(V)
+
+            self.assertEqual(type(gs_model).__name__, model.capitalize())
+            assert_array_almost_equal(
+                gs_model.variogram(self.xi), V.transform(self.xi), decimal=2
+            )
+
+
+class TestGstoolsParams(unittest.TestCase):
+    """
+    Compare the converted parameters to the gstools correlation
+    functions with rescale=1, as given in the gstools documentation.
+    """
+    def setUp(self):
+        df = pd.read_csv(os.path.join(os.path.dirname(__file__), 'sample.csv'))
+        self.c = df[['x', 'y']].values
+        self.v = df.z.values
+        self.h = np.linspace(1, 80, 50)
+
+    @staticmethod
+    def gstools_variogram(name, h, p):
+        from scipy import special
+
+        x = h / p['len_scale']
+        if name == 'Spherical':
+            cor = np.where(x < 1, 1 - 1.5 * x + 0.5 * x**3, 0)
+        elif name == 'Exponential':
+            cor = np.exp(-x)
+        elif name == 'Gaussian':
+            cor = np.exp(-x**2)
+        elif name == 'Cubic':
+            cor = np.where(
+                x < 1, 1 - 7 * x**2 + 35 / 4 * x**3 - 7 / 2 * x**5 + 3 / 4 * x**7, 0
+            )
+        elif name == 'Stable':
+            cor = np.exp(-x**p['alpha'])
+        elif name == 'Matern':
+            nu = p['nu']
+            y = np.sqrt(nu) * x
+            cor = 2**(1 - nu) / special.gamma(nu) * y**nu * special.kv(nu, y)
+
+        return p['nugget'] + p['var'] * (1 - cor)
+
+    def test_params(self):
+        for model in ('spherical', 'exponential', 'gaussian', 'cubic', 'stable', 'matern'):
+            V = Variogram(self.c, self.v, model=model, normalize=False, use_nugget=True)
+            name, params = gstools_params(V)
+
+            self.assertEqual(name, model.capitalize())
+            self.assertEqual(params['rescale'], 1.)
+            assert_array_almost_equal(
+                self.gstools_variogram(name, self.h, params),
+                V.transform(self.h)
+            )
+
+    def test_harmonized(self):
+        V = Variogram(self.c, self.v, model='spherical', normalize=False)
+        V.model = 'harmonize'
+
+        self.assertEqual(gstools_params(V), (None, dict()))
+
 
 if __name__ == '__main__':
     os.environ['SKG_SUPRESS'] = 'TRUE'  # pragma: no cover
@@ -3,6 +3,7 @@ import unittest
 import numpy as np
 from numpy.testing import assert_array_almost_equal
 from skgstat import Variogram, OrdinaryKriging
+from skgstat import SpaceTimeVariogram, SpaceTimeOrdinaryKriging
 
 
 class TestKrigingInstantiation(unittest.TestCase):
@@ -124,6 +125,90 @@ class TestKrigingInstantiation(unittest.TestCase):
         )
 
 
+    def test_chunked_transform(self):
+        ok = OrdinaryKriging(self.V, min_points=2, max_points=5)
+        x = np.linspace(10, 60, 20)
+        y = np.linspace(20, 50, 20)
+        z = ok.transform(x, y)
+        s = ok.sigma.copy()
+
+        # chunked and threaded transform has to give the same result
+        ok.chunk_size = 3
+        ok.n_jobs = 2
+        assert_array_almost_equal(ok.transform(x, y), z)
+        assert_array_almost_equal(ok.sigma, s)
+
+    def test_transform_no_targets(self):
+        ok = OrdinaryKriging(self.V, min_points=2, max_points=5)
+        z = ok.transform(np.array([]), np.array([]))
+
+        self.assertEqual(z.shape, (0,))
+        self.assertEqual(ok.sigma.shape, (0,))
+        self.assertEqual(ok.no_points_error, 0)
+
+
+class TestSpaceTimeKriging(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(42)
+        self.c = np.random.uniform(0, 100, (40, 2))
+        t = np.arange(12)
+        np.random.seed(42)
+        self.v = np.sin(self.c[:, :1] / 20) + np.cos(t[None, :] / 4) + \
+            np.random.normal(0, 0.05, (40, 12))
+        self.V = SpaceTimeVariogram(self.c, self.v, x_lags=8)
+
+    def test_type_check(self):
+        with self.assertRaises(TypeError):
+            SpaceTimeOrdinaryKriging(Variogram(self.c, self.v[:, 0]))
+
+    def test_default_radius(self):
+        ok = SpaceTimeOrdinaryKriging(self.V)
+
+        self.assertAlmostEqual(
+            ok.xradius, self.V.XMarginal.describe()['effective_range']
+        )
+        self.assertAlmostEqual(
+            ok.tradius, self.V.TMarginal.describe()['effective_range']
+        )
+
+    def test_exact_at_observations(self):
+        ok = SpaceTimeOrdinaryKriging(self.V, min_points=3, max_points=10)
+        z = ok.transform(self.c[:5, 0], self.c[:5, 1], np.ones(5) * 3)
+
+        assert_array_almost_equal(z, self.v[:5, 3], decimal=6)
+
+    def test_chunks_and_threads(self):
+        ok = SpaceTimeOrdinaryKriging(self.V, min_points=3, max_points=10)
+        np.random.seed(1312)
+        x, y = np.random.uniform(0, 100, (2, 30))
+        t = np.random.uniform(0, 11, 30)
+
+        z = ok.transform(x, y, t)
+        self.assertFalse(np.isnan(z).any())
+
+        ok.chunk_size = 4
+        ok.n_jobs = 2
+        assert_array_almost_equal(ok.transform(x, y, t), z)
+
+    def test_transform_no_targets(self):
+        ok = SpaceTimeOrdinaryKriging(self.V, min_points=3, max_points=10)
+        z = ok.transform(np.array([]), np.array([]), np.array([]))
+
+        self.assertEqual(z.shape, (0,))
+        self.assertEqual(ok.sigma.shape, (0,))
+        self.assertEqual(ok.singular_error, 0)
+        self.assertEqual(ok.no_points_error, 0)
+
+    def test_not_enough_points(self):
+        ok = SpaceTimeOrdinaryKriging(
+            self.V, min_points=3, max_points=10, xradius=1e-3, tradius=0
+        )
+        z = ok.transform(np.array([500.]), np.array([500.]), np.array([3.5]))
+
+        self.assertTrue(np.isnan(z).all())
+        self.assertEqual(ok.no_points_error, 1)
+
+
 class TestPerformance(unittest.TestCase):
     """
     The TestPerformance class is not a real unittest. It will always be true.
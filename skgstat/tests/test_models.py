@@ -185,5 +185,55 @@ class TestVariogramDecorator(unittest.TestCase):
         for r, c in zip(res, adder([1, 4, 8], 4)):
             self.assertEqual(r, c)
 
+    def test_array_models(self):
+        h = np.linspace(0, 100, 50)
+
+        for model, args in (
+            (spherical, (50, 3)),
+            (exponential, (50, 3)),
+            (gaussian, (50, 3, 1)),
+            (cubic, (50, 3)),
+            (stable, (50, 3, 1.5)),
+            (matern, (50, 3, 1.5, 1)),
+        ):
+            # same as the scalar model
+            expected = [model(_, *args) for _ in h]
+            np.testing.assert_array_almost_equal(model(h, *args), expected)
+
+            # the shape is kept
+            self.assertEqual(model(h.reshape(5, 10), *args).shape, (5, 10))
+
+    def test_matern_numpy(self):
+        # reference values of the former numba object mode implementation
+        # (h, r, c0, s, b), including a = r / 3 for s <= 0.5 and s >= 10
+        expected = [
+            ((1., 50., 3., 0.3, 0.), 0.5548467079273091),
+            ((10., 50., 3., 0.5, 0.), 1.7158665264292954),
+            ((5., 50., 3., 1.5, 1.), 1.2614681193475805),
+            ((30., 50., 3., 1.5, 1.), 3.3748415239633176),
+            ((10., 50., 3., 12., 0.), 0.9595215179916184),
+            ((40., 50., 3., 20., 0.5), 3.485602347253888),
+            ((80., 50., 3., 2., 0.), 2.9926948749222655),
+        ]
+        for args, value in expected:
+            self.assertAlmostEqual(matern(*args), value, places=10)
+
+        # scalar and array evaluation agree
+        h = np.linspace(1, 100, 20)
+        for s in (0.3, 1.5, 12.):
+            np.testing.assert_array_almost_equal(
+                matern(h, 50, 3, s, 1),
+                [matern(_, 50, 3, s, 1) for _ in h],
+                decimal=10
+            )
+
+    def test_array_nugget_keyword(self):
+        h = np.array([5, 10, 30, 50, 100])
+
+        np.testing.assert_array_almost_equal(
+            spherical(h, 15, 30, b=2),
+            [spherical(_, 15, 30, 2) for _ in h]
+        )
+
 if __name__=='__main__':
     unittest.main()
\ No newline at end of file
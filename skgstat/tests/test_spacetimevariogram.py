@@ -5,6 +5,7 @@ from numpy.testing import assert_array_almost_equal
 import matplotlib.pyplot as plt
 
 from skgstat import SpaceTimeVariogram
+from skgstat import estimators
 
 
 class TestSpaceTimeVariogramInitialization(unittest.TestCase):
@@ -177,6 +178,73 @@ class TestSpaceTimeVariogramArgumets(unittest.TestCase):
 
         self.assertTrue(V.x_lags == 43)
 
+    def test_registered_grouped_estimator(self):
+        def mean_abs(x, groups, n_lags):
+            m = (groups >= 0) & (groups < n_lags)
+            return np.bincount(groups[m], weights=x[m], minlength=n_lags) / \
+                np.bincount(groups[m], minlength=n_lags)
+
+        func = estimators.register_estimator('mean_abs', grouped=mean_abs)
+        try:
+            V = SpaceTimeVariogram(self.c, self.v, estimator='mean_abs')
+            exp = np.fromiter(
+                (func(lag) for lag in V.lag_classes()), dtype=float
+            )
+            assert_array_almost_equal(V.experimental, exp)
+        finally:
+            estimators._ESTIMATORS.pop('mean_abs')
+
+
+class TestSpaceTimeVariogramAppend(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(42)
+        self.c = np.random.gamma(10, 6, (30, 2))
+        np.random.seed(42)
+        self.v = np.random.normal(15, 4, (30, 12))
+
+    def test_lag_stats_match_lag_classes(self):
+        for est in ('matheron', 'cressie'):
+            V = SpaceTimeVariogram(self.c, self.v, estimator=est)
+            ref = np.fromiter(
+                (V.estimator(x) for x in V.lag_classes()), dtype=float
+            )
+            assert_array_almost_equal(V.experimental, ref, decimal=8)
+
+    def test_append_timesteps(self):
+        V = SpaceTimeVariogram(self.c, self.v[:, :6], t_lags=3)
+        V.append_timesteps(self.v[:, 6:9])
+        V.append_timesteps(self.v[:, 9:])
+
+        F = SpaceTimeVariogram(self.c, self.v, t_lags=3)
+        self.assertEqual(V.values.shape, (30, 12))
+        assert_array_almost_equal(V.experimental, F.experimental, decimal=8)
+
+    def test_append_timesteps_window(self):
+        V = SpaceTimeVariogram(self.c, self.v[:, :6], estimator='cressie')
+        for i in range(6, 12):
+            V.append_timesteps(self.v[:, i], window=6)
+
+        F = SpaceTimeVariogram(self.c, self.v[:, 6:], estimator='cressie')
+        assert_array_almost_equal(V.values, self.v[:, 6:])
+        assert_array_almost_equal(V.experimental, F.experimental, decimal=8)
+
+    def test_append_resets_marginals(self):
+        V = SpaceTimeVariogram(self.c, self.v[:, :6])
+        V.append_timesteps(self.v[:, 6:])
+
+        self.assertIsNone(V._XMarginal)
+        self.assertEqual(V.XMarginal.values.size, 30 * 12)
+
+    def test_append_timesteps_raises_shape_error(self):
+        V = SpaceTimeVariogram(self.c, self.v)
+
+        with self.assertRaises(ValueError) as e:
+            V.append_timesteps(np.random.normal(10, 5, (25, 2)))
+
+        self.assertEqual(
+            str(e.exception), 'The values shape do not match coordinates.'
+        )
+
 
 class TestSpaceTimeVariogramPlots(unittest.TestCase):
     def setUp(self):
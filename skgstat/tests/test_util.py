@@ -1,6 +1,11 @@
 import numpy as np
 
-from skgstat.util import shannon_entropy
+from skgstat.util import shannon_entropy, shannon_entropy_from_counts
+from skgstat.util import grouped_histogram
+from skgstat.util import condensed_index, pair_indices, read_only_view
+from skgstat.util import warmup
+from skgstat import estimators, models
+from scipy.spatial.distance import squareform
 
 
 def test_shannon_entropy():
@@ -11,3 +16,62 @@ def test_shannon_entropy():
     h = shannon_entropy(x, bins=15)
 
     assert np.abs(h - 2.943) < 0.001
+
+
+def test_grouped_histogram():
+    np.random.seed(42)
+    x = np.random.gamma(10, 15, size=1000)
+    np.random.seed(42)
+    groups = np.random.randint(-1, 4, size=1000)
+    bins = np.linspace(50, 300, 11)
+
+    counts = grouped_histogram(x, groups, 4, bins)
+
+    for i in range(4):
+        c, _ = np.histogram(x[groups == i], bins=bins)
+        assert np.array_equal(counts[i], c)
+
+
+def test_shannon_entropy_from_counts():
+    np.random.seed(42)
+    x = np.random.gamma(10, 15, size=1000)
+    c, _ = np.histogram(x, bins=15)
+
+    h = shannon_entropy_from_counts(np.vstack((c, c[::-1], np.zeros(15))))
+
+    assert np.abs(h[0] - 2.943) < 0.001
+    assert np.abs(h[1] - h[0]) < 1e-12
+    assert np.isnan(h[2])
+
+
+def test_condensed_pair_indices():
+    for n in (2, 3, 10, 57):
+        k = np.arange(n * (n - 1) // 2)
+        sq = squareform(k + 1)
+
+        i, j = pair_indices(k, n)
+        assert np.all(i < j)
+        assert np.array_equal(sq[i, j], k + 1)
+
+        # both orientations map back
+        assert np.array_equal(condensed_index(i, j, n), k)
+        assert np.array_equal(condensed_index(j, i, n), k)
+
+
+def test_read_only_view():
+    x = np.arange(5.)
+    v = read_only_view(x)
+
+    assert not v.flags.writeable
+    assert np.shares_memory(v, x)
+    x[0] = 10.
+    assert v[0] == 10.
+
+
+def test_warmup():
+    elapsed = warmup(dtypes=(np.float64, ))
+    assert elapsed >= 0
+
+    # the kernels are compiled for float64
+    assert len(estimators.matheron.signatures) > 0
+    assert len(models.spherical.__wrapped__.signatures) > 0
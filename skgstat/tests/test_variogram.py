@@ -1,6 +1,9 @@
 import unittest
 import os
 import pickle
+import json
+import shutil
+import tempfile
 
 import numpy as np
 import pandas as pd
@@ -14,9 +17,13 @@ except ImportError:
     print('No plotly installed. Skip plot tests')
     PLOTLY_FOUND = False
 
-from skgstat import Variogram
+from scipy.spatial.distance import pdist
+
+from skgstat import Variogram, OrdinaryKriging
 from skgstat import estimators
+from skgstat import binning
 from skgstat import plotting
+from skgstat.plotting import density, variogram_scattergram
 
 
 class TestVariogramInstatiation(unittest.TestCase):
@@ -230,6 +237,41 @@ class TestVariogramArguments(unittest.TestCase):
             decimal=1
         )
 
+    def test_binning_reuses_sorted_distances(self):
+        V = Variogram(self.c, self.v, n_lags=6)
+        sorted_dist = V._binning_distances()
+
+        # changing the binning does not sort again
+        for bin_func in ('uniform', 'kmeans', 'ward', 'fd'):
+            V.bin_func = bin_func
+            V.bins
+            self.assertIs(V._binning_distances(), sorted_dist)
+
+        # new distances are sorted again
+        V.distance = V.distance.copy()
+        self.assertIsNot(V._binning_distances(), sorted_dist)
+
+    def test_binning_sketch(self):
+        V = Variogram(self.c, self.v, n_lags=4, bin_func='uniform')
+        V2 = Variogram(
+            self.c, self.v, n_lags=4, bin_func='uniform', binning_sketch_alpha=0.01
+        )
+
+        self.assertIsInstance(V2._binning_distances(), binning.DistanceSketch)
+        assert_array_almost_equal(V.bins / V.bins, V2.bins / V.bins, decimal=1)
+
+        # not supported by the sketch
+        V2.bin_func = 'stable_entropy'
+        self.assertIsInstance(V2._binning_distances(), binning.SortedDistances)
+
+    def test_binning_ward_median(self):
+        V = Variogram(self.c, self.v, n_lags=6, bin_func='ward')
+        V2 = Variogram(
+            self.c, self.v, n_lags=6, bin_func='ward', binning_agg_func='median'
+        )
+
+        # the kwarg is passed to the binning function
+        self.assertFalse(np.allclose(V.bins, V2.bins))
 
     def test_estimator_method_setting(self):
         """
@@ -373,9 +415,44 @@ class TestVariogramArguments(unittest.TestCase):
                 'n_lags has to be a positive integer'
             )
 
-    def test_n_lags_not_implemented(self):
-        with self.assertRaises(NotImplementedError):
+    def test_n_lags_unknown_string(self):
+        with self.assertRaises(ValueError) as e:
             Variogram(self.c, self.v, n_lags='auto')
+
+        self.assertEqual(
+            str(e.exception),
+            "n_lags strings have to be one of 'fit', 'stable'"
+        )
+
+    def test_n_lags_lag_rse(self):
+        V = Variogram(self.c, self.v, n_lags=8)
+
+        # the prefix sums give the same lag classes
+        count, gamma, _ = V._lag_rse(V.bins)
+        assert_array_almost_equal(count, V._lag_counts())
+        assert_array_almost_equal(gamma, V.experimental)
+
+        V.estimator = 'cressie'
+        assert_array_almost_equal(V._lag_rse(V.bins)[1], V.experimental)
+
+    def test_n_lags_stable(self):
+        V = Variogram(self.c, self.v, n_lags='stable', n_lags_max_rse=0.5)
+        n = V.n_lags
+
+        self.assertIn(n, range(3, 31))
+        self.assertTrue(np.all(V._lag_rse(V.bins)[2] <= 0.5))
+
+        # the next candidate is not stable anymore
+        if n < 30:
+            V.n_lags = n + 1
+            self.assertFalse(np.all(V._lag_rse(V.bins)[2] <= 0.5))
+
+    def test_n_lags_fit(self):
+        V = Variogram(self.c, self.v, n_lags='fit', n_lags_candidates=[3, 5, 8, 12])
+
+        self.assertIn(V.n_lags, [3, 5, 8, 12])
+        self.assertEqual(len(V.bins), V.n_lags)
+        self.assertEqual(V.n_lags, V.optimize_n_lags('fit', candidates=[3, 5, 8, 12]))
     
     def test_set_values(self):
         V = Variogram(self.c, self.v)
@@ -423,6 +500,24 @@ class TestVariogramArguments(unittest.TestCase):
         V = Variogram(coor, vals)
 
         assert_array_almost_equal(V.distance_matrix, dist_mat, decimal=3)
+
+    def test_read_only_accessors(self):
+        V = Variogram(self.c, self.v)
+
+        # bins are a read-only view
+        bins = V.bins
+        self.assertFalse(bins.flags.writeable)
+        with self.assertRaises(ValueError):
+            bins[0] = 0
+
+        # the matrices are only built once
+        self.assertIs(V.distance_matrix, V.distance_matrix)
+        self.assertFalse(V.value_matrix.flags.writeable)
+
+        # and rebuilt for new values
+        mat = V.value_matrix
+        V.values = self.v * 2
+        assert_array_almost_equal(V.value_matrix, mat * 2)
     
     def test_entropy_as_estimator(self):
         """
@@ -438,6 +533,22 @@ class TestVariogramArguments(unittest.TestCase):
             decimal=2
         )
 
+    def test_entropy_as_estimator_mapped(self):
+        V = Variogram(self.c, self.v, estimator='entropy', n_lags=10)
+        bins = np.histogram_bin_edges(V.distance, bins=49)
+
+        exp = np.fromiter(
+            (estimators.entropy(g, bins=bins) for g in V.lag_classes()),
+            dtype=float
+        )
+        assert_array_almost_equal(V.experimental, exp)
+
+    def test_fit_sigma_entropy_reuses_estimator(self):
+        V = Variogram(self.c, self.v, estimator='entropy', n_lags=10)
+        V.fit(sigma='entropy')
+
+        assert_array_almost_equal(V.fit_sigma, 1. / V.experimental)
+
 
 class TestVariogramFittingProcedure(unittest.TestCase):
     def setUp(self):
@@ -819,6 +930,53 @@ class TestVariogramQaulityMeasures(unittest.TestCase):
         with self.assertRaises(AssertionError):
             assert_array_almost_equal(exp, exp2, decimal=2)
 
+    def test_lag_sums_experimental(self):
+        for est in ('matheron', 'cressie'):
+            V = Variogram(self.c, self.v, estimator=est)
+            exp = np.fromiter(
+                (V.estimator(g) if g.size else np.nan for g in V.lag_classes()),
+                dtype=float
+            )
+            assert_array_almost_equal(V.experimental, exp)
+
+        counts = np.fromiter((g.size for g in V.lag_classes()), dtype=int)
+        assert_array_almost_equal(V._lag_counts(), counts)
+
+    def test_registered_grouped_estimator(self):
+        calls = []
+
+        def mean_sq(x, groups, n_lags):
+            calls.append(n_lags)
+            return estimators.get_grouped_estimator(estimators.matheron)(
+                x, groups, n_lags
+            ) * 2
+
+        func = estimators.register_estimator('mean_sq', grouped=mean_sq)
+        try:
+            V = Variogram(self.c, self.v, estimator='mean_sq')
+            exp = V.experimental
+
+            self.assertIs(V.estimator, func)
+            self.assertEqual(calls[-1], len(V.bins))
+
+            V.estimator = 'matheron'
+            assert_array_almost_equal(exp, V.experimental * 2)
+        finally:
+            estimators._ESTIMATORS.pop('mean_sq')
+
+    def test_genton_max_pairs(self):
+        V = Variogram(self.c, self.v, estimator='genton')
+        exp = V.experimental
+
+        # all lag classes are smaller, the approximation is not used
+        V.update_kwargs(genton_max_pairs=10**6)
+        assert_array_almost_equal(exp, V.experimental)
+
+        # approximate all lag classes
+        V.update_kwargs(genton_max_pairs=50)
+        with self.assertRaises(AssertionError):
+            assert_array_almost_equal(exp, V.experimental, decimal=6)
+
 
 class TestVariogramMethods(unittest.TestCase):
     def setUp(self):
@@ -1027,6 +1185,71 @@ class TestVariogramPlots(unittest.TestCase):
 
         self.assertEqual(len(fig.axes), 2)
 
+    def test_scattergram_data(self):
+        V = Variogram(self.c, self.v, n_lags=6)
+        calc = getattr(variogram_scattergram, '__calculate_plot_data')
+        tails, heads = calc(V, max_pairs=None)
+
+        # each pair in both directions
+        groups = V.lag_groups()
+        for t, h, g in zip(tails, heads, np.unique(groups)):
+            self.assertEqual(t.size, 2 * np.sum(groups == g))
+            assert_array_almost_equal(np.sort(t), np.sort(h))
+
+    def test_scattergram_max_pairs(self):
+        V = Variogram(self.c, self.v, n_lags=6)
+        calc = getattr(variogram_scattergram, '__calculate_plot_data')
+        tails, heads = calc(V, max_pairs=1000)
+
+        self.assertEqual(sum(t.size for t in tails), 2000)
+        self.assertEqual(sum(h.size for h in heads), 2000)
+
+    def test_dd_plot_max_points(self):
+        V = Variogram(self.c, self.v)
+        fig = V.distance_difference_plot(show=False, density=False, max_points=500)
+
+        # the second collection are the point pairs
+        self.assertEqual(len(fig.axes[0].collections[1].get_offsets()), 500)
+
+    def test_dd_plot_density(self):
+        V = Variogram(self.c, self.v)
+        fig = V.distance_difference_plot(show=False, density=True, bins=20)
+
+        # histogram and colorbar
+        self.assertEqual(len(fig.axes), 2)
+        self.assertEqual(fig.axes[0].collections[1].get_array().size, 400)
+
+        # auto switches to the histogram above max_points
+        fig = V.distance_difference_plot(show=False, max_points=1000)
+        self.assertEqual(len(fig.axes), 2)
+
+    def test_density_grid(self):
+        V = Variogram(self.c, self.v)
+        counts, x_edges, y_edges = density.density_grid(
+            V.distance, V._diff, bins=(15, 10), chunk_size=1000
+        )
+        ref, _, _ = np.histogram2d(V.distance, V._diff, bins=[x_edges, y_edges])
+
+        assert_array_almost_equal(counts, ref)
+
+    def test_pair_density_grid(self):
+        counts, edges = density.pair_density_grid(self.v, bins=12, chunk_size=1000)
+
+        i, j = np.triu_indices(len(self.v), k=1)
+        ref, _, _ = np.histogram2d(
+            np.concatenate((self.v[i], self.v[j])),
+            np.concatenate((self.v[j], self.v[i])),
+            bins=[edges, edges]
+        )
+        assert_array_almost_equal(counts, ref)
+
+    def test_scattergram_density(self):
+        V = Variogram(self.c, self.v)
+        fig = V.scattergram(show=False, density=True, bins=20)
+
+        self.assertEqual(len(fig.axes), 2)
+        self.assertEqual(fig.axes[0].collections[0].get_array().sum(), len(self.v) * (len(self.v) - 1))
+
     def test_location_trend_pass_axes(self):
         V = Variogram(self.c, self.v)
 
@@ -1197,6 +1420,133 @@ class TestVariogramPickling(unittest.TestCase):
         return True
 
 
+class TestVariogramSerialization(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(42)
+        self.c = np.random.gamma(10, 4, (150, 2))
+        np.random.seed(42)
+        self.v = np.random.normal(10, 4, 150)
+
+        self.V = Variogram(self.c, self.v, n_lags=8, maxlag='median')
+
+    def test_to_dict_is_json(self):
+        data = json.loads(json.dumps(self.V.to_dict()))
+
+        self.assertEqual(data['params']['model'], 'spherical')
+        self.assertEqual(len(data['bins']), 8)
+        assert_array_almost_equal(data['counts'], self.V._lag_counts())
+
+    def test_to_dict_without_data(self):
+        data = self.V.to_dict(include_data=False)
+
+        self.assertFalse('coordinates' in data)
+        with self.assertRaises(ValueError) as e:
+            Variogram.from_dict(data)
+        self.assertTrue('model_only=True' in str(e.exception))
+
+    def test_from_dict(self):
+        V = Variogram.from_dict(self.V.to_dict())
+
+        assert_array_almost_equal(V.bins, self.V.bins)
+        assert_array_almost_equal(V.experimental, self.V.experimental)
+        assert_array_almost_equal(V.cof, self.V.cof)
+
+    def test_from_dict_model_only(self):
+        V = Variogram.from_dict(self.V.to_dict(), model_only=True)
+
+        assert_array_almost_equal(V.bins, self.V.bins)
+        assert_array_almost_equal(V.experimental, self.V.experimental)
+        assert_array_almost_equal(V._lag_counts(), self.V._lag_counts())
+        x = np.linspace(0, 50, 20)
+        assert_array_almost_equal(V.fitted_model(x), self.V.fitted_model(x))
+
+        # no pairwise data was calculated
+        self.assertIsNone(V._dist)
+        self.assertIsNone(V._diff)
+
+    def test_model_only_kriging(self):
+        V = Variogram.from_dict(self.V.to_dict(), model_only=True)
+
+        x, y = self.c[:5, 0] + 0.5, self.c[:5, 1] + 0.5
+        ok = OrdinaryKriging(self.V, min_points=3, max_points=10)
+        ok2 = OrdinaryKriging(V, min_points=3, max_points=10)
+
+        assert_array_almost_equal(ok2.transform(x, y), ok.transform(x, y))
+        self.assertIsNone(V._dist)
+
+    def test_model_only_without_data(self):
+        V = Variogram.from_dict(self.V.to_dict(include_data=False), model_only=True)
+        assert_array_almost_equal(V.fitted_model(10.), self.V.fitted_model(10.))
+
+        # a new binning needs the coordinates
+        V.n_lags = 5
+        with self.assertRaises(RuntimeError):
+            V.bins
+
+    def test_custom_dist_func(self):
+        V = Variogram(self.c, self.v, dist_func=lambda x: pdist(x))
+        with self.assertRaises(ValueError):
+            V.to_dict()
+
+
+class TestPreprocessingStore(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(42)
+        self.c = np.random.gamma(10, 4, (150, 2))
+        np.random.seed(42)
+        self.v = np.random.normal(10, 4, 150)
+
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_store_is_written(self):
+        V = Variogram(self.c, self.v, preprocessing_store=self.path)
+
+        for name in ('distance', 'diff', 'bins', 'groups'):
+            self.assertTrue(os.path.exists(os.path.join(self.path, '%s.npy' % name)))
+
+        # the saved arrays are mapped
+        self.assertIsInstance(V.distance, np.memmap)
+
+    def test_store_is_loaded(self):
+        V = Variogram(self.c, self.v, n_lags=8, preprocessing_store=self.path)
+        V2 = Variogram(self.c, self.v, n_lags=8, preprocessing_store=self.path)
+
+        for arr in (V2.distance, V2._diff, V2.lag_groups()):
+            self.assertIsInstance(arr, np.memmap)
+            self.assertFalse(arr.flags.writeable)
+        assert_array_almost_equal(V2.bins, V.bins)
+        assert_array_almost_equal(V2.experimental, V.experimental)
+        assert_array_almost_equal(V2.cof, V.cof)
+
+    def test_store_other_binning(self):
+        Variogram(self.c, self.v, n_lags=8, preprocessing_store=self.path)
+        V = Variogram(self.c, self.v, n_lags=5, preprocessing_store=self.path)
+        ref = Variogram(self.c, self.v, n_lags=5)
+
+        self.assertEqual(V.n_lags, 5)
+        assert_array_almost_equal(V.bins, ref.bins)
+        assert_array_almost_equal(V.experimental, ref.experimental)
+
+    def test_store_hash_validation(self):
+        Variogram(self.c, self.v, preprocessing_store=self.path)
+
+        # other values invalidate the store
+        V = Variogram(self.c, self.v + 1, preprocessing_store=self.path)
+        assert_array_almost_equal(V._diff, Variogram(self.c, self.v + 1)._diff)
+
+        # other dist_func
+        V = Variogram(self.c, self.v + 1, dist_func='cityblock', preprocessing_store=self.path)
+        assert_array_almost_equal(V.distance, pdist(self.c, metric='cityblock'))
+
+    def test_save_custom_dist_func(self):
+        V = Variogram(self.c, self.v, dist_func=lambda x: pdist(x))
+        with self.assertRaises(ValueError):
+            V.save_preprocessing(self.path)
+
+
 if __name__ == '__main__':  # pragma: no cover
     import os
     os.environ['SKG_SUPRESS'] = 'TRUE'
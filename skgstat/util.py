@@ -1,3 +1,5 @@
+import time
+
 import numpy as np
 
 
@@ -27,8 +29,219 @@ def shannon_entropy(x, bins):
     # histogram
     c, _ = np.histogram(x, bins=bins)
 
+    return shannon_entropy_from_counts(c)
+
+
+def shannon_entropy_from_counts(counts):
+    """Shannon Entropy of histograms
+
+    .. versionadded:: 0.5.0
+
+    Calculates the Shannon Entropy of one or many histograms. The
+    histograms are given along the last axis of counts.
+
+    Parameters
+    ----------
+    counts : numpy.ndarray
+        Histogram counts. For a 2D array, each row is one histogram.
+
+    Returns
+    -------
+    h : float, numpy.ndarray
+        Shannon Entropy of each histogram. NaN for empty histograms.
+    """
+    counts = np.asarray(counts)
+
     # empirical probabilities
-    p = c / np.sum(c) + 1e-15
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = counts / np.sum(counts, axis=-1, keepdims=True) + 1e-15
+
+    # information function and product
+    return - np.sum(np.log2(p) * p, axis=-1)
+
+
+def grouped_histogram(x, groups, n_groups, bins):
+    """Histogram for each group
+
+    .. versionadded:: 0.5.0
+
+    Calculates the histogram of x for each group with one
+    :func:`bincount <numpy.bincount>` over the combined group and bin
+    index. Like :func:`histogram <numpy.histogram>`, the last bin
+    includes its right edge and values outside of the bins are ignored.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        flat 1D array of the observations
+    groups : numpy.ndarray
+        Group index of each observation. Observations with an index
+        outside [0, n_groups[ are ignored.
+    n_groups : int
+        Number of groups.
+    bins : numpy.ndarray
+        Bin edges of the histogram.
+
+    Returns
+    -------
+    counts : numpy.ndarray
+        2D array of shape (n_groups, len(bins) - 1).
+    """
+    x = np.asarray(x, dtype=float)
+    groups = np.asarray(groups)
+    bins = np.asarray(bins, dtype=float)
+    n_bins = len(bins) - 1
+
+    # bin index of each observation
+    idx = np.searchsorted(bins, x, side='right') - 1
+    idx[x == bins[-1]] = n_bins - 1
+    inside = (idx >= 0) & (idx < n_bins) & (groups >= 0) & (groups < n_groups)
+
+    return np.bincount(
+        groups[inside] * n_bins + idx[inside],
+        minlength=n_groups * n_bins
+    ).reshape(n_groups, n_bins)
+
+
+def read_only_view(arr):
+    """Read-only view
+
+    .. versionadded:: 0.5.0
+
+    Returns a view of the array, that shares its memory but cannot be
+    written to. Used instead of defensive copies.
+
+    Parameters
+    ----------
+    arr : numpy.ndarray
+
+    Returns
+    -------
+    view : numpy.ndarray
+    """
+    view = np.asarray(arr).view()
+    view.setflags(write=False)
+    return view
+
+
+def condensed_index(i, j, n):
+    """Condensed index of point pairs
+
+    .. versionadded:: 0.5.0
+
+    Maps the indices of two points to the index of their pair in the
+    condensed (upper triangle) distance array, as returned by
+    :func:`pdist <scipy.spatial.distance.pdist>`, without building the
+    squareform matrix.
+
+    Parameters
+    ----------
+    i, j : int, numpy.ndarray
+        Point indices. The order of i and j does not matter, but they
+        must not be equal.
+    n : int
+        Number of points.
+
+    Returns
+    -------
+    k : int, numpy.ndarray
+        Index of each pair in the condensed array.
+    """
+    i, j = np.minimum(i, j), np.maximum(i, j)
+    return n * i - i * (i + 1) // 2 + j - i - 1
+
+
+def pair_indices(k, n):
+    """Point indices of condensed pairs
+
+    .. versionadded:: 0.5.0
+
+    Inverse of :func:`condensed_index`. Maps indices of the condensed
+    (upper triangle) distance array to the indices of the two points,
+    without building the squareform matrix.
+
+    Parameters
+    ----------
+    k : int, numpy.ndarray
+        Indices into the condensed array.
+    n : int
+        Number of points.
+
+    Returns
+    -------
+    i, j : numpy.ndarray
+        Point indices of each pair with i < j.
+    """
+    k = np.asarray(k, dtype=np.int64)
+
+    # first condensed index of each row
+    r = np.arange(n, dtype=np.int64)
+    starts = n * r - r * (r + 1) // 2
+
+    i = np.searchsorted(starts, k, side='right') - 1
+    j = k - starts[i] + i + 1
+    return i, j
+
+
+def warmup(dtypes=(np.float64, np.float32)):
+    """Compile the numba kernels
+
+    .. versionadded:: 0.5.0
+
+    Compiles the jitted theoretical models, estimators, binning and search
+    area kernels for the given floating point types. All kernels are
+    cached on disk, thus only the first process compiles them and later
+    processes load the machine code from the cache. Call this function
+    once, i.e. when building a container image or starting a pool of
+    worker processes, to move the compilation out of the first variogram
+    fit.
+
+    Parameters
+    ----------
+    dtypes : tuple
+        Floating point types of the observations and lags to compile the
+        models and estimators for. Defaults to float64 and float32.
+
+    Returns
+    -------
+    elapsed : float
+        Seconds spent in compilation or loading the cache.
+    """
+    # import here, as the kernels import this module
+    from skgstat import models, estimators, binning
+    from skgstat.DirectionalVariogram import _search_area
+
+    t0 = time.time()
+
+    for dtype in dtypes:
+        x = np.linspace(1, 10, 10).astype(dtype)
+        one = dtype(1.)
+
+        # scalar models with and without nugget
+        for model in (models.spherical, models.exponential, models.gaussian, models.cubic):
+            model(one, one, one)
+            model(one, one, one, one)
+        models.stable(one, one, one, one)
+        models.stable(one, one, one, one, one)
+
+        # estimators
+        estimators.matheron(x)
+        estimators.cressie(x)
+        estimators.genton(x)
+        estimators.genton(x, max_pairs=10)
+        estimators.lag_sums(x, np.zeros(10, dtype=np.int64), 1)
+
+    # the array models always compute in float64
+    h = np.linspace(0, 10, 10)
+    for model in (models.spherical, models.exponential, models.gaussian, models.cubic):
+        model(h, 5., 1.)
+        model(h, 5., 1., 0.1)
+    models.stable(h, 5., 1., 0.5)
+    models.stable(h, 5., 1., 0.5, 0.1)
+
+    # binning and search area
+    binning._kmeans_1d(h, np.ones(10), 2)
+    binning._ward_1d(h, np.ones(10), 2)
+    _search_area(h, h, np.zeros(1), 0.5, 1., 0)
 
-    # map information function and return product
-    return - np.fromiter(map(np.log2, p), dtype=float).dot(p)
+    return time.time() - t0